@@ -58,7 +58,22 @@ SCENARIO_CONFIG = {
     "similarity_threshold": 0.7,
     "max_results": 5,
     "cache_ttl": 3600,
-    "batch_size": 32
+    "query_cache_size": 1024,
+    "result_cache_size": 512,
+    "retrieval_workers": 4,
+    "sqlite_mmap_size": 268435456,
+    "sqlite_cache_size_kb": 16384,
+    "usage_flush_interval": 5.0,
+    "usage_flush_size": 256,
+    "batch_size": 32,
+    "batch_window_ms": 5.0,
+    "chunk_size": 1000,
+    "chunk_overlap": 200,
+    "ingest_batch_size": 256,
+    "embedding_backend": "torch",
+    "onnx_model_dir": str(ROOT_DIR / "models" / "onnx"),
+    "embedding_cache_path": None,  # Persistent embedding cache file; None disables it
+    "embedding_cache_size": 200000
 }
 
 # Logging Configuration
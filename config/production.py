@@ -68,7 +68,8 @@ MONITORING_CONFIG.update({
 SCENARIO_CONFIG.update({
     "similarity_threshold": 0.75,  # Stricter matching
     "cache_ttl": 7200,  # 2 hours cache
-    "max_batch_size": 50
+    "max_batch_size": 50,
+    "embedding_cache_path": os.getenv("EMBEDDING_CACHE_PATH", str(DATA_DIR / "embedding_cache.sqlite"))
 })
 
 # Security Configuration
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Measure how long the AI modules take to import in a fresh interpreter.
+
+Every module is imported in its own subprocess (so nothing is cached between
+measurements) several times; the median wall time is reported together with
+any heavy dependency (torch, sentence_transformers, pandas, ...) the import
+pulled in. With --max-seconds the script exits non-zero when a module is
+over budget, loads a heavy dependency or fails to import, so it can guard CI
+against start-up regressions. Modules that are expected to be unimportable in
+a given environment must be listed with --allow-missing to be skipped.
+
+Usage:
+    python scripts/benchmark_import_time.py
+    python scripts/benchmark_import_time.py --repeat 5 --max-seconds 1.0
+    python scripts/benchmark_import_time.py --max-seconds 1.0 --allow-missing src.ai.rag_pipeline src.ai.chatbot
+    python scripts/benchmark_import_time.py --modules ai.knowledge_retriever web.rag --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = [
+    "ai.model_registry",
+    "ai.embedding",
+    "ai.faiss_index",
+    "ai.onnx_encoder",
+    "ai.knowledge_retriever",
+    "ai.async_retriever",
+    "web.rag",
+    "src.ai.rag_pipeline",
+    "src.ai.chatbot",
+]
+
+# Dependencies that must only be imported when a model, index or LLM is first used
+HEAVY_MODULES = ["torch", "sentence_transformers", "transformers", "pandas", "langchain_ollama", "faiss",
+                 "onnxruntime", "tokenizers"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module, repeat):
+    """Import a module in `repeat` fresh interpreters; return the median time and heavy imports"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT / "src"), str(ROOT), env.get("PYTHONPATH")]))
+    timings = []
+    heavy = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, env=env, cwd=ROOT
+        )
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+            return {"module": module, "error": error}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        heavy = result["heavy"]
+    return {"module": module, "seconds": statistics.median(timings), "heavy": heavy}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time of the AI stack")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module (median is reported)")
+    parser.add_argument("--max-seconds", type=float, help="Fail if any module takes longer to import")
+    parser.add_argument("--allow-missing", nargs="+", default=[], metavar="MODULE",
+                        help="Modules that may fail to import without failing --max-seconds")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeat) for module in args.modules]
+
+    failed = False
+    if args.json:
+        print(json.dumps(results, indent=2))
+    for result in results:
+        if "error" in result:
+            # A module that cannot be imported cannot be measured, so it only
+            # passes a budget check when it is explicitly allowed to be missing
+            allowed = args.max_seconds is None or result["module"] in args.allow_missing
+            failed = failed or not allowed
+            if not args.json:
+                status = "skipped" if allowed else "IMPORT FAILED"
+                print(f"{result['module']:<28} {status} ({result['error']})")
+            continue
+        over_budget = args.max_seconds is not None and result["seconds"] > args.max_seconds
+        failed = failed or over_budget or (args.max_seconds is not None and bool(result["heavy"]))
+        if not args.json:
+            heavy = f"  loaded: {', '.join(result['heavy'])}" if result["heavy"] else ""
+            flag = "  OVER BUDGET" if over_budget else ""
+            print(f"{result['module']:<28} {result['seconds'] * 1000:8.1f} ms{heavy}{flag}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
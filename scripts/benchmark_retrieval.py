@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Benchmark knowledge retrieval on synthetic knowledge bases.
+
+Synthetic vector_db.sqlite files are generated once per size and reused from
+--work-dir. For every size, index backend and search mode the benchmark runs
+a fixed query set (data/prompts.txt and scripts/prompts.csv) and records
+p50/p95/p99 latency, single-threaded throughput, peak RSS and recall@k of the
+vector ranking against exact search. Every (size, backend) case runs in a
+fresh process so peak RSS and index load time are not polluted by earlier
+cases. The result cache is disabled so every query is actually scored.
+
+With --encoder synthetic (the default) query vectors are drawn from the same
+distribution as the stored vectors and no model is loaded; vector and hybrid
+modes then go through KnowledgeRetriever.search_by_vector. With --encoder
+model the queries are embedded by all-MiniLM-L6-v2 and src/web/rag.py
+perform_search is benchmarked as well.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmark_retrieval.py --sizes 10000 100000 1000000
+    PYTHONPATH=src python scripts/benchmark_retrieval.py --sizes 10000 --backends sqlite memory --output bench.json
+    PYTHONPATH=src python scripts/benchmark_retrieval.py --distribution clustered --encoder model
+"""
+
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from ai.knowledge_retriever import KnowledgeRetriever
+from ai.knowledge_store import quantize_embeddings
+from ai.result_cache import RetrievalResultCache
+from ai.vector_index import InMemoryVectorIndex, export_snapshot
+
+DIMENSION = 384
+CATEGORIES = ["classroom_management", "teaching_strategies", "special_needs",
+              "behavioral_issues", "learning_difficulties", "assessment"]
+BACKENDS = ["sqlite", "memory", "faiss", "mmap", "quantized"]
+MODES = ["vector", "keyword", "hybrid"]
+NUM_CLUSTERS = 256
+INSERT_BATCH = 10000
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def load_queries(limit=None):
+    """Fixed benchmark query set: data/prompts.txt, then scripts/prompts.csv, de-duplicated"""
+    queries = [line.strip() for line in (ROOT / "data" / "prompts.txt").read_text(encoding="utf-8").splitlines()]
+    with open(ROOT / "scripts" / "prompts.csv", newline="", encoding="utf-8") as handle:
+        queries += [row["prompt"].strip() for row in csv.DictReader(handle)]
+    queries = list(dict.fromkeys(query for query in queries if query))
+    return queries[:limit] if limit else queries
+
+def synthetic_vectors(rng, count, distribution, centers):
+    """Random unit-normal vectors, or vectors scattered around cluster centers"""
+    if distribution == "clustered":
+        return (centers[rng.integers(len(centers), size=count)]
+                + 0.35 * rng.normal(size=(count, DIMENSION))).astype(np.float32)
+    return rng.normal(size=(count, DIMENSION)).astype(np.float32)
+
+def cluster_centers(seed):
+    return np.random.default_rng(seed + 1).normal(size=(NUM_CLUSTERS, DIMENSION)).astype(np.float32)
+
+def generate_knowledge_base(db_path, size, distribution, seed, vocabulary):
+    """Write a synthetic vector_db.sqlite with `size` chunks"""
+    rng = np.random.default_rng(seed)
+    centers = cluster_centers(seed)
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("""CREATE TABLE chunks (
+        id INTEGER PRIMARY KEY, text TEXT, metadata TEXT, category TEXT,
+        usage_count INTEGER DEFAULT 0, effectiveness_score REAL DEFAULT 0.0)""")
+    conn.execute("CREATE TABLE embeddings (chunk_id INTEGER PRIMARY KEY, vector BLOB)")
+    start = time.perf_counter()
+    with conn:
+        for first in range(1, size + 1, INSERT_BATCH):
+            count = min(INSERT_BATCH, size + 1 - first)
+            ids = range(first, first + count)
+            words = rng.integers(len(vocabulary), size=(count, 24))
+            categories = rng.integers(len(CATEGORIES), size=count)
+            conn.executemany(
+                "INSERT INTO chunks (id, text, metadata, category) VALUES (?, ?, ?, ?)",
+                [(chunk_id, " ".join(vocabulary[w] for w in row), json.dumps({"source": "synthetic"}),
+                  CATEGORIES[category]) for chunk_id, row, category in zip(ids, words, categories)]
+            )
+            vectors = synthetic_vectors(rng, count, distribution, centers)
+            conn.executemany(
+                "INSERT INTO embeddings (chunk_id, vector) VALUES (?, ?)",
+                [(chunk_id, vector.tobytes()) for chunk_id, vector in zip(ids, vectors)]
+            )
+    conn.close()
+    os.replace(tmp_path, db_path)
+    logger.info(f"Generated {size} chunks in {db_path} in {time.perf_counter() - start:.1f}s")
+
+def prepare_backend(db_path, backend):
+    """Build the prebuilt index a backend reads, if it does not exist yet"""
+    if backend == "faiss":
+        from ai.faiss_index import FaissVectorIndex, FAISS_AVAILABLE
+        if not FAISS_AVAILABLE:
+            return "faiss is not installed"
+        index_path = FaissVectorIndex.default_index_path(db_path)
+        if not os.path.exists(index_path):
+            FaissVectorIndex.build(db_path).save(index_path)
+    elif backend == "mmap":
+        if not os.path.exists(f"{InMemoryVectorIndex.default_snapshot_prefix(db_path)}.snapshot.json"):
+            export_snapshot(db_path)
+    elif backend == "quantized":
+        conn = sqlite3.connect(db_path)
+        try:
+            quantize_embeddings(conn)
+        finally:
+            conn.close()
+    return None
+
+def latency_summary(seconds):
+    milliseconds = np.asarray(seconds) * 1000
+    return {
+        "p50": float(np.percentile(milliseconds, 50)),
+        "p95": float(np.percentile(milliseconds, 95)),
+        "p99": float(np.percentile(milliseconds, 99)),
+        "mean": float(milliseconds.mean())
+    }
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+def run_case(case):
+    """Benchmark every mode of one (size, backend) case; runs in its own process"""
+    logging.getLogger("ai").setLevel(logging.WARNING)
+    queries, top_k = case["queries"], case["top_k"]
+    vectors = np.load(case["query_vectors"]) if case["query_vectors"] else None
+    rss_before = peak_rss_mb()
+
+    load_start = time.perf_counter()
+    retriever = KnowledgeRetriever(case["db_path"], index_backend=case["backend"])
+    retriever.result_cache = RetrievalResultCache(max_size=0)
+    if case["encoder"] == "model":
+        retriever.warmup()
+        vectors = np.asarray(retriever.model.encode(queries, convert_to_numpy=True), dtype=np.float32)
+    elif case["backend"] != "sqlite":
+        retriever._get_index()
+    load_seconds = time.perf_counter() - load_start
+
+    exact = InMemoryVectorIndex.from_database(case["db_path"]).search_batch(vectors, None, top_k)
+    exact_ids = [{chunk_id for chunk_id, _ in hits} for hits in exact]
+    del exact
+
+    results = []
+    for mode in case["modes"]:
+        timings, recalls = [], []
+        wall_start = time.perf_counter()
+        for query, vector, truth in zip(queries, vectors, exact_ids):
+            start = time.perf_counter()
+            if mode == "keyword":
+                hits = retriever.search(query, top_k=top_k, mode="keyword")
+            else:
+                hits = retriever.search_by_vector(vector, top_k=top_k, query=query if mode == "hybrid" else None)
+            timings.append(time.perf_counter() - start)
+            if mode == "vector":
+                recalls.append(len(truth & {hit["id"] for hit in hits}) / max(len(truth), 1))
+        wall = time.perf_counter() - wall_start
+        results.append({
+            "mode": mode,
+            "latency_ms": latency_summary(timings),
+            "throughput_qps": len(queries) / wall,
+            "recall_at_k": float(np.mean(recalls)) if recalls else None
+        })
+
+    if case["encoder"] == "model" and case["perform_search"]:
+        os.environ["KNOWLEDGE_DB_PATH"] = case["db_path"]
+        os.environ["KNOWLEDGE_INDEX_BACKEND"] = case["backend"]
+        import web.rag as rag
+        rag.get_retriever().result_cache = RetrievalResultCache(max_size=0)
+        timings, recalls = [], []
+        wall_start = time.perf_counter()
+        for query, truth in zip(queries, exact_ids):
+            start = time.perf_counter()
+            hits = rag.perform_search(query, top_k)
+            timings.append(time.perf_counter() - start)
+            recalls.append(len(truth & {hit["id"] for hit in hits}) / max(len(truth), 1))
+        results.append({
+            "mode": "perform_search",
+            "latency_ms": latency_summary(timings),
+            "throughput_qps": len(queries) / (time.perf_counter() - wall_start),
+            "recall_at_k": float(np.mean(recalls))
+        })
+
+    retriever.close()
+    peak = peak_rss_mb()
+    for result in results:
+        result.update({
+            "size": case["size"], "backend": case["backend"], "top_k": top_k,
+            "queries": len(queries), "load_seconds": load_seconds,
+            "peak_rss_mb": peak, "rss_before_load_mb": rss_before
+        })
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark knowledge retrieval on synthetic knowledge bases')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='Number of chunks per synthetic knowledge base')
+    parser.add_argument('--distribution', choices=['random', 'clustered'], default='random',
+                        help='How synthetic vectors are drawn')
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=BACKENDS, help='Index backends')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES, help='Search modes')
+    parser.add_argument('--encoder', choices=['synthetic', 'model'], default='synthetic',
+                        help='Draw query vectors synthetically or embed the prompts with the model')
+    parser.add_argument('--top-k', type=int, default=10, help='Results per query (recall@k)')
+    parser.add_argument('--num-queries', type=int, default=None, help='Use only the first N prompts')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for synthetic data')
+    parser.add_argument('--work-dir', default=str(ROOT / 'benchmarks'), help='Where synthetic databases are kept')
+    parser.add_argument('--output', default=None, help='JSON results file (default: stdout)')
+    parser.add_argument('--no-perform-search', dest='perform_search', action='store_false',
+                        help='Skip the web perform_search benchmark (model encoder only)')
+    args = parser.parse_args()
+
+    queries = load_queries(args.num_queries)
+    vocabulary = sorted({word.strip('.,?!"').lower() for query in queries for word in query.split()} - {""})
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    query_vectors = None
+    if args.encoder == "synthetic":
+        query_vectors = str(work_dir / f"queries_{args.distribution}_{args.seed}_{len(queries)}.npy")
+        rng = np.random.default_rng(args.seed + 2)
+        np.save(query_vectors, synthetic_vectors(rng, len(queries), args.distribution, cluster_centers(args.seed)))
+
+    context = multiprocessing.get_context("spawn")
+    results, skipped = [], []
+    for size in args.sizes:
+        db_path = str(work_dir / f"vector_db_{size}_{args.distribution}_{args.seed}.sqlite")
+        if not os.path.exists(db_path):
+            generate_knowledge_base(db_path, size, args.distribution, args.seed, vocabulary)
+        for backend in args.backends:
+            reason = prepare_backend(db_path, backend)
+            if reason:
+                logger.warning(f"Skipping {backend} backend: {reason}")
+                skipped.append({"size": size, "backend": backend, "reason": reason})
+                continue
+            case = {
+                "db_path": db_path, "size": size, "backend": backend, "modes": args.modes,
+                "queries": queries, "query_vectors": query_vectors, "encoder": args.encoder,
+                "top_k": args.top_k, "perform_search": args.perform_search
+            }
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                case_results = executor.submit(run_case, case).result()
+            for result in case_results:
+                logger.info(
+                    f"{size:>8} {backend:<9} {result['mode']:<14} p50 {result['latency_ms']['p50']:8.2f} ms  "
+                    f"p99 {result['latency_ms']['p99']:8.2f} ms  {result['throughput_qps']:8.1f} q/s  "
+                    f"recall {result['recall_at_k'] if result['recall_at_k'] is not None else '-'}"
+                )
+            results.extend(case_results)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "distribution": args.distribution,
+            "encoder": args.encoder,
+            "seed": args.seed
+        },
+        "results": results,
+        "skipped": skipped
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        logger.info(f"Results written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Build retrieval indexes for the Educational Knowledge Base.
+
+Usage:
+    PYTHONPATH=src python scripts/build_knowledge_index.py faiss --db-path knowledge_base/vector_db.sqlite
+    PYTHONPATH=src python scripts/build_knowledge_index.py faiss --index-type ivf --nlist 1024
+    PYTHONPATH=src python scripts/build_knowledge_index.py snapshot
+    PYTHONPATH=src python scripts/build_knowledge_index.py fts
+    PYTHONPATH=src python scripts/build_knowledge_index.py normalize
+    PYTHONPATH=src python scripts/build_knowledge_index.py quantize
+    PYTHONPATH=src python scripts/build_knowledge_index.py shard --num-shards 4
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+import time
+
+from ai.faiss_index import FaissVectorIndex
+from ai.knowledge_store import (
+    rebuild_fts_index, normalize_embeddings, quantize_embeddings, ensure_version_tracking, ensure_leaderboard
+)
+from ai.vector_index import export_snapshot
+from ai.sharded_retriever import split_knowledge_base
+
+DEFAULT_DB_PATH = "/home/team1/UTTA-Knowledge-Base-Demo/knowledge_base/vector_db.sqlite"
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def build_faiss(args):
+    """Rebuild the FAISS ANN index next to the vector database"""
+    start = time.time()
+    index = FaissVectorIndex.build(
+        args.db_path,
+        index_type=args.index_type,
+        hnsw_m=args.hnsw_m,
+        ef_construction=args.ef_construction,
+        nlist=args.nlist
+    )
+    output = args.output or FaissVectorIndex.default_index_path(args.db_path)
+    index.save(output)
+    logger.info(f"FAISS index with {len(index)} vectors written to {output} in {time.time() - start:.1f}s")
+
+def build_snapshot(args):
+    """Export the embeddings to a memory-mapped snapshot next to the vector database"""
+    start = time.time()
+    prefix = export_snapshot(args.db_path, args.output)
+    logger.info(f"Embedding snapshot written to {prefix}.* in {time.time() - start:.1f}s")
+
+def build_fts(args):
+    """Create or rebuild the FTS5 keyword index, plus the version tracking and leaderboard the retriever uses"""
+    start = time.time()
+    conn = sqlite3.connect(args.db_path)
+    try:
+        rebuild_fts_index(conn)
+        # A database deployed read-only cannot create these on first open
+        ensure_version_tracking(conn)
+        ensure_leaderboard(conn)
+    finally:
+        conn.close()
+    logger.info(f"FTS5 keyword index rebuilt in {time.time() - start:.1f}s")
+
+def build_normalized(args):
+    """Rewrite the stored embeddings as unit-length vectors"""
+    start = time.time()
+    conn = sqlite3.connect(args.db_path)
+    try:
+        updated = normalize_embeddings(conn)
+    finally:
+        conn.close()
+    logger.info(f"Normalized {updated} embeddings in {time.time() - start:.1f}s")
+
+def build_quantized(args):
+    """Rebuild the int8 copy of the embeddings used by the quantized backend"""
+    start = time.time()
+    conn = sqlite3.connect(args.db_path)
+    try:
+        if args.normalize:
+            normalize_embeddings(conn)
+        count = quantize_embeddings(conn)
+    finally:
+        conn.close()
+    logger.info(f"Quantized {count} embeddings to int8 in {time.time() - start:.1f}s")
+
+def build_shards(args):
+    """Split the vector database into shard files for ShardedKnowledgeRetriever"""
+    start = time.time()
+    paths = split_knowledge_base(args.db_path, args.num_shards)
+    logger.info(f"Wrote {len(paths)} shards in {time.time() - start:.1f}s: {', '.join(paths)}")
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Build retrieval indexes for the knowledge base')
+    parser.add_argument('--db-path', default=DEFAULT_DB_PATH, help='Path to vector_db.sqlite')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    faiss_parser = subparsers.add_parser('faiss', help='Rebuild the FAISS ANN index')
+    faiss_parser.add_argument('--index-type', choices=FaissVectorIndex.INDEX_TYPES, default='hnsw',
+                              help='ANN index structure (default: hnsw)')
+    faiss_parser.add_argument('--hnsw-m', type=int, default=32, help='HNSW graph degree')
+    faiss_parser.add_argument('--ef-construction', type=int, default=200, help='HNSW build-time search depth')
+    faiss_parser.add_argument('--nlist', type=int, default=None, help='Number of IVF cells')
+    faiss_parser.add_argument('--output', default=None,
+                              help='Index file (default: vector_db.faiss next to the database)')
+    faiss_parser.set_defaults(func=build_faiss)
+
+    snapshot_parser = subparsers.add_parser('snapshot', help='Export a memory-mapped embedding snapshot')
+    snapshot_parser.add_argument('--output', default=None,
+                                 help='Snapshot path prefix (default: vector_db next to the database)')
+    snapshot_parser.set_defaults(func=build_snapshot)
+
+    fts_parser = subparsers.add_parser('fts', help='Create or rebuild the FTS5 keyword index and runtime schema')
+    fts_parser.set_defaults(func=build_fts)
+
+    normalize_parser = subparsers.add_parser('normalize', help='Store embeddings as unit-length vectors')
+    normalize_parser.set_defaults(func=build_normalized)
+
+    quantize_parser = subparsers.add_parser('quantize', help='Build the int8 copy of the embeddings')
+    quantize_parser.add_argument('--normalize', action='store_true',
+                                 help='Normalize the float32 embeddings first')
+    quantize_parser.set_defaults(func=build_quantized)
+
+    shard_parser = subparsers.add_parser('shard', help='Split the database into shard files')
+    shard_parser.add_argument('--num-shards', type=int, required=True, help='Number of shards')
+    shard_parser.set_defaults(func=build_shards)
+
+    args = parser.parse_args()
+    try:
+        args.func(args)
+    except Exception as e:
+        logger.error(f"Index build failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Encode a large corpus into a .npy embedding matrix on every core.
+
+Texts are read from a .txt file (one text per line) or a .jsonl file (one
+object per line with a "text" or "content" field), streamed to a pool of
+model worker processes and written row by row, in input order, to a
+memory-mapped .npy file.
+
+Usage:
+    PYTHONPATH=src python scripts/encode_corpus.py corpus.jsonl embeddings.npy
+    PYTHONPATH=src python scripts/encode_corpus.py prompts.txt prompts.npy --workers 8 --backend onnx
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+from ai.bulk_encoder import BulkEncoder, SCENARIO_CONFIG
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def iter_texts(path):
+    """Yield the non-empty texts of a .txt or .jsonl file"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if path.endswith(".jsonl"):
+                record = json.loads(line)
+                yield record.get("text") or record.get("content") or ""
+            else:
+                yield line.rstrip("\n")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Encode a corpus with a pool of worker processes')
+    parser.add_argument('input', help='.txt (one text per line) or .jsonl file')
+    parser.add_argument('output', help='.npy file to write the embeddings to')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='Sentence transformer model')
+    parser.add_argument('--backend', choices=['torch', 'onnx', 'onnx-int8'],
+                        help='Embedding engine (default: SCENARIO_CONFIG["embedding_backend"])')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per 4 cores)')
+    parser.add_argument('--chunk-size', type=int, default=1024, help='Texts sent to a worker at a time')
+    parser.add_argument('--batch-size', type=int, default=SCENARIO_CONFIG['batch_size'],
+                        help='Texts per encode batch inside a worker')
+    args = parser.parse_args()
+
+    # Count first so the output file can be allocated without holding the corpus in memory
+    total = sum(1 for _ in iter_texts(args.input))
+    logger.info(f"Encoding {total} texts from {args.input}")
+    try:
+        with BulkEncoder(args.model, args.backend, args.workers, args.chunk_size, args.batch_size) as encoder:
+            embeddings = encoder.encode(iter_texts(args.input), output=args.output, total=total)
+    except Exception as e:
+        logger.error(f"Encoding failed: {str(e)}")
+        sys.exit(1)
+    logger.info(f"Wrote {embeddings.shape[0]} x {embeddings.shape[1]} embeddings to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Export the embedding model to ONNX for the "onnx" and "onnx-int8" backends.
+
+Writes model.onnx, the int8 dynamically quantized model_int8.onnx and
+tokenizer.json to SCENARIO_CONFIG["onnx_model_dir"]/<model>, then checks
+that both exported models reproduce the PyTorch embeddings (minimum cosine
+similarity over a sample of prompts) and reports their encode throughput.
+Exporting needs torch, sentence_transformers and onnxruntime; serving the
+exported model only needs onnxruntime and tokenizers.
+
+Usage:
+    PYTHONPATH=src python scripts/export_onnx_model.py
+    PYTHONPATH=src python scripts/export_onnx_model.py --model all-MiniLM-L6-v2 --output-dir models/onnx/mini
+    PYTHONPATH=src python scripts/export_onnx_model.py --no-quantize --skip-check
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ai.onnx_encoder import OnnxSentenceEncoder, export_onnx_model, onnx_model_dir
+
+ROOT = Path(__file__).resolve().parent.parent
+PROMPTS_PATH = ROOT / "data" / "prompts.txt"
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def load_prompts(limit):
+    """Sample texts for the parity check"""
+    if PROMPTS_PATH.exists():
+        prompts = [line.strip() for line in PROMPTS_PATH.read_text().splitlines() if line.strip()]
+    else:
+        prompts = []
+    prompts = prompts or ["How should I handle a student who keeps interrupting the lesson?"]
+    return prompts[:limit]
+
+
+def check_parity(model_name, output_dir, quantized_too, limit):
+    """Compare the exported models with PyTorch; return the minimum cosine per variant"""
+    from sentence_transformers import SentenceTransformer
+
+    texts = load_prompts(limit)
+    reference = SentenceTransformer(model_name, device="cpu")
+    start = time.perf_counter()
+    expected = reference.encode(texts, normalize_embeddings=True)
+    logger.info(f"torch: {len(texts) / (time.perf_counter() - start):.1f} texts/s")
+
+    results = {}
+    for quantized in ([False, True] if quantized_too else [False]):
+        name = "onnx-int8" if quantized else "onnx"
+        encoder = OnnxSentenceEncoder.from_directory(output_dir, quantized=quantized)
+        start = time.perf_counter()
+        actual = encoder.encode(texts)
+        rate = len(texts) / (time.perf_counter() - start)
+        results[name] = float(np.min(np.sum(expected * actual, axis=1)))
+        logger.info(
+            f"{name}: {rate:.1f} texts/s, min cosine vs torch {results[name]:.4f}, "
+            f"model file {encoder.memory_bytes / 2**20:.1f} MiB"
+        )
+    return results
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Export the embedding model to ONNX')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='Sentence transformer model')
+    parser.add_argument('--output-dir', help='Target directory (default: SCENARIO_CONFIG["onnx_model_dir"]/<model>)')
+    parser.add_argument('--no-quantize', action='store_true', help='Skip the int8 quantized model')
+    parser.add_argument('--skip-check', action='store_true', help='Skip the parity check against PyTorch')
+    parser.add_argument('--check-texts', type=int, default=256, help='Prompts used by the parity check')
+    parser.add_argument('--min-cosine', type=float, default=0.98,
+                        help='Fail if an exported model falls below this cosine similarity')
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or onnx_model_dir(args.model)
+    try:
+        export_onnx_model(args.model, output_dir, quantize=not args.no_quantize)
+    except Exception as e:
+        logger.error(f"Export failed: {str(e)}")
+        sys.exit(1)
+
+    if not args.skip_check:
+        results = check_parity(args.model, output_dir, not args.no_quantize, args.check_texts)
+        failing = [name for name, cosine in results.items() if cosine < args.min_cosine]
+        if failing:
+            logger.error(f"Exported models below --min-cosine {args.min_cosine}: {', '.join(failing)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
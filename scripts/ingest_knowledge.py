@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Ingest source documents into the Educational Knowledge Base.
+
+Documents are chunked, embedded in batches and written to the chunks and
+embeddings tables. Chunks whose text did not change since the last run are
+skipped, so re-ingesting after small edits only embeds the edited chunks.
+
+Usage:
+    PYTHONPATH=src python scripts/ingest_knowledge.py data/knowledge --db-path knowledge_base/vector_db.sqlite
+    PYTHONPATH=src python scripts/ingest_knowledge.py notes.md corpus.jsonl --category classroom_management
+    PYTHONPATH=src python scripts/ingest_knowledge.py data/knowledge --prune
+
+    # Sharded knowledge base: one independent run per shard file (can run in parallel)
+    PYTHONPATH=src python scripts/ingest_knowledge.py data/knowledge --db-path vector_db.shard0of2.sqlite --shard 0 --num-shards 2
+    PYTHONPATH=src python scripts/ingest_knowledge.py data/knowledge --db-path vector_db.shard1of2.sqlite --shard 1 --num-shards 2
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+
+from ai.ingestion import ingest_documents, iter_documents, DEFAULT_CATEGORY, SCENARIO_CONFIG
+
+DEFAULT_DB_PATH = "/home/team1/UTTA-Knowledge-Base-Demo/knowledge_base/vector_db.sqlite"
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Ingest documents into the knowledge base')
+    parser.add_argument('paths', nargs='+', help='.txt, .md or .jsonl files, or directories of them')
+    parser.add_argument('--db-path', default=DEFAULT_DB_PATH, help='Path to vector_db.sqlite')
+    parser.add_argument('--category', default=DEFAULT_CATEGORY,
+                        help='Category for documents that do not name one (files in subdirectories '
+                             'use the directory name)')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='Sentence transformer model')
+    parser.add_argument('--backend', choices=['torch', 'onnx', 'onnx-int8'],
+                        help='Embedding engine (default: SCENARIO_CONFIG["embedding_backend"])')
+    parser.add_argument('--chunk-size', type=int, default=SCENARIO_CONFIG['chunk_size'],
+                        help='Maximum chunk length in characters')
+    parser.add_argument('--chunk-overlap', type=int, default=SCENARIO_CONFIG['chunk_overlap'],
+                        help='Characters repeated between consecutive chunks')
+    parser.add_argument('--batch-size', type=int, default=SCENARIO_CONFIG['ingest_batch_size'],
+                        help='Chunks embedded per encode call')
+    parser.add_argument('--prune', action='store_true',
+                        help='Delete chunks of previously ingested sources missing from this run')
+    parser.add_argument('--shard', type=int, default=0,
+                        help='Shard written by this run; only its share of the documents is ingested')
+    parser.add_argument('--num-shards', type=int, default=1, help='Number of shards of the knowledge base')
+    args = parser.parse_args()
+    if not 0 <= args.shard < args.num_shards:
+        parser.error('--shard must be between 0 and --num-shards - 1')
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        stats = ingest_documents(
+            conn,
+            iter_documents(args.paths, args.category),
+            model_name=args.model,
+            backend=args.backend,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            batch_size=args.batch_size,
+            prune=args.prune,
+            shard_index=args.shard,
+            num_shards=args.num_shards
+        )
+    except Exception as e:
+        logger.error(f"Ingestion failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        conn.close()
+    logger.info(
+        f"{stats['chunks']} chunks from {stats['documents']} documents: {stats['embedded']} embedded, "
+        f"{stats['unchanged']} unchanged, {stats['deleted']} deleted"
+    )
+
+if __name__ == "__main__":
+    main()
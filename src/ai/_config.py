@@ -0,0 +1,54 @@
+"""
+Scenario Configuration Module for Utah Teacher Training Assistant (UTTA)
+
+This module loads ``SCENARIO_CONFIG`` for the AI modules in one place. The
+project configuration (``config/``, which applies the development, testing
+or production overrides) is imported once and merged over
+``DEFAULT_SCENARIO_CONFIG``. When the project configuration cannot be
+imported, for example when only ``src`` is on the path, the defaults are
+used on their own. ``DEFAULT_SCENARIO_CONFIG`` mirrors ``config/base.py``, so
+every module falls back to the same values.
+
+Constants:
+    DEFAULT_SCENARIO_CONFIG: Built-in value of every setting the AI modules read.
+    SCENARIO_CONFIG: The defaults overlaid with the project configuration.
+
+Example:
+    from ._config import SCENARIO_CONFIG
+    ttl = SCENARIO_CONFIG["cache_ttl"]
+"""
+
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCENARIO_CONFIG: Dict[str, Any] = {
+    "similarity_threshold": 0.7,
+    "max_results": 5,
+    "cache_ttl": 3600,
+    "query_cache_size": 1024,
+    "result_cache_size": 512,
+    "retrieval_workers": 4,
+    "sqlite_mmap_size": 268435456,
+    "sqlite_cache_size_kb": 16384,
+    "usage_flush_interval": 5.0,
+    "usage_flush_size": 256,
+    "batch_size": 32,
+    "batch_window_ms": 5.0,
+    "chunk_size": 1000,
+    "chunk_overlap": 200,
+    "ingest_batch_size": 256,
+    "embedding_backend": "torch",
+    "onnx_model_dir": "models/onnx",
+    "embedding_cache_path": None,  # Persistent embedding cache file; None disables it
+    "embedding_cache_size": 200000
+}
+
+try:
+    from config import SCENARIO_CONFIG as _PROJECT_SCENARIO_CONFIG
+except ImportError:
+    logger.debug("Project configuration not importable; using the default scenario settings")
+    _PROJECT_SCENARIO_CONFIG = {}
+
+SCENARIO_CONFIG: Dict[str, Any] = {**DEFAULT_SCENARIO_CONFIG, **_PROJECT_SCENARIO_CONFIG}
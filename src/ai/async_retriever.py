@@ -0,0 +1,213 @@
+"""
+Async Knowledge Retriever Module for Utah Teacher Training Assistant (UTTA)
+
+This module exposes KnowledgeRetriever to the asyncio code paths (RAGPipeline,
+TeacherTrainingChatbot) without blocking the event loop. Query encoding, vector
+scoring and SQLite I/O run on a bounded thread pool; the sentence transformer,
+NumPy and sqlite3 release the GIL for their heavy work, so concurrent requests
+overlap while the event loop keeps serving other trainees. Concurrent searches
+have their queries encoded together by an EmbeddingMicroBatcher, so the model
+runs one batch instead of one call per request.
+
+Classes:
+    AsyncKnowledgeRetriever: Awaitable wrapper around a KnowledgeRetriever.
+
+Example:
+    retriever = AsyncKnowledgeRetriever(KnowledgeRetriever(), max_workers=4)
+    knowledge = await retriever.search("classroom disruption strategies")
+    await retriever.record_usage([chunk["id"] for chunk in knowledge])
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ._config import SCENARIO_CONFIG
+from .knowledge_retriever import KnowledgeRetriever
+from .micro_batcher import EmbeddingMicroBatcher
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncKnowledgeRetriever:
+    """
+    An awaitable interface to a KnowledgeRetriever backed by a bounded thread pool.
+
+    At most ``max_workers`` retrieval calls run at once; further calls wait in
+    the pool's queue instead of piling up threads. The wrapped retriever gives
+    every pool thread its own SQLite read connection, so it is safe to share.
+
+    Attributes:
+        retriever (KnowledgeRetriever): The wrapped synchronous retriever
+        max_workers (int): Maximum number of concurrent retrieval calls
+        query_batcher (Optional[EmbeddingMicroBatcher]): Batches the query encodes of concurrent searches
+    """
+
+    def __init__(self, retriever: Optional[KnowledgeRetriever] = None,
+                 max_workers: int = SCENARIO_CONFIG["retrieval_workers"]):
+        """
+        Initialize the wrapper and its thread pool.
+
+        Args:
+            retriever (KnowledgeRetriever, optional): Retriever to wrap; a new
+                                                      one is created if omitted
+            max_workers (int): Maximum number of concurrent retrieval calls
+
+        Raises:
+            ValueError: If max_workers is less than 1
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.retriever = retriever if retriever is not None else KnowledgeRetriever()
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="knowledge-retriever")
+        # Retrievers without encode_queries (e.g. test doubles) search unbatched
+        encode_queries = getattr(self.retriever, "encode_queries", None)
+        self.query_batcher = EmbeddingMicroBatcher(encode_queries, run=self.run) if encode_queries else None
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the retrieval pool.
+
+        Args:
+            func (Callable[..., Any]): The blocking function
+            *args: Positional arguments for ``func``
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            Any: The return value of ``func``
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def warmup(self) -> bool:
+        """
+        Load the embedding model and vector index on the pool.
+
+        Returns:
+            bool: True if the database and semantic search are ready
+        """
+        return await self.run(self.retriever.warmup)
+
+    async def search(self, query: str, category: Optional[str] = None, top_k: int = 3,
+                     mode: str = "vector",
+                     query_embedding: Optional[Sequence[float]] = None) -> List[Dict[str, Any]]:
+        """
+        Search for relevant knowledge chunks without blocking the event loop.
+
+        Unless the caller passes its embedding, the query is first encoded by
+        the micro-batcher together with those of concurrent searches; the
+        search itself then finds the embedding in the shared query cache.
+
+        Args:
+            query (str): The search query
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return (default: 3)
+            mode (str): "vector", "keyword" or "hybrid" (default: "vector")
+            query_embedding (Sequence[float], optional): Embedding of the query
+                                                         computed by the caller
+
+        Returns:
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity scores
+        """
+        if query_embedding is not None:
+            return await self.run(self.retriever.search, query, category, top_k, mode=mode,
+                                  query_embedding=query_embedding)
+        if (self.query_batcher is not None and mode != "keyword"
+                and self.retriever.database_available and self.retriever.embedding_available):
+            try:
+                await self.query_batcher.encode(query)
+            except Exception as e:
+                # The search falls back to keyword search on its own
+                logger.warning(f"Batched query encoding failed: {e}")
+        return await self.run(self.retriever.search, query, category, top_k, mode=mode)
+
+    async def search_by_vector(self, query_embedding: Sequence[float], category: Optional[str] = None,
+                               top_k: int = 3, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search with a query embedding the caller already has, on the pool.
+
+        Args:
+            query_embedding (Sequence[float]): The query embedding
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return (default: 3)
+            query (str, optional): The query text; if given, the search is hybrid
+
+        Returns:
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity scores
+        """
+        return await self.run(self.retriever.search_by_vector, query_embedding, category, top_k, query)
+
+    async def search_many(self, queries: List[str], category: Optional[str] = None,
+                          top_k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries in one batched call on the pool.
+
+        Args:
+            queries (List[str]): The search queries
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return per query (default: 3)
+
+        Returns:
+            List[List[Dict[str, Any]]]: One result list per query, in query order
+        """
+        return await self.run(self.retriever.search_many, queries, category, top_k)
+
+    async def update_usage_statistics(self, chunk_id: int, effectiveness_score: float = 0.0) -> None:
+        """
+        Update usage statistics for a knowledge chunk on the pool.
+
+        Args:
+            chunk_id (int): The ID of the knowledge chunk
+            effectiveness_score (float): The effectiveness score (0.0-1.0)
+        """
+        await self.run(self.retriever.update_usage_statistics, chunk_id, effectiveness_score)
+
+    async def record_usage(self, chunk_ids: Sequence[int], effectiveness_score: float = 0.0) -> None:
+        """
+        Record usage statistics for several chunks without waiting for the database.
+
+        The updates are buffered by the retriever's usage recorder and written
+        in the background, so this never occupies a pool worker.
+
+        Args:
+            chunk_ids (Sequence[int]): IDs of the knowledge chunks used
+            effectiveness_score (float): The effectiveness score (0.0-1.0)
+        """
+        self.retriever.record_usage(chunk_ids, effectiveness_score)
+
+    async def get_categories(self) -> List[str]:
+        """
+        Get all available knowledge categories.
+
+        Returns:
+            List[str]: List of unique category names
+        """
+        return await self.run(self.retriever.get_categories)
+
+    async def get_most_effective_knowledge(self, category: Optional[str] = None,
+                                           limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get the most effective knowledge chunks.
+
+        Args:
+            category (str, optional): Filter by knowledge category
+            limit (int): Maximum number of results to return
+
+        Returns:
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and effectiveness scores
+        """
+        return await self.run(self.retriever.get_most_effective_knowledge, category, limit)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the thread pool and write pending usage statistics.
+
+        Args:
+            wait (bool): Wait for queued retrieval calls to finish
+        """
+        self._executor.shutdown(wait=wait)
+        self.retriever.close()
+        logger.info("Knowledge retrieval pool shut down")
@@ -0,0 +1,204 @@
+"""
+Bulk Embedding Module for Utah Teacher Training Assistant (UTTA)
+
+One ``encode`` call only uses the intra-op threads of a single process, which
+leaves most cores of an ingestion host idle during large re-embedding jobs.
+This module spreads a corpus over a pool of worker processes, each with its
+own copy of the model and an even share of the cores. Texts are streamed to
+the workers in chunks (at most two chunks per worker in flight, so memory
+stays bounded), rows are written straight into the output array or ``.npy``
+file at their input position, and progress is reported as chunks finish.
+
+Classes:
+    BulkEncoder: Process-pool encoder for large corpora.
+
+Example:
+    with BulkEncoder("all-MiniLM-L6-v2", num_workers=8) as encoder:
+        embeddings = encoder.encode(texts, output="corpus_embeddings.npy")
+"""
+
+import os
+import sys
+import time
+import logging
+import functools
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from ._config import SCENARIO_CONFIG
+from .model_registry import get_model
+
+logger = logging.getLogger(__name__)
+
+# Model held by a worker process, loaded by _load_worker_model
+_worker_model = None
+
+
+def _load_worker_model(model_name: str, backend: Optional[str], threads: int) -> None:
+    """Worker initializer: load the model with the worker's share of the cores."""
+    global _worker_model
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    _worker_model = get_model(model_name, backend)
+    # Loaded by sentence_transformers for the torch backend
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def _encode_chunk(texts: List[str], batch_size: int) -> np.ndarray:
+    """Encode one chunk in a worker and normalize its rows."""
+    embeddings = np.asarray(_worker_model.encode(texts, batch_size=batch_size), dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def _log_progress(done: int, total: int, elapsed: float) -> None:
+    logger.info(f"Encoded {done}/{total} texts ({done / max(elapsed, 1e-9):.0f} texts/s)")
+
+
+class BulkEncoder:
+    """
+    Encodes large corpora on a pool of model worker processes.
+
+    Workers are started with ``spawn`` on first use (forking a process that
+    already runs PyTorch threads is unsafe) and each loads the model once.
+    Output rows are unit length, like EmbeddingGenerator.embed_batch.
+
+    Attributes:
+        model_name (str): Name of the sentence transformer model
+        backend (Optional[str]): Engine running the model (None: configured default)
+        num_workers (int): Worker processes
+        chunk_size (int): Texts sent to a worker at a time
+        batch_size (int): Texts per encode batch inside a worker
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", backend: Optional[str] = None,
+                 num_workers: Optional[int] = None, chunk_size: int = 1024,
+                 batch_size: int = SCENARIO_CONFIG["batch_size"]):
+        """
+        Initialize the encoder; worker processes start on first use.
+
+        Args:
+            model_name (str): Name of the sentence transformer model
+            backend (str, optional): "torch", "onnx" or "onnx-int8"
+            num_workers (int, optional): Worker processes (default: one per 4 cores)
+            chunk_size (int): Texts sent to a worker at a time
+            batch_size (int): Texts per encode batch inside a worker
+
+        Raises:
+            ValueError: If num_workers or chunk_size is less than 1
+        """
+        cores = os.cpu_count() or 1
+        num_workers = num_workers or max(1, cores // 4)
+        if num_workers < 1 or chunk_size < 1:
+            raise ValueError("num_workers and chunk_size must be at least 1")
+        self.model_name = model_name
+        self.backend = backend
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self._threads = max(1, cores // num_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.num_workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_worker_model, initargs=(self.model_name, self.backend, self._threads)
+            )
+        return self._executor
+
+    def encode(self, texts: Iterable[str], output: Union[str, np.ndarray, None] = None,
+               total: Optional[int] = None,
+               progress: Optional[Callable[[int, int, float], None]] = _log_progress) -> np.ndarray:
+        """
+        Encode a corpus in input order.
+
+        Args:
+            texts (Iterable[str]): The texts; a generator is streamed without
+                                   being materialized if ``total`` is given
+            output (Union[str, np.ndarray, None]): Where to write the rows: a
+                path to a ``.npy`` file (memory-mapped, so the corpus never has to
+                fit in memory), a float32 array of shape (total, dim), or None
+                to allocate an array
+            total (int, optional): Number of texts; required for generators
+            progress (Callable[[int, int, float], None], optional): Called with
+                (texts done, total, seconds elapsed) after every chunk
+
+        Returns:
+            np.ndarray: The (total, dim) float32 embeddings (a memmap for ``.npy`` output)
+
+        Raises:
+            ValueError: If an output array has the wrong number of rows
+        """
+        if total is None:
+            texts = texts if hasattr(texts, "__len__") else list(texts)
+            total = len(texts)
+        if total == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        stream = iter(texts)
+        executor = self._pool()
+        submit = functools.partial(executor.submit, _encode_chunk, batch_size=self.batch_size)
+        start = time.perf_counter()
+        in_flight: Dict = {}
+        position = 0
+        done = 0
+        result = output if isinstance(output, np.ndarray) else None
+        if result is not None and len(result) != total:
+            raise ValueError(f"Output array has {len(result)} rows for {total} texts")
+
+        try:
+            while True:
+                # Keep two chunks per worker queued so no worker waits for input
+                while len(in_flight) < 2 * self.num_workers:
+                    chunk = list(islice(stream, self.chunk_size))
+                    if not chunk:
+                        break
+                    in_flight[submit(chunk)] = position
+                    position += len(chunk)
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    offset = in_flight.pop(future)
+                    rows = future.result()
+                    if result is None:
+                        result = self._allocate(output, total, rows.shape[1])
+                    result[offset:offset + len(rows)] = rows
+                    done += len(rows)
+                    if progress is not None:
+                        progress(done, total, time.perf_counter() - start)
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+        if done != total:
+            raise ValueError(f"Expected {total} texts but encoded {done}")
+
+        if isinstance(result, np.memmap):
+            result.flush()
+        return result
+
+    @staticmethod
+    def _allocate(output: Optional[str], total: int, dimension: int) -> np.ndarray:
+        """Create the output array once the embedding dimension is known."""
+        if output is None:
+            return np.empty((total, dimension), dtype=np.float32)
+        return np.lib.format.open_memmap(str(output), mode="w+", dtype=np.float32, shape=(total, dimension))
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "BulkEncoder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
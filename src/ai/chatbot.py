@@ -1,9 +1,7 @@
-from langchain_ollama import OllamaLLM
 from typing import Dict, List, Optional
 import json
 import logging
 from .rag_pipeline import RAGPipeline
-from .knowledge_retriever import KnowledgeRetriever
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,6 +10,8 @@ class TeacherTrainingChatbot:
     def __init__(self):
         """Initialize the teacher training chatbot with Llama model and educational components"""
         try:
+            # Imported here so importing the module does not load langchain
+            from langchain_ollama import OllamaLLM
             self.llm = OllamaLLM(model="llama3.1")
             logger.info("Successfully initialized Llama model")
         except Exception as e:
@@ -21,8 +21,9 @@ class TeacherTrainingChatbot:
         # Initialize RAG pipeline with knowledge base integration
         self.rag_pipeline = RAGPipeline()
         
-        # Initialize knowledge retriever for direct knowledge access
-        self.knowledge_retriever = KnowledgeRetriever()
+        # Share the pipeline's knowledge retriever for direct knowledge access
+        self.knowledge_retriever = self.rag_pipeline.knowledge_retriever
+        self.async_retriever = self.rag_pipeline.async_retriever
         
         # Educational scenario categories
         self.categories = {
@@ -87,11 +88,15 @@ class TeacherTrainingChatbot:
         logger.info("Chatbot initialization complete")
         
         # Log knowledge base status
-        categories = self.knowledge_retriever.get_categories()
+        categories = await self.async_retriever.get_categories()
         if categories:
             logger.info(f"Knowledge base available with categories: {', '.join(categories)}")
         else:
             logger.warning("Knowledge base not available or empty")
+
+    async def warmup(self) -> bool:
+        """Load the embedding model and knowledge index before the first query"""
+        return await self.rag_pipeline.warmup()
             
     async def generate_response(self, query: str, context: Dict = None) -> Dict:
         """
@@ -171,7 +176,8 @@ class TeacherTrainingChatbot:
         """
         return self.knowledge_retriever.get_categories()
         
-    def search_knowledge(self, query: str, category: Optional[str] = None, top_k: int = 5) -> List[Dict]:
+    def search_knowledge(self, query: str, category: Optional[str] = None, top_k: int = 5,
+                         mode: str = "vector") -> List[Dict]:
         """
         Search the knowledge base for relevant information.
         
@@ -179,11 +185,28 @@ class TeacherTrainingChatbot:
             query (str): The search query
             category (str, optional): Filter by knowledge category
             top_k (int): Number of results to return
+            mode (str): "vector", "keyword" or "hybrid" retrieval
+            
+        Returns:
+            List[Dict]: List of knowledge chunks with metadata and similarity scores
+        """
+        return self.knowledge_retriever.search(query, category, top_k, mode=mode)
+
+    async def search_knowledge_async(self, query: str, category: Optional[str] = None, top_k: int = 5,
+                                     mode: str = "vector") -> List[Dict]:
+        """
+        Search the knowledge base without blocking the event loop.
+        
+        Args:
+            query (str): The search query
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return
+            mode (str): "vector", "keyword" or "hybrid" retrieval
             
         Returns:
             List[Dict]: List of knowledge chunks with metadata and similarity scores
         """
-        return self.knowledge_retriever.search(query, category, top_k)
+        return await self.async_retriever.search(query, category, top_k, mode=mode)
         
     def get_most_effective_knowledge(self, category: Optional[str] = None, limit: int = 10) -> List[Dict]:
         """
@@ -0,0 +1,216 @@
+"""
+SQLite Connection Manager Module for Utah Teacher Training Assistant (UTTA)
+
+This module shares SQLite connections to the Educational Knowledge Base across
+calls instead of opening and closing one per query. The database is switched to
+WAL journal mode so readers never block the writer (or each other). Every
+thread gets its own long-lived read-only connection, opened with ``mode=ro``
+and tuned with ``mmap_size`` and ``cache_size`` so hot pages stay cached
+between queries. All writes go through one connection guarded by a lock, so
+writers in this process queue up instead of failing with "database is locked".
+Readers of threads that have exited are closed when the next reader opens, so
+short-lived threads do not leak file handles. A database the process cannot
+write to is served read-only and keeps its journal mode.
+
+Classes:
+    SQLiteConnectionManager: Thread-local readers and a single serialized writer.
+
+Functions:
+    get_connection_manager: Return the process-wide manager for a database file.
+
+Example:
+    db = get_connection_manager("knowledge_base/vector_db.sqlite")
+    with db.reader() as conn:
+        categories = conn.execute("SELECT DISTINCT category FROM chunks").fetchall()
+    with db.writer() as conn:
+        conn.execute("UPDATE chunks SET usage_count = usage_count + 1 WHERE id = ?", (7,))
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+
+from ._config import SCENARIO_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteConnectionManager:
+    """
+    Pooled connections to one SQLite database file.
+
+    Read connections are thread-local and read-only; the single write
+    connection is shared and serialized with a lock. Connections are reopened
+    after ``fork`` so worker processes never reuse their parent's handles.
+
+    Attributes:
+        db_path (str): Path to the SQLite database
+        mmap_size (int): Bytes of the database file memory-mapped per connection
+        cache_size_kb (int): Page cache size per connection in KiB
+        busy_timeout_ms (int): How long to wait for locks held by other processes
+        wal_enabled (bool): Whether the database is in WAL journal mode
+        read_only (bool): Whether the database file or its directory is not writable
+    """
+
+    def __init__(self, db_path: str,
+                 mmap_size: int = SCENARIO_CONFIG["sqlite_mmap_size"],
+                 cache_size_kb: int = SCENARIO_CONFIG["sqlite_cache_size_kb"],
+                 busy_timeout_ms: int = 5000):
+        """
+        Initialize the manager and switch the database to WAL mode.
+
+        Args:
+            db_path (str): Path to an existing SQLite database
+            mmap_size (int): Bytes of the database file memory-mapped per connection
+            cache_size_kb (int): Page cache size per connection in KiB
+            busy_timeout_ms (int): How long to wait for locks held by other processes
+        """
+        self.db_path = str(db_path)
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.busy_timeout_ms = busy_timeout_ms
+        self.wal_enabled = False
+        # WAL and rollback journals both need to create files next to the database
+        self.read_only = not (os.access(self.db_path, os.W_OK)
+                              and os.access(os.path.dirname(os.path.abspath(self.db_path)), os.W_OK))
+        self._write_lock = threading.RLock()
+        self._readers_lock = threading.Lock()
+        self._reset()
+        self._enable_wal()
+
+    def _reset(self) -> None:
+        """Forget every connection (used at start-up and after fork)."""
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._readers: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._writer = None
+
+    def _check_fork(self) -> None:
+        """Drop connections inherited from a parent process."""
+        if self._pid != os.getpid():
+            self._reset()
+
+    def _tune(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        """Apply the per-connection PRAGMAs."""
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_size_kb)}")
+        return conn
+
+    def _enable_wal(self) -> None:
+        """Switch the database to WAL mode; read-only files keep their journal mode."""
+        if self.read_only:
+            logger.info(f"{self.db_path} is read-only; serving it without WAL mode")
+            return
+        try:
+            with self.writer() as conn:
+                mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            self.wal_enabled = mode.lower() == "wal"
+        except sqlite3.Error as e:
+            logger.warning(f"Could not enable WAL mode for {self.db_path}: {e}")
+        if not self.wal_enabled:
+            logger.warning(f"{self.db_path} is not in WAL mode; readers may block writers")
+
+    def _open_reader(self) -> sqlite3.Connection:
+        """Open a read-only connection for the calling thread."""
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        # Connections are only used by the thread that opened them; close()
+        # may run on another thread, hence check_same_thread=False
+        conn = self._tune(sqlite3.connect(uri, uri=True, check_same_thread=False))
+        conn.execute("PRAGMA query_only = 1")
+        with self._readers_lock:
+            dead = [thread for thread in self._readers if not thread.is_alive()]
+            stale = [self._readers.pop(thread) for thread in dead]
+            self._readers[threading.current_thread()] = conn
+        for reader in stale:
+            reader.close()
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow the calling thread's read-only connection.
+
+        Any transaction left open by the caller (e.g. an explicit ``BEGIN`` for
+        a consistent multi-statement read) is ended on exit.
+
+        Yields:
+            sqlite3.Connection: A read-only connection owned by this thread
+        """
+        self._check_fork()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow the single write connection.
+
+        Writers from every thread are serialized on a lock. The transaction is
+        committed when the block exits normally and rolled back on an exception.
+
+        Yields:
+            sqlite3.Connection: The write connection
+        """
+        self._check_fork()
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._tune(sqlite3.connect(self.db_path, check_same_thread=False))
+            try:
+                yield self._writer
+                if self._writer.in_transaction:
+                    self._writer.commit()
+            except BaseException:
+                if self._writer.in_transaction:
+                    self._writer.rollback()
+                raise
+
+    def close(self) -> None:
+        """Close every connection opened by this process."""
+        if self._pid != os.getpid():
+            self._reset()
+            return
+        with self._readers_lock:
+            readers, self._readers = self._readers, {}
+        for conn in readers.values():
+            conn.close()
+        self._local = threading.local()
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+_managers: Dict[str, SQLiteConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: str) -> SQLiteConnectionManager:
+    """
+    Return the process-wide connection manager for a database file.
+
+    Every KnowledgeRetriever (and index) over the same file shares one writer,
+    so their writes are serialized with each other.
+
+    Args:
+        db_path (str): Path to an existing SQLite database
+
+    Returns:
+        SQLiteConnectionManager: The shared manager
+    """
+    key = os.path.realpath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = SQLiteConnectionManager(db_path)
+        return manager
@@ -0,0 +1,262 @@
+"""
+Persistent Embedding Cache Module for Utah Teacher Training Assistant (UTTA)
+
+This module stores embeddings on disk so texts that were encoded once
+(scenario descriptions, expected responses, RAG documents) are not encoded
+again after a restart or rebuild. Entries are content-addressed: the key is
+the model (see model_registry.model_key) and the SHA-256 of the exact text,
+so an edited text is a miss and a different model or backend never serves
+another one's vectors. Embeddings are stored as raw float32 blobs in a
+SQLite table; when the table outgrows ``max_entries`` the least recently
+used entries are deleted.
+
+Classes:
+    DiskEmbeddingCache: SQLite-backed embedding cache with batch lookup and LRU eviction.
+
+Functions:
+    get_disk_embedding_cache: Return the process-wide cache for a file.
+
+Example:
+    cache = get_disk_embedding_cache("data/embedding_cache.sqlite")
+    embeddings = cache.get_or_encode_many("all-MiniLM-L6-v2", texts, model.encode)
+    print(cache.stats())
+"""
+
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ._config import SCENARIO_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CACHE_TABLE = "embedding_cache"
+
+_CACHE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {CACHE_TABLE} (
+    model TEXT NOT NULL,
+    text_hash BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_{CACHE_TABLE}_last_used ON {CACHE_TABLE}(last_used);
+"""
+
+# Keys per SELECT ... IN (...) statement, below SQLite's bound-parameter limit
+_LOOKUP_BATCH = 500
+
+
+class DiskEmbeddingCache:
+    """
+    A persistent, size-bounded embedding cache in a SQLite file.
+
+    All access goes through one connection guarded by a lock; the file is in
+    WAL mode with a busy timeout, so several processes can share it.
+    Eviction removes the least recently used entries down to 90% of
+    ``max_entries``, so it runs once per many inserts rather than on each.
+
+    Attributes:
+        path (str): Path to the cache file
+        max_entries (int): Maximum number of stored embeddings
+        hits (int): Number of lookups served from disk
+        misses (int): Number of lookups that required encoding
+        evictions (int): Number of entries deleted to stay within max_entries
+    """
+
+    def __init__(self, path: str, max_entries: int = SCENARIO_CONFIG["embedding_cache_size"]):
+        """
+        Open (or create) a cache file.
+
+        Args:
+            path (str): Path to the cache file; parent directories are created
+            max_entries (int): Maximum number of stored embeddings
+        """
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_CACHE_SCHEMA)
+        self._size = self._conn.execute(f"SELECT COUNT(*) FROM {CACHE_TABLE}").fetchone()[0]
+
+    @staticmethod
+    def text_hash(text: str) -> bytes:
+        """
+        Return the content address of a text.
+
+        Args:
+            text (str): The exact text that was encoded
+
+        Returns:
+            bytes: SHA-256 digest of the UTF-8 text
+        """
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up the embeddings of several texts.
+
+        Args:
+            model_name (str): Key of the model that produced the embeddings
+            texts (Sequence[str]): The texts
+
+        Returns:
+            List[Optional[np.ndarray]]: A read-only float32 vector per text, or None on a miss
+        """
+        hashes = [self.text_hash(text) for text in texts]
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_BATCH):
+                batch = unique[start:start + _LOOKUP_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM {CACHE_TABLE} "
+                    f"WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model_name, *batch]
+                ).fetchall()
+                found.update((digest, np.frombuffer(vector, dtype=np.float32)) for digest, vector in rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    f"UPDATE {CACHE_TABLE} SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model_name, digest) for digest in found]
+                )
+            results = [found.get(digest) for digest in hashes]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, model_name: str, texts: Sequence[str], embeddings: np.ndarray) -> None:
+        """
+        Store embeddings, evicting least recently used entries if the cache is full.
+
+        Args:
+            model_name (str): Key of the model that produced the embeddings
+            texts (Sequence[str]): The texts that were encoded
+            embeddings (np.ndarray): One embedding row per text
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        now = time.time()
+        rows = [(model_name, self.text_hash(text), embedding.tobytes(), now)
+                for text, embedding in zip(texts, embeddings)]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO {CACHE_TABLE} (model, text_hash, vector, last_used) "
+                    f"VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._size += self._conn.total_changes - before
+                if self._size > self.max_entries:
+                    self._evict(self._size - int(self.max_entries * 0.9))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                self._size = self._conn.execute(f"SELECT COUNT(*) FROM {CACHE_TABLE}").fetchone()[0]
+                raise
+
+    def _evict(self, count: int) -> None:
+        """Delete the ``count`` least recently used entries (lock held, in a transaction)."""
+        self._conn.execute(
+            f"DELETE FROM {CACHE_TABLE} WHERE (model, text_hash) IN "
+            f"(SELECT model, text_hash FROM {CACHE_TABLE} ORDER BY last_used LIMIT ?)",
+            (count,)
+        )
+        self._size -= count
+        self.evictions += count
+
+    def get_or_encode_many(self, model_name: str, texts: Sequence[str],
+                           encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Return embeddings for several texts, encoding only the cache misses.
+
+        Misses are deduplicated and encoded in one call, then stored.
+
+        Args:
+            model_name (str): Key of the model used by ``encode``
+            texts (Sequence[str]): The texts
+            encode (Callable[[List[str]], np.ndarray]): Batch encoding function
+
+        Returns:
+            np.ndarray: float32 embedding matrix with one row per text, in input order
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        cached = self.get_many(model_name, texts)
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, cached) if embedding is None))
+        encoded = {}
+        if missing:
+            vectors = np.asarray(encode(missing), dtype=np.float32)
+            self.put_many(model_name, missing, vectors)
+            encoded = dict(zip(missing, vectors))
+        return np.stack([embedding if embedding is not None else encoded[text]
+                         for text, embedding in zip(texts, cached)])
+
+    def clear(self) -> None:
+        """Delete every stored embedding."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {CACHE_TABLE}")
+            self._size = 0
+
+    def close(self) -> None:
+        """Close the cache file."""
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report cache counters.
+
+        Returns:
+            Dict[str, float]: size, hits, misses, hit_rate and evictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+
+_caches: Dict[str, DiskEmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_disk_embedding_cache(path: Optional[str] = None) -> Optional[DiskEmbeddingCache]:
+    """
+    Return the process-wide cache for a file.
+
+    Args:
+        path (str, optional): Cache file; defaults to SCENARIO_CONFIG["embedding_cache_path"]
+
+    Returns:
+        Optional[DiskEmbeddingCache]: The shared cache, or None if no path is configured
+    """
+    path = path or SCENARIO_CONFIG["embedding_cache_path"]
+    if not path:
+        return None
+    key = str(Path(path).resolve())
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = DiskEmbeddingCache(key, SCENARIO_CONFIG["embedding_cache_size"])
+            logger.info(f"Opened embedding cache {key} ({cache.stats()['size']} entries)")
+        return cache
@@ -3,7 +3,11 @@ Embedding Generation Module for Teacher Training Chatbot
 
 This module handles the generation of embeddings for scenarios, responses, and queries
 using the SentenceTransformer model. It provides both single and batch embedding
-generation capabilities.
+generation capabilities. embed() and embed_batch() return float32 NumPy arrays;
+generate_embedding() and batch_generate_embeddings() wrap them for callers
+that need Python lists. Texts that miss the caches are encoded in batches of
+similar token length (see length_bucketing), so short texts are not padded to
+the length of long ones.
 
 Classes:
     EmbeddingGenerator: Main class for generating and managing embeddings.
@@ -11,10 +15,17 @@ Classes:
 Example:
     embedder = EmbeddingGenerator()
     embedding = embedder.generate_embedding("How to handle classroom disruption?")
+    matrix = embedder.embed_batch(["First text", "Second text"])  # float32, shape (2, 384)
 """
 
-from sentence_transformers import SentenceTransformer
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
 import numpy as np
+from .embedding_cache import get_query_embedding_cache
+from .disk_embedding_cache import get_disk_embedding_cache
+from .bulk_encoder import BulkEncoder
+from .length_bucketing import padding_stats, plan_buckets, token_lengths
+from .model_registry import get_model, model_key
 
 class EmbeddingGenerator:
     """
@@ -24,25 +35,199 @@ class EmbeddingGenerator:
     methods for generating embeddings for both single texts and batches.
     
     Attributes:
-        model (SentenceTransformer): The loaded sentence transformer model
+        model (SharedModel): The process-wide sentence transformer model,
+                             loaded on first use
+        model_name (str): Name of the loaded model
+        backend (str): "torch", "onnx" or "onnx-int8" (None: the configured backend)
         dimension (int): The dimension of generated embeddings (default: 384)
+        query_cache (QueryEmbeddingCache): Cache shared with KnowledgeRetriever
+        disk_cache (Optional[DiskEmbeddingCache]): Persistent cache consulted
+                                                   before the model, if configured
+        batch_size (int): Texts per length bucket sent to the model
+        max_tokens (Optional[int]): Padded-token budget per bucket instead of batch_size
+        last_padding_stats (Optional[Dict[str, float]]): Padding statistics of the
+                                                         last bucketed encode
     """
 
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', backend: str = None,
+                 cache_path: Optional[str] = None, batch_size: int = 32, max_tokens: Optional[int] = None):
         """
         Initialize the EmbeddingGenerator with a specified model.
 
         Args:
             model_name (str): Name of the sentence transformer model to use
                             Defaults to 'all-MiniLM-L6-v2'
+            backend (str): Engine running the model: "torch", "onnx" or
+                           "onnx-int8" (default: SCENARIO_CONFIG["embedding_backend"])
+            cache_path (str, optional): Persistent embedding cache file
+                                        (default: SCENARIO_CONFIG["embedding_cache_path"];
+                                        no disk cache if neither is set)
+            batch_size (int): Texts per length bucket sent to the model; with
+                              max_tokens, the most texts per bucket
+            max_tokens (int, optional): Padded-token budget per bucket
         """
-        self.model = SentenceTransformer(model_name)
+        self._model = None
+        self.model_name = model_name
+        self.backend = backend
         self.dimension = 384  # Default dimension for the specified model
+        self.query_cache = get_query_embedding_cache()
+        self.disk_cache = get_disk_embedding_cache(cache_path)
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.last_padding_stats: Optional[Dict[str, float]] = None
+
+    @property
+    def model(self):
+        """SharedModel: The shared model, loaded on first access."""
+        if self._model is None:
+            self._model = get_model(self.model_name, self.backend)
+        return self._model
+
+    def warmup(self) -> None:
+        """
+        Load the model and run one encode so the first real request is fast.
+        """
+        self.model.encode("warmup")
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Generate the embedding of a single text as a NumPy vector.
+
+        Args:
+            text (str): The input text to generate embedding for
+
+        Returns:
+            np.ndarray: Unit-length float32 vector of dimension self.dimension
+
+        Raises:
+            ValueError: If text is empty or not a string
+        """
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Input text must be a non-empty string")
+
+        embedding = self.query_cache.get_or_encode(
+            model_key(self.model_name, self.backend), text, lambda query: self._encode([query])[0]
+        )
+        return self._normalize_rows(np.array(embedding, dtype=np.float32, ndmin=2))[0]
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts as one contiguous array.
+
+        Texts missing from the caches go to the model in batches of similar
+        token length and every row is normalized in one vectorized step, so
+        no per-vector Python objects are created.
+
+        Args:
+            texts (Sequence[str]): Input texts to generate embeddings for
+
+        Returns:
+            np.ndarray: C-contiguous float32 array of shape (len(texts), self.dimension)
+                        with unit-length rows
+
+        Raises:
+            ValueError: If texts is empty or contains invalid entries
+        """
+        if len(texts) == 0 or not all(isinstance(t, str) and t.strip() for t in texts):
+            raise ValueError("All inputs must be non-empty strings")
+
+        embeddings = self._encode(list(texts))
+        return self._normalize_rows(np.asarray(embeddings, dtype=np.float32, order="C"))
+
+    def embed_queries(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Generate embeddings for several queries through the shared query cache.
+
+        Queries already in the cache are not encoded again; the rest go to
+        the model in one call. This is the batch encoder behind the
+        micro-batched query path of RAGPipeline.
+
+        Args:
+            texts (Sequence[str]): Query texts
+
+        Returns:
+            np.ndarray: float32 array of shape (len(texts), self.dimension) with unit-length rows
+
+        Raises:
+            ValueError: If texts is empty or contains invalid entries
+        """
+        if len(texts) == 0 or not all(isinstance(t, str) and t.strip() for t in texts):
+            raise ValueError("All inputs must be non-empty strings")
+
+        embeddings = self.query_cache.get_or_encode_many(model_key(self.model_name, self.backend), list(texts),
+                                                         self._encode)
+        return self._normalize_rows(np.array(embeddings, dtype=np.float32))
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts, serving those already in the disk cache without the model.
+
+        Args:
+            texts (List[str]): Input texts
+
+        Returns:
+            np.ndarray: One embedding row per text, in input order
+        """
+        if self.disk_cache is None:
+            return self._encode_bucketed(texts)
+        # Only misses reach the model, which is loaded on the first miss
+        return self.disk_cache.get_or_encode_many(model_key(self.model_name, self.backend), texts,
+                                                  self._encode_bucketed)
+
+    def _encode_bucketed(self, texts: List[str]) -> np.ndarray:
+        """
+        Run the model on texts grouped into buckets of similar token length.
+
+        The padding statistics of the plan are kept in last_padding_stats.
+
+        Args:
+            texts (List[str]): Input texts
+
+        Returns:
+            np.ndarray: One embedding row per text, in input order
+        """
+        if len(texts) < 2:
+            return self.model.encode(texts)
+        lengths = token_lengths(self.model.model, texts)
+        buckets = plan_buckets(lengths, self.batch_size, self.max_tokens,
+                               self.batch_size if self.max_tokens is not None else None)
+        embeddings = None
+        for bucket in buckets:
+            rows = np.asarray(self.model.encode([texts[i] for i in bucket], batch_size=len(bucket)),
+                              dtype=np.float32)
+            if embeddings is None:
+                embeddings = np.empty((len(texts), rows.shape[1]), dtype=np.float32)
+            embeddings[bucket] = rows
+        self.last_padding_stats = padding_stats(lengths, buckets, self.batch_size)
+        return embeddings
+
+    def embed_corpus(self, texts: Iterable[str], output: Union[str, np.ndarray, None] = None,
+                     num_workers: Optional[int] = None, total: Optional[int] = None) -> np.ndarray:
+        """
+        Generate embeddings for a large corpus on a pool of worker processes.
+
+        Use this for ingestion and re-embedding jobs; it bypasses the query and
+        disk caches. See BulkEncoder for details.
+
+        Args:
+            texts (Iterable[str]): Input texts, streamed to the workers in chunks
+            output (Union[str, np.ndarray, None]): ``.npy`` path or array to write
+                                                   the rows into (default: a new array)
+            num_workers (int, optional): Worker processes (default: one per 4 cores)
+            total (int, optional): Number of texts; required for generators
+
+        Returns:
+            np.ndarray: float32 array of shape (total, self.dimension) with unit-length rows
+        """
+        with BulkEncoder(self.model_name, self.backend, num_workers) as encoder:
+            return encoder.encode(texts, output, total)
 
     def generate_embedding(self, text: str) -> list:
         """
         Generate embedding for a single text input.
 
+        Compatibility wrapper around embed() for callers that need a list.
+
         Args:
             text (str): The input text to generate embedding for
 
@@ -52,16 +237,14 @@ class EmbeddingGenerator:
         Raises:
             ValueError: If text is empty or not a string
         """
-        if not isinstance(text, str) or not text.strip():
-            raise ValueError("Input text must be a non-empty string")
-        
-        embedding = self.model.encode(text)
-        return self._normalize_embedding(embedding)
+        return self.embed(text).tolist()
 
     def batch_generate_embeddings(self, texts: list) -> list:
         """
         Generate embeddings for multiple texts in batch.
 
+        Compatibility wrapper around embed_batch() for callers that need lists.
+
         Args:
             texts (list): List of input texts to generate embeddings for
 
@@ -71,25 +254,22 @@ class EmbeddingGenerator:
         Raises:
             ValueError: If texts is empty or contains invalid entries
         """
-        if not texts or not all(isinstance(t, str) and t.strip() for t in texts):
-            raise ValueError("All inputs must be non-empty strings")
-        
-        embeddings = self.model.encode(texts)
-        return [self._normalize_embedding(emb) for emb in embeddings]
+        return self.embed_batch(texts).tolist()
 
-    def _normalize_embedding(self, embedding: np.ndarray) -> list:
+    @staticmethod
+    def _normalize_rows(embeddings: np.ndarray) -> np.ndarray:
         """
-        Normalize an embedding vector to unit length.
+        Normalize every row of an embedding matrix to unit length, in place.
 
         Args:
-            embedding (np.ndarray): The embedding vector to normalize
+            embeddings (np.ndarray): Float32 array of shape (n, dimension)
 
         Returns:
-            list: Normalized embedding vector as a list
+            np.ndarray: The same array; all-zero rows are left unchanged
         """
-        norm = np.linalg.norm(embedding)
-        if norm > 0:
-            embedding = embedding / norm
-        return embedding.tolist()
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embeddings /= norms
+        return embeddings
 
 # ... existing code ... 
\ No newline at end of file
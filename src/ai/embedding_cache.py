@@ -0,0 +1,213 @@
+"""
+Query Embedding Cache Module for Utah Teacher Training Assistant (UTTA)
+
+This module provides a bounded in-process cache of query embeddings so that
+repeated queries (trainees re-running the same canned scenario prompts) do not
+re-run the sentence transformer. Entries are evicted least-recently-used first
+and expire after ``SCENARIO_CONFIG["cache_ttl"]`` seconds.
+
+Classes:
+    QueryEmbeddingCache: Thread-safe LRU/TTL cache keyed on (model, normalized text).
+
+Functions:
+    get_query_embedding_cache: Return the process-wide cache shared by
+                               EmbeddingGenerator and KnowledgeRetriever.
+
+Example:
+    cache = get_query_embedding_cache()
+    embedding = cache.get_or_encode("all-MiniLM-L6-v2", query, model.encode)
+    print(cache.stats())
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from ._config import SCENARIO_CONFIG
+
+
+class QueryEmbeddingCache:
+    """
+    A thread-safe LRU cache of query embeddings with a time-to-live.
+
+    Keys are (model name, normalized text). Text is normalized by collapsing
+    runs of whitespace, which the tokenizers drop anyway; case is kept, since
+    cased models embed "US" and "us" differently. Cached vectors are stored
+    read-only and returned without copying.
+
+    Attributes:
+        max_size (int): Maximum number of cached embeddings
+        ttl (float): Seconds an entry stays valid
+        hits (int): Number of lookups served from the cache
+        misses (int): Number of lookups that required encoding
+        evictions (int): Number of entries dropped because the cache was full
+        expirations (int): Number of entries dropped because they were too old
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size (int): Maximum number of cached embeddings
+            ttl (float): Seconds an entry stays valid
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize query text for use as a cache key.
+
+        Args:
+            text (str): The query text
+
+        Returns:
+            str: Text with runs of whitespace collapsed and ends stripped
+        """
+        return " ".join(text.split())
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        """
+        Look up a cached embedding.
+
+        Args:
+            model_name (str): Name of the model that produced the embedding
+            text (str): The query text
+
+        Returns:
+            Optional[np.ndarray]: The cached embedding, or None on a miss
+        """
+        key = (model_name, self.normalize(text))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                embedding, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, model_name: str, text: str, embedding: np.ndarray) -> np.ndarray:
+        """
+        Store an embedding, evicting the least recently used entries if full.
+
+        Args:
+            model_name (str): Name of the model that produced the embedding
+            text (str): The query text
+            embedding (np.ndarray): The embedding to cache
+
+        Returns:
+            np.ndarray: The stored (read-only) embedding
+        """
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        key = (model_name, self.normalize(text))
+        with self._lock:
+            self._entries[key] = (embedding, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return embedding
+
+    def get_or_encode(self, model_name: str, text: str,
+                      encode: Callable[[str], np.ndarray]) -> np.ndarray:
+        """
+        Return the cached embedding for a query, encoding and caching it on a miss.
+
+        Args:
+            model_name (str): Name of the model used by ``encode``
+            text (str): The query text
+            encode (Callable[[str], np.ndarray]): Function producing the embedding
+
+        Returns:
+            np.ndarray: The query embedding
+        """
+        embedding = self.get(model_name, text)
+        if embedding is None:
+            embedding = self.put(model_name, text, encode(text))
+        return embedding
+
+    def get_or_encode_many(self, model_name: str, texts: List[str],
+                           encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Return embeddings for several queries, encoding all misses in one batch.
+
+        Args:
+            model_name (str): Name of the model used by ``encode``
+            texts (List[str]): The query texts
+            encode (Callable[[List[str]], np.ndarray]): Batch encoding function
+
+        Returns:
+            np.ndarray: Embedding matrix with one row per query, in input order
+        """
+        embeddings = [self.get(model_name, text) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = encode([texts[i] for i in missing])
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = self.put(model_name, texts[i], embedding)
+        return np.stack(embeddings)
+
+    def clear(self) -> None:
+        """Remove every cached embedding."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report cache counters.
+
+        Returns:
+            Dict[str, float]: size, hits, misses, hit_rate, evictions and expirations
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """
+    Return the process-wide query embedding cache.
+
+    The cache is created on first use with ``SCENARIO_CONFIG["cache_ttl"]`` and
+    ``SCENARIO_CONFIG["query_cache_size"]``.
+
+    Returns:
+        QueryEmbeddingCache: The shared cache
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = QueryEmbeddingCache(
+                max_size=SCENARIO_CONFIG["query_cache_size"],
+                ttl=SCENARIO_CONFIG["cache_ttl"]
+            )
+        return _shared_cache
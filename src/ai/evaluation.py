@@ -60,7 +60,7 @@ class ResponseEvaluator:
             ValueError: If inputs are invalid
             RuntimeError: If evaluation fails
         """
-        response_embedding = self.embedder.generate_embedding(response)
+        response_embedding = self.embedder.embed(response)
         criteria = await self._get_evaluation_criteria(scenario)
         
         return {
@@ -0,0 +1,291 @@
+"""
+FAISS Vector Index Module for Utah Teacher Training Assistant (UTTA)
+
+This module provides an approximate nearest neighbour (ANN) index over the
+knowledge base embeddings using FAISS. The index is built from the
+``embeddings`` table, persisted next to ``vector_db.sqlite`` and loaded by
+KnowledgeRetriever when it runs with ``index_backend="faiss"``.
+
+FAISS is an optional dependency; ``FAISS_AVAILABLE`` is False when the
+``faiss`` package is not installed. It is only imported once an index is
+built or loaded, so importing this module stays cheap.
+
+Classes:
+    FaissVectorIndex: HNSW or IVF index with chunk-id mapping and category filtering.
+
+Example:
+    index = FaissVectorIndex.build("knowledge_base/vector_db.sqlite", index_type="hnsw")
+    index.save(FaissVectorIndex.default_index_path("knowledge_base/vector_db.sqlite"))
+    hits = index.search(query_embedding, category="classroom_management", top_k=3)
+"""
+
+import os
+import logging
+import importlib.util
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .vector_index import InMemoryVectorIndex
+
+FAISS_AVAILABLE = importlib.util.find_spec("faiss") is not None
+faiss = None
+
+logger = logging.getLogger(__name__)
+
+
+def _import_faiss():
+    """Import faiss on first use."""
+    global faiss
+    if faiss is None:
+        import faiss as faiss_module
+        faiss = faiss_module
+    return faiss
+
+
+class FaissVectorIndex:
+    """
+    An approximate nearest neighbour index over the knowledge base embeddings.
+
+    Vectors are L2-normalized before they are added, so the inner product
+    metric used by the index is the cosine similarity reported by the other
+    backends. The FAISS index stores chunk ids directly (``IndexIDMap2``);
+    categories are kept in a sorted sidecar array and applied inside the
+    search through an ``IDSelector`` over the category's chunk ids.
+
+    Attributes:
+        index (faiss.Index): The underlying FAISS index
+        ids (np.ndarray): Sorted chunk ids present in the index
+        categories (np.ndarray): Category of each id in ``ids``
+        num_vectors (int): Number of vectors in the index
+        kb_version (Optional[int]): Knowledge-base version the index was built at
+    """
+
+    INDEX_TYPES = ("hnsw", "ivf")
+
+    def __init__(self, index, ids: Sequence[int], categories: Sequence[Optional[str]]):
+        """
+        Initialize from an existing FAISS index and its id/category mapping.
+
+        Args:
+            index (faiss.Index): A FAISS index whose ids are chunk ids
+            ids (Sequence[int]): Chunk ids contained in the index
+            categories (Sequence[Optional[str]]): Category for each chunk id
+
+        Raises:
+            ImportError: If faiss is not installed
+        """
+        if not FAISS_AVAILABLE:
+            raise ImportError("faiss is required for FaissVectorIndex (pip install faiss-cpu)")
+        _import_faiss()
+        ids = np.asarray(ids, dtype=np.int64)
+        categories = np.asarray(categories, dtype=object)
+        order = np.argsort(ids)
+        self.index = index
+        self.ids = ids[order]
+        self.categories = categories[order]
+        self.num_vectors = int(index.ntotal)
+        self.kb_version = None
+        self._selectors = {}
+        self.set_search_effort(64)
+
+    @staticmethod
+    def default_index_path(db_path: str) -> str:
+        """
+        Return the conventional index location for a vector database.
+
+        Args:
+            db_path (str): Path to the vector database
+
+        Returns:
+            str: ``vector_db.faiss`` next to ``vector_db.sqlite``
+        """
+        return os.path.splitext(db_path)[0] + ".faiss"
+
+    @staticmethod
+    def _meta_path(index_path: str) -> str:
+        """Return the path of the id/category sidecar for an index file."""
+        return index_path + ".meta.npz"
+
+    @classmethod
+    def build(cls, db_path: str, index_type: str = "hnsw", hnsw_m: int = 32,
+              ef_construction: int = 200, nlist: Optional[int] = None) -> "FaissVectorIndex":
+        """
+        Build a new index from the ``embeddings`` table.
+
+        Args:
+            db_path (str): Path to the vector database
+            index_type (str): "hnsw" (graph index) or "ivf" (inverted lists)
+            hnsw_m (int): Graph degree for HNSW indexes
+            ef_construction (int): Build-time search depth for HNSW indexes
+            nlist (int, optional): Number of IVF cells; defaults to about 4 * sqrt(n)
+
+        Returns:
+            FaissVectorIndex: The built index
+
+        Raises:
+            ValueError: If the index type is unknown or the database has no embeddings
+        """
+        if index_type not in cls.INDEX_TYPES:
+            raise ValueError(f"Unsupported FAISS index type: {index_type}")
+        if not FAISS_AVAILABLE:
+            raise ImportError("faiss is required for FaissVectorIndex (pip install faiss-cpu)")
+        _import_faiss()
+
+        source = InMemoryVectorIndex.from_database(db_path)
+        if len(source) == 0:
+            raise ValueError(f"No embeddings found in {db_path}")
+
+        vectors = np.array(source.matrix, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        dimension = vectors.shape[1]
+
+        if index_type == "hnsw":
+            base = faiss.IndexHNSWFlat(dimension, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efConstruction = ef_construction
+        else:
+            nlist = nlist or max(1, min(len(source) // 39, int(4 * np.sqrt(len(source)))))
+            quantizer = faiss.IndexFlatIP(dimension)
+            base = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+            base.train(vectors)
+
+        index = faiss.IndexIDMap2(base)
+        index.add_with_ids(vectors, source.ids)
+        logger.info(f"Built FAISS {index_type} index with {index.ntotal} vectors from {db_path}")
+        built = cls(index, source.ids, source.categories)
+        built.kb_version = source.kb_version
+        return built
+
+    def save(self, index_path: str) -> None:
+        """
+        Write the index and its id/category sidecar to disk.
+
+        Args:
+            index_path (str): Destination of the FAISS index file
+        """
+        faiss.write_index(self.index, index_path)
+        categories = np.array(["" if c is None else c for c in self.categories], dtype=str)
+        np.savez(self._meta_path(index_path), ids=self.ids, categories=categories,
+                 num_vectors=self.num_vectors,
+                 kb_version=-1 if self.kb_version is None else self.kb_version)
+        logger.info(f"Saved FAISS index to {index_path}")
+
+    @classmethod
+    def load(cls, index_path: str) -> "FaissVectorIndex":
+        """
+        Load an index previously written with ``save``.
+
+        Args:
+            index_path (str): Path of the FAISS index file
+
+        Returns:
+            FaissVectorIndex: The loaded index
+        """
+        if not FAISS_AVAILABLE:
+            raise ImportError("faiss is required for FaissVectorIndex (pip install faiss-cpu)")
+        _import_faiss()
+        index = faiss.read_index(index_path)
+        with np.load(cls._meta_path(index_path)) as meta:
+            ids = meta["ids"]
+            categories = [c or None for c in meta["categories"].tolist()]
+            kb_version = int(meta["kb_version"]) if "kb_version" in meta else -1
+        logger.info(f"Loaded FAISS index with {index.ntotal} vectors from {index_path}")
+        loaded = cls(index, ids, categories)
+        loaded.kb_version = None if kb_version < 0 else kb_version
+        return loaded
+
+    def __len__(self) -> int:
+        return self.num_vectors
+
+    def set_search_effort(self, effort: int) -> None:
+        """
+        Set the speed/recall trade-off used at query time.
+
+        Args:
+            effort (int): ``efSearch`` for HNSW indexes, ``nprobe`` (divided by 8)
+                          for IVF indexes
+        """
+        base = faiss.downcast_index(self.index.index)
+        if isinstance(base, faiss.IndexHNSW):
+            base.hnsw.efSearch = effort
+        elif isinstance(base, faiss.IndexIVF):
+            base.nprobe = max(1, min(base.nlist, effort // 8))
+
+    def _category_selector(self, category: str) -> Tuple[int, object]:
+        """Return the number of chunks in a category and an IDSelector over their ids."""
+        if category not in self._selectors:
+            category_ids = np.ascontiguousarray(self.ids[self.categories == category])
+            selector = faiss.IDSelectorBatch(len(category_ids), faiss.swig_ptr(category_ids))
+            self._selectors[category] = (len(category_ids), selector)
+        return self._selectors[category]
+
+    def _search_params(self, selector):
+        """Build search parameters carrying the current search effort and a selector."""
+        base = faiss.downcast_index(self.index.index)
+        if isinstance(base, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW()
+            params.efSearch = base.hnsw.efSearch
+        elif isinstance(base, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF()
+            params.nprobe = base.nprobe
+        else:
+            params = faiss.SearchParameters()
+        params.sel = selector
+        return params
+
+    def search(self, query_embedding: np.ndarray, category: Optional[str] = None,
+               top_k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Find the chunks most similar to a query embedding.
+
+        Args:
+            query_embedding (np.ndarray): The query vector
+            category (str, optional): Only consider chunks from this category
+            top_k (int): Number of results to return
+
+        Returns:
+            List[Tuple[int, float]]: (chunk id, cosine similarity) pairs,
+                                     most similar first
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        return self.search_batch(query, category, top_k)[0]
+
+    def search_batch(self, query_embeddings: np.ndarray, category: Optional[str] = None,
+                     top_k: int = 3) -> List[List[Tuple[int, float]]]:
+        """
+        Find the most similar chunks for several query embeddings at once.
+
+        Either way this is a single FAISS search. A category filter is passed
+        to FAISS as an ``IDSelector``, so the graph or inverted lists are only
+        scored against chunks of that category and no over-fetching is needed.
+
+        Args:
+            query_embeddings (np.ndarray): Query matrix of shape (m, dimension)
+            category (str, optional): Only consider chunks from this category
+            top_k (int): Number of results to return per query
+
+        Returns:
+            List[List[Tuple[int, float]]]: One list of (chunk id, cosine similarity)
+                                           pairs per query, most similar first
+        """
+        queries = np.array(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        if self.num_vectors == 0 or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+        faiss.normalize_L2(queries)
+
+        if category is None:
+            scores, chunk_ids = self.index.search(queries, min(self.num_vectors, top_k))
+        else:
+            category_size, selector = self._category_selector(category)
+            if category_size == 0:
+                return [[] for _ in range(len(queries))]
+            scores, chunk_ids = self.index.search(queries, min(category_size, top_k),
+                                                  params=self._search_params(selector))
+
+        results = []
+        for row_scores, row_ids in zip(scores, chunk_ids):
+            valid = row_ids >= 0
+            results.append([(int(i), float(s)) for i, s in zip(row_ids[valid], row_scores[valid])])
+        return results
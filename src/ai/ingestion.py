@@ -0,0 +1,404 @@
+"""
+Knowledge Base Ingestion Module for Utah Teacher Training Assistant (UTTA)
+
+This module populates the ``chunks`` and ``embeddings`` tables that
+KnowledgeRetriever searches. Source documents are streamed one at a time,
+split into overlapping chunks and embedded in large batches with the shared
+model. Every chunk's content hash is stored in ``chunk_hashes`` with its
+source and position. Re-ingesting a corpus matches chunks by source and
+content hash, so only new or changed text is embedded. An edit that shifts
+later chunks to other positions does not re-embed them; unchanged chunks keep
+their id and usage statistics. All writes of a run are bulk ``executemany``
+statements inside one transaction.
+
+Functions:
+    ensure_knowledge_schema: Create the chunks, embeddings and chunk_hashes tables.
+    chunk_text: Split a document into overlapping chunks on paragraph boundaries.
+    content_hash: Hash a chunk's text.
+    iter_documents: Stream documents from text, Markdown and JSON Lines files.
+    shard_for_source: Shard index a source document is ingested into.
+    ingest_documents: Chunk, embed and store documents incrementally.
+
+Example:
+    conn = sqlite3.connect("knowledge_base/vector_db.sqlite")
+    stats = ingest_documents(conn, iter_documents(["data/knowledge"]))
+    print(f"Embedded {stats['embedded']} chunks, skipped {stats['unchanged']}")
+"""
+
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ._config import SCENARIO_CONFIG
+from .model_registry import get_model, model_key
+
+logger = logging.getLogger(__name__)
+
+CHUNK_HASH_TABLE = "chunk_hashes"
+DEFAULT_CATEGORY = "general"
+DOCUMENT_SUFFIXES = (".txt", ".md", ".jsonl")
+
+_KNOWLEDGE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS chunks (
+        id INTEGER PRIMARY KEY, text TEXT, metadata TEXT, category TEXT,
+        usage_count INTEGER DEFAULT 0, effectiveness_score REAL DEFAULT 0.0
+    )""",
+    "CREATE TABLE IF NOT EXISTS embeddings (chunk_id INTEGER PRIMARY KEY, vector BLOB)",
+    f"""CREATE TABLE IF NOT EXISTS {CHUNK_HASH_TABLE} (
+        chunk_id INTEGER PRIMARY KEY, source TEXT NOT NULL, position INTEGER NOT NULL,
+        content_hash TEXT NOT NULL, model TEXT NOT NULL, UNIQUE (source, position)
+    )""",
+]
+
+
+def ensure_knowledge_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create the chunks, embeddings and chunk_hashes tables if they are missing.
+
+    Args:
+        conn (sqlite3.Connection): Writable connection to the vector database
+    """
+    with conn:
+        for statement in _KNOWLEDGE_SCHEMA:
+            conn.execute(statement)
+
+
+def content_hash(text: str) -> str:
+    """
+    Hash a chunk's text.
+
+    Args:
+        text (str): The chunk text
+
+    Returns:
+        str: Hex SHA-256 digest of the UTF-8 text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_text(text: str, chunk_size: int = SCENARIO_CONFIG["chunk_size"],
+               chunk_overlap: int = SCENARIO_CONFIG["chunk_overlap"]) -> List[str]:
+    """
+    Split a document into chunks of at most ``chunk_size`` characters.
+
+    Paragraphs are packed into a chunk until it is full; the next chunk starts
+    with the trailing paragraphs of the previous one that fit in
+    ``chunk_overlap`` characters. Paragraphs longer than a chunk are split on
+    word boundaries.
+
+    Args:
+        text (str): The document text
+        chunk_size (int): Maximum chunk length in characters
+        chunk_overlap (int): Characters of context repeated between chunks
+
+    Returns:
+        List[str]: The chunks, in document order
+
+    Raises:
+        ValueError: If chunk_overlap is not smaller than chunk_size
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+
+    pieces = []
+    for paragraph in text.split("\n\n"):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        while len(paragraph) > chunk_size:
+            cut = paragraph.rfind(" ", 0, chunk_size + 1)
+            cut = cut if cut > 0 else chunk_size
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        if paragraph:
+            pieces.append(paragraph)
+
+    chunks = []
+    current: List[str] = []
+    length = 0
+    for piece in pieces:
+        if current and length + 2 + len(piece) > chunk_size:
+            chunks.append("\n\n".join(current))
+            # Carry trailing pieces over as overlap
+            overlap: List[str] = []
+            overlap_length = 0
+            for previous in reversed(current):
+                if overlap_length + len(previous) + 2 > chunk_overlap:
+                    break
+                overlap.insert(0, previous)
+                overlap_length += len(previous) + 2
+            current, length = overlap, max(overlap_length - 2, 0)
+            if current and length + 2 + len(piece) > chunk_size:
+                current, length = [], 0
+        length += (2 if current else 0) + len(piece)
+        current.append(piece)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def shard_for_source(source: str, num_shards: int) -> int:
+    """
+    Return the shard a source document belongs to in a sharded knowledge base.
+
+    Args:
+        source (str): The document's source identifier
+        num_shards (int): Number of shards
+
+    Returns:
+        int: Shard index in ``range(num_shards)``; stable across processes
+    """
+    return zlib.crc32(source.encode("utf-8")) % num_shards
+
+
+def _next_chunk_id(current_max: int, shard_index: int, num_shards: int) -> int:
+    """Smallest chunk id above current_max that is congruent to shard_index modulo num_shards."""
+    candidate = current_max + 1
+    return candidate + (shard_index - candidate) % num_shards
+
+
+def iter_documents(paths: Sequence[str], default_category: str = DEFAULT_CATEGORY) -> Iterator[Dict[str, Any]]:
+    """
+    Stream documents from files and directories, one at a time.
+
+    ``.txt`` and ``.md`` files are one document each; files inside a
+    directory take the name of their parent directory as category. ``.jsonl``
+    files hold one document per line with a ``text`` (or ``content``) field and
+    optional ``source``, ``category`` and ``metadata`` fields.
+
+    Args:
+        paths (Sequence[str]): Files or directories to read
+        default_category (str): Category for documents that do not name one
+
+    Yields:
+        Dict[str, Any]: Documents with source, text, category and metadata
+    """
+    for path in map(Path, paths):
+        if path.is_dir():
+            files = sorted(p for p in path.rglob("*") if p.suffix in DOCUMENT_SUFFIXES and p.is_file())
+        else:
+            files = [path]
+        for file in files:
+            category = file.parent.name if path.is_dir() and file.parent != path else default_category
+            if file.suffix == ".jsonl":
+                with open(file, encoding="utf-8") as handle:
+                    for line_number, line in enumerate(handle, 1):
+                        if not line.strip():
+                            continue
+                        record = json.loads(line)
+                        yield {
+                            "source": str(record.get("source") or f"{file}#{line_number}"),
+                            "text": record.get("text") or record.get("content") or "",
+                            "category": record.get("category") or category,
+                            "metadata": record.get("metadata") or {}
+                        }
+            else:
+                yield {
+                    "source": str(file),
+                    "text": file.read_text(encoding="utf-8"),
+                    "category": category,
+                    "metadata": {"title": file.stem}
+                }
+
+
+def _existing_chunks(conn: sqlite3.Connection, source: str) -> Dict[Tuple[str, str], List[tuple]]:
+    """Map (content_hash, model) -> [(chunk_id, position, metadata, category), ...] for a source, by position."""
+    rows = conn.execute(
+        f"""SELECT h.content_hash, h.model, h.chunk_id, h.position, c.metadata, c.category
+            FROM {CHUNK_HASH_TABLE} h JOIN chunks c ON c.id = h.chunk_id
+            WHERE h.source = ?
+            ORDER BY h.position""",
+        (source,)
+    ).fetchall()
+    existing: Dict[Tuple[str, str], List[tuple]] = {}
+    for digest, model, *row in rows:
+        existing.setdefault((digest, model), []).append(tuple(row))
+    return existing
+
+
+def _move_chunks(conn: sqlite3.Connection, moves: List[Tuple[int, int]]) -> None:
+    """Give reused chunks their new (position, chunk_id) without tripping UNIQUE (source, position)."""
+    # Park the rows on distinct negative positions first, since the targets may still be taken
+    conn.executemany(f"UPDATE {CHUNK_HASH_TABLE} SET position = -chunk_id WHERE chunk_id = ?",
+                     [(chunk_id,) for _, chunk_id in moves])
+    conn.executemany(f"UPDATE {CHUNK_HASH_TABLE} SET position = ? WHERE chunk_id = ?", moves)
+
+
+def _delete_chunks(conn: sqlite3.Connection, chunk_ids: List[int]) -> None:
+    """Delete chunks together with their embeddings and hashes."""
+    rows = [(chunk_id,) for chunk_id in chunk_ids]
+    conn.executemany("DELETE FROM embeddings WHERE chunk_id = ?", rows)
+    conn.executemany(f"DELETE FROM {CHUNK_HASH_TABLE} WHERE chunk_id = ?", rows)
+    conn.executemany("DELETE FROM chunks WHERE id = ?", rows)
+
+
+def _write_batch(conn: sqlite3.Connection, batch: List[Dict[str, Any]], model, model_name: str) -> None:
+    """Embed a batch of new or changed chunks with one encode call and store them."""
+    vectors = np.asarray(
+        model.encode([item["text"] for item in batch],
+                     batch_size=SCENARIO_CONFIG["batch_size"], convert_to_numpy=True),
+        dtype=np.float32
+    ).reshape(len(batch), -1)
+
+    conn.executemany(
+        "INSERT INTO chunks (id, text, metadata, category) VALUES (:chunk_id, :text, :metadata, :category)",
+        [item for item in batch if item["new"]]
+    )
+    conn.executemany(
+        "UPDATE chunks SET text = :text, metadata = :metadata, category = :category WHERE id = :chunk_id",
+        [item for item in batch if not item["new"]]
+    )
+    conn.executemany("DELETE FROM embeddings WHERE chunk_id = ?", [(item["chunk_id"],) for item in batch])
+    conn.executemany(
+        "INSERT INTO embeddings (chunk_id, vector) VALUES (?, ?)",
+        [(item["chunk_id"], vector.tobytes()) for item, vector in zip(batch, vectors)]
+    )
+    conn.executemany(
+        f"""INSERT OR REPLACE INTO {CHUNK_HASH_TABLE} (chunk_id, source, position, content_hash, model)
+            VALUES (?, ?, ?, ?, ?)""",
+        [(item["chunk_id"], item["source"], item["position"], item["hash"], model_name) for item in batch]
+    )
+
+
+def ingest_documents(conn: sqlite3.Connection, documents: Iterable[Dict[str, Any]],
+                     model_name: str = "all-MiniLM-L6-v2", backend: Optional[str] = None,
+                     chunk_size: int = SCENARIO_CONFIG["chunk_size"],
+                     chunk_overlap: int = SCENARIO_CONFIG["chunk_overlap"],
+                     batch_size: int = SCENARIO_CONFIG["ingest_batch_size"],
+                     prune: bool = False, shard_index: int = 0, num_shards: int = 1) -> Dict[str, Any]:
+    """
+    Chunk, embed and store documents, skipping chunks that did not change.
+
+    A chunk is re-embedded only if no stored chunk of the same source has
+    its text hash and embedding model. Unchanged chunks are matched by hash
+    wherever they moved in the document, and only get their position,
+    metadata and category refreshed (metadata and category only when they
+    changed, so the knowledge-base version is not bumped needlessly). A
+    changed chunk reuses the id of an unmatched chunk at its position;
+    remaining unmatched chunks are deleted. Everything runs in one transaction, so a failed run
+    leaves the knowledge base untouched.
+
+    Args:
+        conn (sqlite3.Connection): Writable connection to the vector database
+        documents (Iterable[Dict[str, Any]]): Documents with ``source`` and
+            ``text`` (or ``content``) and optional ``category`` and ``metadata``
+        model_name (str): Name of the sentence transformer model
+        backend (str, optional): Engine running the model ("torch", "onnx" or
+            "onnx-int8"; default: the configured one). Chunks embedded by another
+            backend count as changed and are re-embedded
+        chunk_size (int): Maximum chunk length in characters
+        chunk_overlap (int): Characters of context repeated between chunks
+        batch_size (int): Number of chunks embedded per encode call
+        prune (bool): Delete chunks of sources that are not in ``documents``
+        shard_index (int): Shard written by this call in a sharded knowledge base;
+            only documents whose shard_for_source is this index are ingested,
+            and new chunk ids are congruent to it modulo ``num_shards``
+        num_shards (int): Number of shards (1 for a single-file knowledge base)
+
+    Returns:
+        Dict[str, Any]: Counts of documents, chunks, embedded, unchanged and
+                        deleted chunks, and the elapsed seconds
+    """
+    start = time.perf_counter()
+    ensure_knowledge_schema(conn)
+    model = get_model(model_name, backend)
+    model_name = model_key(model_name, backend)
+    stats = {"documents": 0, "chunks": 0, "embedded": 0, "unchanged": 0, "deleted": 0}
+    seen_sources = set()
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current_max = conn.execute("SELECT COALESCE(MAX(id), 0) FROM chunks").fetchone()[0]
+        next_id = _next_chunk_id(current_max, shard_index, num_shards)
+        batch: List[Dict[str, Any]] = []
+        metadata_updates = []
+
+        for document in documents:
+            source = str(document["source"])
+            if num_shards > 1 and shard_for_source(source, num_shards) != shard_index:
+                continue
+            if source in seen_sources:
+                raise ValueError(f"Duplicate document source: {source}")
+            seen_sources.add(source)
+            stats["documents"] += 1
+
+            text = document.get("text") or document.get("content") or ""
+            category = document.get("category") or DEFAULT_CATEGORY
+            existing = _existing_chunks(conn, source)
+            chunks = [(chunk, content_hash(chunk)) for chunk in chunk_text(text, chunk_size, chunk_overlap)]
+            stats["chunks"] += len(chunks)
+
+            # Match unchanged text first, wherever it sits in the document now
+            reused: Dict[int, tuple] = {}
+            for position, (chunk, digest) in enumerate(chunks):
+                candidates = existing.get((digest, model_name))
+                if candidates:
+                    reused[position] = candidates.pop(0)
+            unmatched = {row[1]: row for rows in existing.values() for row in rows}
+
+            changed = []
+            for position, (chunk, digest) in enumerate(chunks):
+                if position in reused:
+                    continue
+                previous = unmatched.pop(position, None)
+                if previous is None:
+                    chunk_id, next_id = next_id, next_id + num_shards
+                else:
+                    chunk_id = previous[0]
+                changed.append((position, chunk, digest, chunk_id, previous is None))
+
+            if unmatched:
+                _delete_chunks(conn, [row[0] for row in unmatched.values()])
+                stats["deleted"] += len(unmatched)
+            moves = [(position, row[0]) for position, row in reused.items() if row[1] != position]
+            if moves:
+                _move_chunks(conn, moves)
+
+            for position, (chunk_id, _, previous_metadata, previous_category) in reused.items():
+                stats["unchanged"] += 1
+                metadata = json.dumps({**document.get("metadata", {}), "source": source, "chunk": position})
+                if (previous_metadata, previous_category) != (metadata, category):
+                    metadata_updates.append((metadata, category, chunk_id))
+
+            for position, chunk, digest, chunk_id, new in changed:
+                metadata = json.dumps({**document.get("metadata", {}), "source": source, "chunk": position})
+                batch.append({
+                    "chunk_id": chunk_id, "text": chunk, "metadata": metadata, "category": category,
+                    "source": source, "position": position, "hash": digest, "new": new
+                })
+                if len(batch) >= batch_size:
+                    _write_batch(conn, batch, model, model_name)
+                    stats["embedded"] += len(batch)
+                    batch = []
+
+        if batch:
+            _write_batch(conn, batch, model, model_name)
+            stats["embedded"] += len(batch)
+        conn.executemany("UPDATE chunks SET metadata = ?, category = ? WHERE id = ?", metadata_updates)
+
+        if prune:
+            stale = [
+                chunk_id for chunk_id, source in
+                conn.execute(f"SELECT chunk_id, source FROM {CHUNK_HASH_TABLE}").fetchall()
+                if source not in seen_sources
+            ]
+            _delete_chunks(conn, stale)
+            stats["deleted"] += len(stale)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    stats["seconds"] = time.perf_counter() - start
+    logger.info(
+        f"Ingested {stats['documents']} documents: {stats['embedded']} chunks embedded, "
+        f"{stats['unchanged']} unchanged, {stats['deleted']} deleted in {stats['seconds']:.1f}s"
+    )
+    return stats
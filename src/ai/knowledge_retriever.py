@@ -12,20 +12,95 @@ Classes:
 Example:
     retriever = KnowledgeRetriever()
     knowledge = retriever.search("classroom disruption strategies")
+
+    # Keep the embeddings in memory and answer queries with one matrix product
+    retriever = KnowledgeRetriever(index_backend="memory")
+
+    # Use the persisted FAISS index built by scripts/build_knowledge_index.py
+    retriever = KnowledgeRetriever(index_backend="faiss")
+
+    # Share one memory-mapped snapshot of the vectors across worker processes
+    retriever = KnowledgeRetriever(index_backend="mmap")
+
+    # Rank candidates on the int8 copy of the vectors and rescore them exactly
+    retriever = KnowledgeRetriever(index_backend="quantized")
+
+    # Fuse BM25 keyword and vector rankings (helps with exact terms like "IEP")
+    knowledge = retriever.search("IEP accommodations", mode="hybrid")
 """
 
 import sqlite3
 import json
+import heapq
 import numpy as np
 import os
 import logging
-from typing import List, Dict, Any, Optional
-from sentence_transformers import SentenceTransformer
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from .model_registry import get_model, model_key
+from .vector_index import InMemoryVectorIndex, QuantizedVectorIndex
+from .faiss_index import FaissVectorIndex, FAISS_AVAILABLE
+from .knowledge_store import (
+    ensure_fts_index, ensure_version_tracking, get_kb_version, build_match_query, FTS_TABLE,
+    embeddings_normalized, quantized_embeddings_available, ensure_leaderboard,
+    has_fts_index, has_version_tracking, has_leaderboard,
+    LEADERBOARD_TABLE, LEADERBOARD_SIZE
+)
+from .embedding_cache import get_query_embedding_cache
+from .result_cache import RetrievalResultCache
+from .connection_manager import get_connection_manager
+from .usage_recorder import UsageStatisticsRecorder, USAGE_UPDATE_SQL
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def reciprocal_rank_fusion(rankings: Sequence[List[Tuple[int, float]]], k: int = 60) -> List[Tuple[int, float]]:
+    """
+    Merge several rankings of chunk ids with reciprocal rank fusion.
+
+    Each chunk scores ``sum(1 / (k + rank))`` over the rankings it appears in,
+    so only rank positions matter and BM25 and cosine scores never need to be
+    put on the same scale.
+
+    Args:
+        rankings (Sequence[List[Tuple[int, float]]]): (chunk id, score) lists, best first
+        k (int): Smoothing constant; larger values flatten the rank weights
+
+    Returns:
+        List[Tuple[int, float]]: (chunk id, fused score) pairs, best first
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, (chunk_id, _) in enumerate(ranking, start=1):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+class SearchHit:
+    """
+    A ranked chunk carrying only what ranking needs.
+
+    Hits order by score, so they can be kept in a ``heapq`` of the best
+    results. Text and metadata are loaded separately for the final hits.
+
+    Attributes:
+        id (int): Chunk id
+        score (float): Similarity to the query
+        category (Optional[str]): Chunk category
+    """
+
+    __slots__ = ("id", "score", "category")
+
+    def __init__(self, chunk_id: int, score: float, category: Optional[str] = None):
+        self.id = chunk_id
+        self.score = score
+        self.category = category
+
+    def __lt__(self, other: "SearchHit") -> bool:
+        return self.score < other.score
+
+    def __repr__(self) -> str:
+        return f"SearchHit(id={self.id}, score={self.score:.4f}, category={self.category!r})"
+
 class KnowledgeRetriever:
     """
     A class to retrieve knowledge from the Educational Knowledge Base.
@@ -35,20 +110,67 @@ class KnowledgeRetriever:
     
     Attributes:
         db_path (str): Path to the vector database
-        model (SentenceTransformer): The embedding model for semantic search
+        db (SQLiteConnectionManager): Pooled connections to the vector database
+        usage_recorder (UsageStatisticsRecorder): Write-behind buffer for usage statistics
+        model (SharedModel): The process-wide embedding model for semantic search,
+                             loaded on first use
+        model_name (str): Name of the embedding model
+        embedding_backend (str): Engine running the embedding model (None: configured default)
+        query_cache (QueryEmbeddingCache): Query embedding cache shared with EmbeddingGenerator
+        result_cache (RetrievalResultCache): Ranked results, invalidated when the
+                                             knowledge-base version changes
+        index_backend (str): How vectors are scored ("sqlite", "memory", "faiss",
+                             "mmap" or "quantized")
+        ready (bool): Whether warmup() has finished and requests are served
+                      without start-up cost
     """
+
+    INDEX_BACKENDS = ("sqlite", "memory", "faiss", "mmap", "quantized")
+    SEARCH_MODES = ("vector", "keyword", "hybrid")
+    # Candidates retrieved per side in hybrid mode (at least top_k * 10)
+    HYBRID_CANDIDATES = 100
+    # Rows scored per batch by the "sqlite" backend
+    SCAN_BATCH = 1024
     
-    def __init__(self, db_path="/home/team1/UTTA-Knowledge-Base-Demo/knowledge_base/vector_db.sqlite"):
+    def __init__(self, db_path="/home/team1/UTTA-Knowledge-Base-Demo/knowledge_base/vector_db.sqlite",
+                 index_backend: str = "sqlite", embedding_backend: Optional[str] = None):
         """
         Initialize the KnowledgeRetriever with the path to the vector database.
         
         Args:
             db_path (str): Path to the vector database
                           Defaults to "/home/team1/UTTA-Knowledge-Base-Demo/knowledge_base/vector_db.sqlite"
+            index_backend (str): "sqlite" scans the database on every query,
+                                 "memory" loads all embeddings once into an
+                                 InMemoryVectorIndex, "faiss" loads the persisted
+                                 FaissVectorIndex next to the database, "mmap"
+                                 memory-maps the snapshot written by
+                                 export_snapshot, "quantized" scores the int8
+                                 copy written by quantize_embeddings and
+                                 rescores the best candidates (default: "sqlite")
+            embedding_backend (str, optional): Engine running the embedding model:
+                                 "torch", "onnx" or "onnx-int8"
+                                 (default: SCENARIO_CONFIG["embedding_backend"])
+
+        Raises:
+            ValueError: If index_backend is not supported
         """
+        if index_backend not in self.INDEX_BACKENDS:
+            raise ValueError(f"Unsupported index backend: {index_backend}")
         self.db_path = db_path
+        self.index_backend = index_backend
+        self._index = None
+        self._kb_version = None
+        self._model = None
+        self.model_name = 'all-MiniLM-L6-v2'
+        self.embedding_backend = embedding_backend
+        # Optimistic until the lazy model load fails
+        self.embedding_available = True
+        self.ready = False
+        self.query_cache = get_query_embedding_cache()
+        self.result_cache = RetrievalResultCache()
         self._check_database_exists()
-        self._initialize_model()
+        self._initialize_schema()
         
     def _check_database_exists(self):
         """Check if the vector database exists."""
@@ -56,22 +178,410 @@ class KnowledgeRetriever:
             logger.warning(f"Vector database not found at {self.db_path}")
             logger.warning("Knowledge retrieval will not be available")
             self.database_available = False
+            self.db = None
+            self.usage_recorder = None
         else:
             logger.info(f"Vector database found at {self.db_path}")
             self.database_available = True
+            self.db = get_connection_manager(self.db_path)
+            self.usage_recorder = UsageStatisticsRecorder(self.db)
             
-    def _initialize_model(self):
-        """Initialize the sentence transformer model for embeddings."""
+    def _initialize_schema(self):
+        """
+        Create the FTS5 keyword index, version tracking and the leaderboard if needed.
+
+        An existing schema is only read, so the writer lock is not taken. A
+        read-only database missing part of the schema is served without
+        those features; create them with scripts/build_knowledge_index.py fts.
+        """
+        self.keyword_index_available = False
+        self.version_tracking_available = False
+        self.leaderboard_available = False
+        if not self.database_available:
+            return
         try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("SentenceTransformer model loaded successfully")
-            self.embedding_available = True
-        except Exception as e:
-            logger.error(f"Error loading SentenceTransformer model: {e}")
-            logger.warning("Running in fallback mode without semantic search")
-            self.embedding_available = False
+            with self.db.reader() as conn:
+                self.keyword_index_available = has_fts_index(conn)
+                self.version_tracking_available = has_version_tracking(conn)
+                self.leaderboard_available = has_leaderboard(conn)
+            if self.keyword_index_available and self.version_tracking_available and self.leaderboard_available:
+                return
+            if self.db.read_only:
+                logger.warning(f"{self.db_path} is read-only and its schema is incomplete; "
+                               "run scripts/build_knowledge_index.py fts to enable keyword search and caching")
+            else:
+                with self.db.writer() as conn:
+                    self.keyword_index_available = ensure_fts_index(conn)
+                    self.version_tracking_available = ensure_version_tracking(conn)
+                    self.leaderboard_available = ensure_leaderboard(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Knowledge base schema setup failed: {e}")
+        if not self.version_tracking_available:
+            logger.warning("Knowledge base version tracking unavailable. Result caching is disabled.")
+
+    def _initialize_model(self) -> bool:
+        """
+        Get the shared sentence transformer model on first use.
+
+        Returns:
+            bool: True if the model is loaded, False in keyword-only fallback mode
+        """
+        if self._model is None and self.embedding_available:
+            try:
+                self._model = get_model(self.model_name, self.embedding_backend)
+                logger.info("SentenceTransformer model ready")
+            except Exception as e:
+                logger.error(f"Error loading SentenceTransformer model: {e}")
+                logger.warning("Running in fallback mode without semantic search")
+                self.embedding_available = False
+        return self.embedding_available
+
+    @property
+    def model(self):
+        """SharedModel: The embedding model, loaded on first access (None if unavailable)."""
+        self._initialize_model()
+        return self._model
+
+    def warmup(self) -> bool:
+        """
+        Load everything the first search needs, ahead of the first request.
+
+        Loads the embedding model, runs one encode (the first call initializes
+        the tokenizer and kernels) and loads the configured vector index.
+        Suitable for a readiness probe; search works without it, the first
+        request just pays the start-up cost instead.
+
+        Returns:
+            bool: True if the database and semantic search are ready
+        """
+        if not self.database_available:
+            return False
+        if self._initialize_model():
+            try:
+                self._model.encode("warmup")
+                if self.index_backend != "sqlite":
+                    self._sync_kb_version()
+                    self._get_index()
+            except Exception as e:
+                logger.error(f"Error warming up knowledge retriever: {e}")
+                return False
+        self.ready = True
+        logger.info("Knowledge retriever warmed up")
+        return self.embedding_available
+
+    def _sync_kb_version(self) -> Optional[int]:
+        """
+        Read the knowledge-base version and drop the vector index if it changed.
+
+        Returns:
+            Optional[int]: The current version, or None without version tracking
+        """
+        if not self.version_tracking_available:
+            return None
+        with self.db.reader() as conn:
+            version = get_kb_version(conn)
+        if self._index is not None and version != self._kb_version:
+            logger.info("Knowledge base changed. Reloading vector index.")
+            self._index = None
+        self._kb_version = version
+        return version
+
+    def _get_index(self):
+        """Return the configured vector index, loading it on first use."""
+        if self._index is None:
+            if self.index_backend == "faiss":
+                self._index = self._load_faiss_index()
+            elif self.index_backend == "mmap":
+                self._index = self._load_snapshot_index()
+            elif self.index_backend == "quantized":
+                self._index = self._load_quantized_index()
+            if self._index is None:
+                self._index = InMemoryVectorIndex.from_database(self.db_path)
+        return self._index
+
+    def _load_faiss_index(self) -> Optional[FaissVectorIndex]:
+        """
+        Load the persisted FAISS index if it exists and matches the database.
+
+        Returns:
+            Optional[FaissVectorIndex]: The index, or None to fall back to
+                                        the in-memory index
+        """
+        index_path = FaissVectorIndex.default_index_path(self.db_path)
+        if not FAISS_AVAILABLE:
+            logger.warning("faiss is not installed. Falling back to in-memory index.")
+            return None
+        if not os.path.exists(index_path):
+            logger.warning(f"FAISS index not found at {index_path}. Falling back to in-memory index.")
+            return None
+
+        index = FaissVectorIndex.load(index_path)
+        if self._is_stale(index):
+            logger.warning(
+                f"FAISS index at {index_path} is stale. Falling back to in-memory index; "
+                "rebuild it with scripts/build_knowledge_index.py faiss"
+            )
+            return None
+        return index
+
+    def _load_snapshot_index(self) -> Optional[InMemoryVectorIndex]:
+        """
+        Memory-map the exported embedding snapshot if it exists and matches the database.
+
+        Returns:
+            Optional[InMemoryVectorIndex]: The memory-mapped index, or None to
+                                           fall back to a private in-memory copy
+        """
+        prefix = InMemoryVectorIndex.default_snapshot_prefix(self.db_path)
+        if not os.path.exists(f"{prefix}.snapshot.json"):
+            logger.warning(f"Embedding snapshot not found at {prefix}.*. Falling back to in-memory index.")
+            return None
+
+        try:
+            index = InMemoryVectorIndex.from_snapshot(prefix)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Embedding snapshot at {prefix} is unreadable ({e}). Falling back to in-memory index.")
+            return None
+        if self._is_stale(index):
+            logger.warning(
+                f"Embedding snapshot at {prefix} is stale. Falling back to in-memory index; "
+                "re-export it with scripts/build_knowledge_index.py snapshot"
+            )
+            return None
+        return index
+
+    def _load_quantized_index(self) -> Optional[QuantizedVectorIndex]:
+        """
+        Load the int8 copy of the embeddings if it matches the float32 vectors.
+
+        Returns:
+            Optional[QuantizedVectorIndex]: The index, or None to fall back to
+                                            the float32 in-memory index
+        """
+        with self.db.reader() as conn:
+            available = quantized_embeddings_available(conn)
+        if not available:
+            logger.warning(
+                "Quantized embeddings are missing or stale. Falling back to in-memory index; "
+                "rebuild them with scripts/build_knowledge_index.py quantize"
+            )
+            return None
+        return QuantizedVectorIndex.from_database(self.db_path)
+
+    def _is_stale(self, index) -> bool:
+        """
+        Check whether a prebuilt index no longer matches the database.
+
+        Compares knowledge-base versions when both sides have one, and the
+        number of embedded chunks otherwise.
+        """
+        with self.db.reader() as conn:
+            version = get_kb_version(conn)
+            if version is not None and index.kb_version is not None:
+                return version != index.kb_version
+            num_vectors = conn.execute(
+                "SELECT COUNT(*) FROM chunks c JOIN embeddings e ON c.id = e.chunk_id"
+            ).fetchone()[0]
+            return num_vectors != len(index)
+
+    def refresh_index(self) -> None:
+        """Drop the in-memory index so it is reloaded from the database on next search."""
+        self._index = None
+
+    def _load_chunk_rows(self, chunk_ids) -> Dict[int, tuple]:
+        """
+        Load the stored rows for a set of chunk ids in one query.
+
+        Args:
+            chunk_ids: Iterable of chunk ids
+
+        Returns:
+            Dict[int, tuple]: (id, text, metadata, category) rows keyed by id
+        """
+        chunk_ids = list(set(chunk_ids))
+        if not chunk_ids:
+            return {}
+
+        with self.db.reader() as conn:
+            placeholders = ",".join("?" * len(chunk_ids))
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT id, text, metadata, category FROM chunks WHERE id IN ({placeholders})",
+                chunk_ids
+            )
+            return {row[0]: row for row in cursor.fetchall()}
+
+    def _fetch_chunks(self, scored_ids: List[tuple], rows: Optional[Dict[int, tuple]] = None) -> List[Dict[str, Any]]:
+        """
+        Build knowledge chunk results for ranked chunk ids.
+
+        Args:
+            scored_ids (List[tuple]): (chunk id, similarity) pairs in rank order
+            rows (Dict[int, tuple], optional): Rows already loaded with
+                                               _load_chunk_rows; loaded on demand if omitted
+
+        Returns:
+            List[Dict[str, Any]]: Knowledge chunks in the same order
+        """
+        if not scored_ids:
+            return []
+        if rows is None:
+            rows = self._load_chunk_rows(chunk_id for chunk_id, _ in scored_ids)
+
+        results = []
+        for chunk_id, similarity in scored_ids:
+            if chunk_id not in rows:
+                continue
+            _, text, metadata_json, category = rows[chunk_id]
+            results.append({
+                "id": chunk_id,
+                "text": text,
+                "metadata": json.loads(metadata_json),
+                "category": category,
+                "similarity": float(similarity)
+            })
+        return results
+            
+    def _vector_candidates(self, query_embedding: np.ndarray, category: Optional[str],
+                           limit: int) -> List[Tuple[int, float]]:
+        """
+        Rank chunks by cosine similarity to a query embedding.
+
+        Args:
+            query_embedding (np.ndarray): The query vector
+            category (str, optional): Filter by knowledge category
+            limit (int): Maximum number of candidates
+
+        Returns:
+            List[Tuple[int, float]]: (chunk id, similarity) pairs, best first
+        """
+        if self.index_backend != "sqlite":
+            return self._get_index().search(query_embedding, category, limit)
+        return [(hit.id, hit.score) for hit in self._scan_vector_hits(query_embedding, category, limit)]
+
+    def _scan_vector_hits(self, query_embedding: np.ndarray, category: Optional[str],
+                          top_k: int) -> List[SearchHit]:
+        """
+        Rank chunks by scanning the embeddings table without loading an index.
+
+        Vectors are streamed in batches of SCAN_BATCH rows and scored with one
+        matrix-vector product per batch. Only ids, categories and vectors are
+        read, and only a batch's best top_k rows can become SearchHits, so
+        memory stays bounded by the batch size rather than the table size.
+
+        Args:
+            query_embedding (np.ndarray): The query vector
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of hits to return
+
+        Returns:
+            List[SearchHit]: The best hits, most similar first
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if top_k <= 0 or query_norm == 0:
+            return []
+
+        conditions = ""
+        params = []
+        if category:
+            conditions = " WHERE c.category = ?"
+            params.append(category)
+
+        heap = []
+        with self.db.reader() as conn:
+            # Unit-length stored vectors reduce cosine similarity to a dot product
+            normalized = embeddings_normalized(conn)
+            cursor = conn.execute(f"""
+                SELECT c.id, c.category, e.vector
+                FROM chunks c
+                JOIN embeddings e ON c.id = e.chunk_id
+                {conditions}
+            """, params)
+            while True:
+                rows = cursor.fetchmany(self.SCAN_BATCH)
+                if not rows:
+                    break
+                ids, categories, blobs = zip(*rows)
+                vectors = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(rows), -1)
+                scores = vectors @ query
+                if normalized:
+                    scores /= query_norm
+                else:
+                    norms = np.linalg.norm(vectors, axis=1)
+                    norms[norms == 0] = np.inf
+                    scores /= norms * query_norm
+
+                positions = range(len(rows))
+                if len(rows) > top_k:
+                    positions = np.argpartition(-scores, top_k - 1)[:top_k]
+                for position in positions:
+                    score = float(scores[position])
+                    if len(heap) < top_k:
+                        heapq.heappush(heap, SearchHit(ids[position], score, categories[position]))
+                    elif score > heap[0].score:
+                        heapq.heapreplace(heap, SearchHit(ids[position], score, categories[position]))
+        return sorted(heap, reverse=True)
+
+    def _keyword_candidates(self, query: str, category: Optional[str], limit: int) -> List[Tuple[int, float]]:
+        """
+        Rank chunks by BM25 using the FTS5 keyword index.
+
+        Only chunk ids and ranks are read; text is loaded later for the final hits.
+
+        Args:
+            query (str): The search query
+            category (str, optional): Filter by knowledge category
+            limit (int): Maximum number of candidates
+
+        Returns:
+            List[Tuple[int, float]]: (chunk id, negated BM25 rank) pairs, best first
+        """
+        match_query = build_match_query(query)
+        if not self.keyword_index_available or match_query is None:
+            return []
+
+        conditions = ""
+        params = [match_query]
+        if category:
+            conditions = " AND c.category = ?"
+            params.append(category)
+        params.append(limit)
+
+        with self.db.reader() as conn:
+            rows = conn.execute(f"""
+                SELECT c.id, bm25({FTS_TABLE}) AS rank
+                FROM {FTS_TABLE}
+                JOIN chunks c ON c.id = {FTS_TABLE}.rowid
+                WHERE {FTS_TABLE} MATCH ?{conditions}
+                ORDER BY rank
+                LIMIT ?
+            """, params).fetchall()
+        return [(chunk_id, -rank) for chunk_id, rank in rows]
+
+    def _hybrid_search(self, query: str, query_embedding: np.ndarray, category: Optional[str],
+                       top_k: int) -> List[Dict[str, Any]]:
+        """
+        Fuse bounded keyword and vector candidate lists with reciprocal rank fusion.
+
+        Args:
+            query (str): The search query
+            query_embedding (np.ndarray): The query vector
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return
+
+        Returns:
+            List[Dict[str, Any]]: Knowledge chunks whose "similarity" is the fused score
+        """
+        limit = max(top_k * 10, self.HYBRID_CANDIDATES)
+        fused = reciprocal_rank_fusion([
+            self._vector_candidates(query_embedding, category, limit),
+            self._keyword_candidates(query, category, limit),
+        ])
+        return self._fetch_chunks(fused[:top_k])
             
-    def search(self, query: str, category: Optional[str] = None, top_k: int = 3) -> List[Dict[str, Any]]:
+    def search(self, query: str, category: Optional[str] = None, top_k: int = 3,
+               mode: str = "vector", query_embedding: Optional[Sequence[float]] = None) -> List[Dict[str, Any]]:
         """
         Search for relevant knowledge chunks using semantic similarity.
         
@@ -80,69 +590,197 @@ class KnowledgeRetriever:
             category (str, optional): Filter by knowledge category
                                      (e.g., "classroom_management", "teaching_strategies")
             top_k (int): Number of results to return (default: 3)
+            mode (str): "vector" ranks by embedding similarity, "keyword" by BM25,
+                        "hybrid" fuses both rankings with reciprocal rank fusion
+                        (default: "vector")
+            query_embedding (Sequence[float], optional): Embedding of the query
+                        computed by the caller (e.g. a micro-batched encode); the
+                        model is not run, but the result cache and the keyword
+                        fallback still apply
             
         Returns:
-            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity scores
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity scores.
+                                  The scale of "similarity" depends on the ranking:
+                                  cosine similarity for "vector"; BM25 score s mapped
+                                  to s / (1 + s) in [0, 1) for "keyword" (0.5 at s = 1,
+                                  not comparable across queries; the fraction of query
+                                  words found when FTS5 is unavailable); the fused
+                                  score sum(1 / (60 + rank)) for "hybrid"
+
+        Raises:
+            ValueError: If mode is not supported
         """
+        if mode not in self.SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode: {mode}")
+
         if not self.database_available:
             logger.warning("Vector database not available. Cannot perform search.")
             return []
+
+        version = self._sync_kb_version()
+        if version is None:
+            return self._search_uncached(query, category, top_k, mode, query_embedding)
+
+        key = (self.query_cache.normalize(query), category, top_k, mode)
+        results = self.result_cache.get(key, version)
+        if results is not None:
+            logger.info(f"Retrieved {len(results)} cached knowledge chunks for query: {query}")
+            return results
+        results = self._search_uncached(query, category, top_k, mode, query_embedding)
+        if results:
+            self.result_cache.put(key, version, results)
+        return results
+
+    def _search_uncached(self, query: str, category: Optional[str], top_k: int, mode: str,
+                         query_embedding: Optional[Sequence[float]] = None) -> List[Dict[str, Any]]:
+        """
+        Run a search without consulting the result cache.
+
+        Args:
+            query (str): The search query
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return
+            mode (str): "vector", "keyword" or "hybrid"
+            query_embedding (Sequence[float], optional): Precomputed query embedding
+
+        Returns:
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity scores
+        """
+        if mode == "keyword":
+            return self._fallback_keyword_search(query, category, top_k)
             
-        if not self.embedding_available:
+        if query_embedding is None and not self._initialize_model():
             logger.warning("Embedding model not available. Using fallback keyword search.")
             return self._fallback_keyword_search(query, category, top_k)
             
         try:
-            # Convert query to embedding
-            query_embedding = self.model.encode(query)
-            
-            # Connect to database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Build query conditions
-            conditions = ""
-            params = []
-            if category:
-                conditions = " WHERE c.category = ?"
-                params.append(category)
-            
-            # Retrieve all vectors and compute similarities
-            cursor.execute(f"""
-                SELECT c.id, c.text, c.metadata, c.category, e.vector 
-                FROM chunks c 
-                JOIN embeddings e ON c.id = e.chunk_id
-                {conditions}
-            """, params)
-            
-            results = []
-            for chunk_id, text, metadata_json, category, vector_blob in cursor.fetchall():
-                vector = np.frombuffer(vector_blob, dtype=np.float32)
-                # Calculate cosine similarity
-                similarity = np.dot(query_embedding, vector) / (np.linalg.norm(query_embedding) * np.linalg.norm(vector))
-                results.append({
-                    "id": chunk_id,
-                    "text": text,
-                    "metadata": json.loads(metadata_json),
-                    "category": category,
-                    "similarity": float(similarity)
-                })
-            
-            # Sort by similarity and return top k
-            results.sort(key=lambda x: x["similarity"], reverse=True)
-            top_results = results[:top_k]
-            
-            conn.close()
+            if query_embedding is None:
+                # Convert query to embedding (repeated queries are served from the cache)
+                query_embedding = self.query_cache.get_or_encode(model_key(self.model_name, self.embedding_backend), query, self.model.encode)
+            else:
+                query_embedding = np.asarray(query_embedding, dtype=np.float32)
+
+            if mode == "hybrid":
+                top_results = self._hybrid_search(query, query_embedding, category, top_k)
+                logger.info(f"Retrieved {len(top_results)} knowledge chunks using hybrid search for query: {query}")
+                return top_results
+
+            top_results = self._vector_search(query_embedding, category, top_k)
             logger.info(f"Retrieved {len(top_results)} knowledge chunks for query: {query}")
             return top_results
             
         except Exception as e:
             logger.error(f"Error in semantic search: {e}")
             return self._fallback_keyword_search(query, category, top_k)
+
+    def _vector_search(self, query_embedding: np.ndarray, category: Optional[str],
+                       top_k: int) -> List[Dict[str, Any]]:
+        """Rank chunks by similarity to an embedding with the configured backend."""
+        if self.index_backend != "sqlite":
+            return self._fetch_chunks(self._get_index().search(query_embedding, category, top_k))
+        # Rank compact hits; text and metadata are only loaded for the top_k
+        hits = self._scan_vector_hits(query_embedding, category, top_k)
+        return self._fetch_chunks([(hit.id, hit.score) for hit in hits])
+
+    def search_by_vector(self, query_embedding: Sequence[float], category: Optional[str] = None,
+                         top_k: int = 3, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search with a query embedding computed by the caller.
+
+        Skips the embedding model and the result cache, e.g. for callers that
+        already embedded the query or for benchmarks with synthetic vectors.
+
+        Args:
+            query_embedding (Sequence[float]): The query embedding
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return (default: 3)
+            query (str, optional): The query text; if given, the vector ranking
+                                   is fused with the BM25 keyword ranking (hybrid)
+
+        Returns:
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity scores
+        """
+        if not self.database_available:
+            logger.warning("Vector database not available. Cannot perform search.")
+            return []
+        self._sync_kb_version()
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        if query is not None:
+            return self._hybrid_search(query, query_embedding, category, top_k)
+        return self._vector_search(query_embedding, category, top_k)
             
+    def encode_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        Encode queries in one model call, serving repeats from the shared query cache.
+
+        Args:
+            queries (Sequence[str]): The search queries
+
+        Returns:
+            np.ndarray: One query embedding per row, in query order
+
+        Raises:
+            RuntimeError: If the embedding model is not available
+        """
+        if not self._initialize_model():
+            raise RuntimeError("Embedding model not available")
+        return self.query_cache.get_or_encode_many(model_key(self.model_name, self.embedding_backend),
+                                                   list(queries), self.model.encode)
+
+    def search_many(self, queries: List[str], category: Optional[str] = None,
+                    top_k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries at once.
+
+        All queries are encoded with one batched ``encode`` call and scored with
+        one matrix-matrix product. With the "sqlite" backend the embeddings are
+        read from the database once for the whole batch instead of once per query.
+
+        Args:
+            queries (List[str]): The search queries
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return per query (default: 3)
+
+        Returns:
+            List[List[Dict[str, Any]]]: One result list per query, in query order
+        """
+        if not queries:
+            return []
+
+        if not self.database_available:
+            logger.warning("Vector database not available. Cannot perform search.")
+            return [[] for _ in queries]
+
+        if not self._initialize_model():
+            logger.warning("Embedding model not available. Using fallback keyword search.")
+            return [self._fallback_keyword_search(query, category, top_k) for query in queries]
+
+        self._sync_kb_version()
+        try:
+            query_embeddings = self.encode_queries(queries)
+
+            if self.index_backend != "sqlite":
+                index = self._get_index()
+            else:
+                index = InMemoryVectorIndex.from_database(self.db_path, category)
+            ranked = index.search_batch(query_embeddings, category, top_k)
+
+            rows = self._load_chunk_rows(chunk_id for hits in ranked for chunk_id, _ in hits)
+            results = [self._fetch_chunks(hits, rows) for hits in ranked]
+            logger.info(f"Retrieved knowledge chunks for {len(queries)} queries")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in batched semantic search: {e}")
+            return [self._fallback_keyword_search(query, category, top_k) for query in queries]
+
     def _fallback_keyword_search(self, query: str, category: Optional[str] = None, top_k: int = 3) -> List[Dict[str, Any]]:
         """
-        Simple keyword search as fallback when semantic search is unavailable.
+        Keyword search as fallback when semantic search is unavailable.
+
+        Uses BM25-ranked FTS5 MATCH queries with the category filter applied in
+        SQL. Falls back to scanning every chunk in Python when the FTS5 index is
+        not available.
         
         Args:
             query (str): The search query
@@ -150,46 +788,99 @@ class KnowledgeRetriever:
             top_k (int): Number of results to return
             
         Returns:
-            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity scores
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity
+                                  scores; BM25 score s is reported as s / (1 + s)
         """
         if not self.database_available:
             logger.warning("Vector database not available. Cannot perform search.")
             return []
+
+        if not self.keyword_index_available:
+            return self._scan_keyword_search(query, category, top_k)
+
+        match_query = build_match_query(query)
+        if match_query is None:
+            return []
             
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Split query into keywords
-            keywords = [k.lower() for k in query.split()]
-            
-            # Get chunks matching keywords
-            if category:
-                cursor.execute("SELECT id, text, metadata, category FROM chunks WHERE category = ?", (category,))
-            else:
-                cursor.execute("SELECT id, text, metadata, category FROM chunks")
-                
-            results = []
-            for row in cursor.fetchall():
-                chunk_id, text, metadata_json, category = row
-                text_lower = text.lower()
-                
-                # Calculate a simple score based on keyword matches
-                score = sum(1 for keyword in keywords if keyword in text_lower)
-                if score > 0:
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+
+                conditions = ""
+                params = [match_query]
+                if category:
+                    conditions = " AND c.category = ?"
+                    params.append(category)
+                params.append(top_k)
+
+                # bm25() is lower for better matches
+                cursor.execute(f"""
+                    SELECT c.id, c.text, c.metadata, c.category, bm25({FTS_TABLE}) AS rank
+                    FROM {FTS_TABLE}
+                    JOIN chunks c ON c.id = {FTS_TABLE}.rowid
+                    WHERE {FTS_TABLE} MATCH ?{conditions}
+                    ORDER BY rank
+                    LIMIT ?
+                """, params)
+
+                results = []
+                for chunk_id, text, metadata_json, category, rank in cursor.fetchall():
+                    score = max(-rank, 0.0)
                     results.append({
                         "id": chunk_id,
                         "text": text,
                         "metadata": json.loads(metadata_json),
                         "category": category,
-                        "similarity": score / len(keywords)  # Normalized score
+                        "similarity": score / (1.0 + score)  # Map BM25 into [0, 1)
                     })
-                    
-            # Sort by score and return top_k
-            results.sort(key=lambda x: x["similarity"], reverse=True)
-            top_results = results[:top_k]
+
+            logger.info(f"Retrieved {len(results)} knowledge chunks using keyword search for query: {query}")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in keyword search: {e}")
+            return self._scan_keyword_search(query, category, top_k)
+
+    def _scan_keyword_search(self, query: str, category: Optional[str] = None, top_k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Simple keyword search over every chunk, used when FTS5 is unavailable.
+        
+        Args:
+            query (str): The search query
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return
             
-            conn.close()
+        Returns:
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity scores
+        """
+        try:
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+
+                # Split query into keywords
+                keywords = [k.lower() for k in query.split()]
+                if not keywords:
+                    return []
+
+                # Get chunks matching keywords (metadata is only loaded for the top_k)
+                if category:
+                    cursor.execute("SELECT id, text, category FROM chunks WHERE category = ?", (category,))
+                else:
+                    cursor.execute("SELECT id, text, category FROM chunks")
+
+                hits = []
+                for chunk_id, text, category in cursor.fetchall():
+                    text_lower = text.lower()
+
+                    # Calculate a simple score based on keyword matches
+                    score = sum(1 for keyword in keywords if keyword in text_lower)
+                    if score > 0:
+                        hits.append(SearchHit(chunk_id, score / len(keywords), category))  # Normalized score
+
+            # Keep the top_k hits (ties stay in table order) and load only those
+            top_hits = heapq.nlargest(top_k, hits, key=lambda hit: hit.score)
+            top_results = self._fetch_chunks([(hit.id, hit.score) for hit in top_hits])
+
             logger.info(f"Retrieved {len(top_results)} knowledge chunks using keyword search for query: {query}")
             return top_results
             
@@ -199,7 +890,10 @@ class KnowledgeRetriever:
             
     def update_usage_statistics(self, chunk_id: int, effectiveness_score: float = 0.0) -> None:
         """
-        Update usage statistics for a knowledge chunk.
+        Update usage statistics for a knowledge chunk immediately.
+
+        Request handlers should prefer record_usage, which buffers the update
+        and writes it in the background.
         
         Args:
             chunk_id (int): The ID of the knowledge chunk
@@ -210,37 +904,41 @@ class KnowledgeRetriever:
             return
             
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get current usage count and effectiveness score
-            cursor.execute("SELECT usage_count, effectiveness_score FROM chunks WHERE id = ?", (chunk_id,))
-            result = cursor.fetchone()
-            
-            if result:
-                usage_count, current_score = result
-                
-                # Calculate new weighted average score
-                new_usage_count = usage_count + 1
-                if effectiveness_score > 0:
-                    new_score = (current_score * usage_count + effectiveness_score) / new_usage_count
-                else:
-                    new_score = current_score
-                    
-                # Update the database
-                cursor.execute(
-                    "UPDATE chunks SET usage_count = ?, effectiveness_score = ? WHERE id = ?",
-                    (new_usage_count, new_score, chunk_id)
-                )
-                conn.commit()
-                logger.info(f"Updated usage statistics for chunk {chunk_id}: score={new_score:.2f}, uses={new_usage_count}")
+            scored = 1 if effectiveness_score > 0 else 0
+            with self.db.writer() as conn:
+                # Increment in SQL so concurrent updates cannot overwrite each other
+                cursor = conn.execute(USAGE_UPDATE_SQL, {
+                    "chunk_id": chunk_id, "uses": 1, "scored": scored,
+                    "score_sum": effectiveness_score if scored else 0.0
+                })
+            if cursor.rowcount:
+                logger.info(f"Updated usage statistics for chunk {chunk_id}")
             else:
                 logger.warning(f"Chunk ID {chunk_id} not found")
-                
-            conn.close()
             
         except Exception as e:
             logger.error(f"Error updating usage statistics: {e}")
+
+    def record_usage(self, chunk_ids: Sequence[int], effectiveness_score: float = 0.0) -> None:
+        """
+        Buffer usage statistics for knowledge chunks without touching the database.
+
+        The updates are written by usage_recorder in the background, in one
+        transaction per flush.
+
+        Args:
+            chunk_ids (Sequence[int]): IDs of the knowledge chunks used
+            effectiveness_score (float): The effectiveness score (0.0-1.0)
+        """
+        if not self.database_available:
+            logger.warning("Vector database not available. Cannot update usage statistics.")
+            return
+        self.usage_recorder.record_many(chunk_ids, effectiveness_score)
+
+    def close(self) -> None:
+        """Write pending usage statistics and stop the background recorder."""
+        if self.usage_recorder is not None:
+            self.usage_recorder.close()
             
     def get_categories(self) -> List[str]:
         """
@@ -254,13 +952,12 @@ class KnowledgeRetriever:
             return []
             
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT DISTINCT category FROM chunks")
-            categories = [row[0] for row in cursor.fetchall()]
-            
-            conn.close()
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+
+                cursor.execute("SELECT DISTINCT category FROM chunks")
+                categories = [row[0] for row in cursor.fetchall()]
+
             logger.info(f"Retrieved {len(categories)} knowledge categories")
             return categories
             
@@ -271,6 +968,10 @@ class KnowledgeRetriever:
     def get_most_effective_knowledge(self, category: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get the most effective knowledge chunks based on usage and effectiveness scores.
+
+        Limits up to LEADERBOARD_SIZE are served from the maintained leaderboard
+        table; larger ones walk the composite (category, effectiveness_score,
+        usage_count) index on chunks.
         
         Args:
             category (str, optional): Filter by knowledge category
@@ -284,41 +985,39 @@ class KnowledgeRetriever:
             return []
             
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            if category:
-                cursor.execute(
-                    """SELECT id, text, metadata, category, effectiveness_score, usage_count 
-                       FROM chunks 
-                       WHERE category = ? AND usage_count > 0 
-                       ORDER BY effectiveness_score DESC, usage_count DESC 
-                       LIMIT ?""",
-                    (category, limit)
-                )
-            else:
-                cursor.execute(
-                    """SELECT id, text, metadata, category, effectiveness_score, usage_count 
-                       FROM chunks 
-                       WHERE usage_count > 0 
-                       ORDER BY effectiveness_score DESC, usage_count DESC 
-                       LIMIT ?""",
-                    (limit,)
-                )
-                
-            results = []
-            for row in cursor.fetchall():
-                chunk_id, text, metadata_json, category, score, count = row
-                results.append({
-                    "id": chunk_id,
-                    "text": text,
-                    "metadata": json.loads(metadata_json),
-                    "category": category,
-                    "effectiveness_score": score,
-                    "usage_count": count
-                })
-                
-            conn.close()
+            with self.db.reader() as conn:
+                cursor = conn.cursor()
+
+                if self.leaderboard_available and limit <= LEADERBOARD_SIZE:
+                    # The leaderboard holds the top chunks per category; only
+                    # their text and metadata are read from chunks
+                    where = "WHERE l.category = ?" if category else ""
+                    query = f"""SELECT c.id, c.text, c.metadata, c.category, l.effectiveness_score, l.usage_count
+                                FROM {LEADERBOARD_TABLE} l JOIN chunks c ON c.id = l.chunk_id
+                                {where}
+                                ORDER BY l.effectiveness_score DESC, l.usage_count DESC
+                                LIMIT ?"""
+                else:
+                    where = "WHERE category = ? AND usage_count > 0" if category else "WHERE usage_count > 0"
+                    query = f"""SELECT id, text, metadata, category, effectiveness_score, usage_count
+                                FROM chunks
+                                {where}
+                                ORDER BY effectiveness_score DESC, usage_count DESC
+                                LIMIT ?"""
+                cursor.execute(query, (category, limit) if category else (limit,))
+
+                results = []
+                for row in cursor.fetchall():
+                    chunk_id, text, metadata_json, category, score, count = row
+                    results.append({
+                        "id": chunk_id,
+                        "text": text,
+                        "metadata": json.loads(metadata_json),
+                        "category": category,
+                        "effectiveness_score": score,
+                        "usage_count": count
+                    })
+
             logger.info(f"Retrieved {len(results)} most effective knowledge chunks")
             return results
             
@@ -0,0 +1,528 @@
+"""
+Knowledge Store Schema Module for Utah Teacher Training Assistant (UTTA)
+
+This module manages auxiliary SQLite structures of the Educational Knowledge
+Base (``vector_db.sqlite``) that sit next to the ``chunks`` and ``embeddings``
+tables, such as the FTS5 full-text index used for keyword search, the
+knowledge-base version counter used to invalidate caches and indexes, and the
+embedding storage migrations (unit-length vectors and an int8 copy of them),
+and the per-category leaderboard of the most effective chunks.
+
+Functions:
+    ensure_fts_index: Create the FTS5 index over ``chunks.text`` and its sync triggers.
+    rebuild_fts_index: Repopulate the FTS5 index from the ``chunks`` table.
+    has_fts_index: Check whether the FTS5 index exists.
+    build_match_query: Turn a free-text query into an FTS5 MATCH expression.
+    ensure_version_tracking: Create the version counter and the triggers that bump it.
+    has_version_tracking: Check whether the version counter triggers exist.
+    get_kb_version: Read the current knowledge-base version.
+    normalize_embeddings: Rewrite stored embeddings as unit-length vectors.
+    quantize_embeddings: Build the int8 copy of the embeddings used for candidate scoring.
+    quantize_vectors: Scalar-quantize float vectors to int8 codes.
+    embeddings_normalized: Check whether every stored embedding is unit length.
+    quantized_embeddings_available: Check whether the int8 copy matches the embeddings.
+    ensure_leaderboard: Create the ranking indexes and the maintained leaderboard table.
+    has_leaderboard: Check whether the leaderboard and its triggers exist.
+    rebuild_leaderboard: Repopulate the leaderboard from the ``chunks`` table.
+
+Example:
+    conn = sqlite3.connect("knowledge_base/vector_db.sqlite")
+    ensure_fts_index(conn)
+    conn.execute("SELECT rowid FROM chunks_fts WHERE chunks_fts MATCH ?", (build_match_query("IEP goals"),))
+
+    ensure_version_tracking(conn)
+    version = get_kb_version(conn)
+
+    normalize_embeddings(conn)
+    quantize_embeddings(conn)
+
+    ensure_leaderboard(conn)
+"""
+
+import re
+import sqlite3
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "chunks_fts"
+
+# External-content FTS5 table: the text lives in ``chunks`` and only the
+# inverted index is stored here. Triggers keep it in sync with ``chunks``; the
+# update trigger only fires for text changes, so usage statistics writes do
+# not touch the index.
+_FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text, content='chunks', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON chunks BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON chunks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF text ON chunks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+
+
+META_TABLE = "kb_meta"
+
+# The version is bumped whenever searchable content changes. Usage statistics
+# (usage_count, effectiveness_score) are deliberately excluded so that they do
+# not invalidate cached search results.
+_BUMP_VERSION = f"UPDATE {META_TABLE} SET value = value + 1 WHERE key = 'version';"
+_VERSION_SCHEMA = [
+    f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    f"INSERT OR IGNORE INTO {META_TABLE} (key, value) VALUES ('version', 0)",
+    f"CREATE TRIGGER IF NOT EXISTS kb_version_chunks_ai AFTER INSERT ON chunks BEGIN {_BUMP_VERSION} END",
+    f"CREATE TRIGGER IF NOT EXISTS kb_version_chunks_ad AFTER DELETE ON chunks BEGIN {_BUMP_VERSION} END",
+    f"""CREATE TRIGGER IF NOT EXISTS kb_version_chunks_au
+        AFTER UPDATE OF text, metadata, category ON chunks BEGIN {_BUMP_VERSION} END""",
+    f"CREATE TRIGGER IF NOT EXISTS kb_version_embeddings_ai AFTER INSERT ON embeddings BEGIN {_BUMP_VERSION} END",
+    f"CREATE TRIGGER IF NOT EXISTS kb_version_embeddings_ad AFTER DELETE ON embeddings BEGIN {_BUMP_VERSION} END",
+    f"CREATE TRIGGER IF NOT EXISTS kb_version_embeddings_au AFTER UPDATE ON embeddings BEGIN {_BUMP_VERSION} END",
+]
+
+
+def has_fts_index(conn: sqlite3.Connection) -> bool:
+    """
+    Check whether the FTS5 index over ``chunks.text`` exists.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the vector database
+
+    Returns:
+        bool: True if the index table exists
+    """
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).fetchone()
+    return row is not None
+
+
+def ensure_fts_index(conn: sqlite3.Connection) -> bool:
+    """
+    Create the FTS5 index and its sync triggers if they do not exist yet.
+
+    A newly created index is populated from the existing ``chunks`` rows.
+
+    Args:
+        conn (sqlite3.Connection): Writable connection to the vector database
+
+    Returns:
+        bool: True if the index is available, False if it could not be created
+              (e.g. SQLite built without FTS5 or a read-only database)
+    """
+    try:
+        if has_fts_index(conn):
+            return True
+        with conn:
+            for statement in _FTS_SCHEMA:
+                conn.execute(statement)
+            conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        logger.info(f"Created FTS5 index {FTS_TABLE} over chunks.text")
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"Could not create FTS5 keyword index: {e}")
+        return False
+
+
+def rebuild_fts_index(conn: sqlite3.Connection) -> None:
+    """
+    Repopulate the FTS5 index from the ``chunks`` table.
+
+    Args:
+        conn (sqlite3.Connection): Writable connection to the vector database
+    """
+    if not ensure_fts_index(conn):
+        raise RuntimeError("FTS5 keyword index is not available")
+    with conn:
+        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn a free-text query into an FTS5 MATCH expression.
+
+    Every word is quoted (so FTS5 operators in user input are treated as text)
+    and the words are OR-ed together; BM25 ranks chunks matching more and rarer
+    words first.
+
+    Args:
+        query (str): The search query
+
+    Returns:
+        Optional[str]: The MATCH expression, or None if the query has no words
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+
+def ensure_version_tracking(conn: sqlite3.Connection) -> bool:
+    """
+    Create the knowledge-base version counter and the triggers that bump it.
+
+    Args:
+        conn (sqlite3.Connection): Writable connection to the vector database
+
+    Returns:
+        bool: True if version tracking is available
+    """
+    try:
+        if has_version_tracking(conn):
+            return True
+        with conn:
+            for statement in _VERSION_SCHEMA:
+                conn.execute(statement)
+        logger.info("Enabled knowledge base version tracking")
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"Could not enable knowledge base version tracking: {e}")
+        return False
+
+
+def has_version_tracking(conn: sqlite3.Connection) -> bool:
+    """
+    Check whether the knowledge-base version counter and its triggers exist.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the vector database
+
+    Returns:
+        bool: True if version tracking is set up
+    """
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'kb_version_embeddings_au'"
+    ).fetchone()
+    return row is not None
+
+
+def get_kb_version(conn: sqlite3.Connection) -> Optional[int]:
+    """
+    Read the current knowledge-base version.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the vector database
+
+    Returns:
+        Optional[int]: The version, or None if version tracking is not set up
+    """
+    try:
+        row = conn.execute(f"SELECT value FROM {META_TABLE} WHERE key = 'version'").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+QUANTIZED_TABLE = "embeddings_int8"
+
+# Writes to ``embeddings`` clear both storage flags, since new or changed
+# vectors may not be unit length and are missing from the int8 copy. Deleted
+# embeddings are removed from the int8 copy directly.
+_STORAGE_FLAGS = ("embeddings_normalized", "embeddings_quantized")
+_CLEAR_FLAGS = (
+    f"UPDATE {META_TABLE} SET value = 0 "
+    f"WHERE key IN ('embeddings_normalized', 'embeddings_quantized');"
+)
+_STORAGE_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS {QUANTIZED_TABLE} (
+        chunk_id INTEGER PRIMARY KEY, codes BLOB NOT NULL
+    )""",
+    f"CREATE TRIGGER IF NOT EXISTS kb_storage_embeddings_ai AFTER INSERT ON embeddings BEGIN {_CLEAR_FLAGS} END",
+    f"CREATE TRIGGER IF NOT EXISTS kb_storage_embeddings_au AFTER UPDATE ON embeddings BEGIN {_CLEAR_FLAGS} END",
+    f"""CREATE TRIGGER IF NOT EXISTS kb_storage_embeddings_ad AFTER DELETE ON embeddings BEGIN
+        DELETE FROM {QUANTIZED_TABLE} WHERE chunk_id = old.chunk_id;
+    END""",
+]
+
+
+def _ensure_storage_schema(conn: sqlite3.Connection) -> None:
+    """Create the int8 table, the storage flags and the triggers that clear them."""
+    if not ensure_version_tracking(conn):
+        raise RuntimeError("Knowledge base version tracking is not available")
+    with conn:
+        for statement in _STORAGE_SCHEMA:
+            conn.execute(statement)
+        for key in _STORAGE_FLAGS:
+            conn.execute(f"INSERT OR IGNORE INTO {META_TABLE} (key, value) VALUES (?, 0)", (key,))
+
+
+def _get_flag(conn: sqlite3.Connection, key: str) -> bool:
+    """Read a storage flag from ``kb_meta``; missing flags read as False."""
+    try:
+        row = conn.execute(f"SELECT value FROM {META_TABLE} WHERE key = ?", (key,)).fetchone()
+    except sqlite3.OperationalError:
+        return False
+    return bool(row and row[0])
+
+
+def _iter_embedding_batches(conn: sqlite3.Connection, batch_rows: int):
+    """Yield (rowids, chunk ids, vector matrix) batches of the embeddings table in rowid order."""
+    last_rowid = 0
+    while True:
+        rows = conn.execute(
+            "SELECT rowid, chunk_id, vector FROM embeddings WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (last_rowid, batch_rows)
+        ).fetchall()
+        if not rows:
+            return
+        rowids, chunk_ids, blobs = zip(*rows)
+        vectors = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(rows), -1)
+        yield rowids, chunk_ids, vectors
+        last_rowid = rowids[-1]
+
+
+def embeddings_normalized(conn: sqlite3.Connection) -> bool:
+    """
+    Check whether every stored embedding is known to be unit length.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the vector database
+
+    Returns:
+        bool: True if ``normalize_embeddings`` ran and no embedding was written since
+    """
+    return _get_flag(conn, "embeddings_normalized")
+
+
+def quantized_embeddings_available(conn: sqlite3.Connection) -> bool:
+    """
+    Check whether the int8 copy of the embeddings is complete and current.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the vector database
+
+    Returns:
+        bool: True if ``quantize_embeddings`` ran and no embedding was written since
+    """
+    return _get_flag(conn, "embeddings_quantized")
+
+
+def normalize_embeddings(conn: sqlite3.Connection, batch_rows: int = 1000) -> int:
+    """
+    Rewrite the stored embeddings as L2-normalized vectors.
+
+    Cosine similarity against unit-length vectors is a plain dot product, so
+    searches no longer compute a norm per stored vector. Vectors that are
+    already unit length (and zero vectors) are left untouched. The migration
+    runs in one transaction.
+
+    Args:
+        conn (sqlite3.Connection): Writable connection to the vector database
+        batch_rows (int): Number of embeddings read and rewritten at a time
+
+    Returns:
+        int: Number of embeddings rewritten
+    """
+    _ensure_storage_schema(conn)
+    updated = 0
+    with conn:
+        for rowids, _, vectors in _iter_embedding_batches(conn, batch_rows):
+            norms = np.linalg.norm(vectors, axis=1)
+            rewrite = (norms > 0) & (np.abs(norms - 1.0) > 1e-6)
+            if not rewrite.any():
+                continue
+            unit = vectors[rewrite] / norms[rewrite, None]
+            conn.executemany(
+                "UPDATE embeddings SET vector = ? WHERE rowid = ?",
+                [(vector.astype(np.float32).tobytes(), rowid)
+                 for vector, rowid in zip(unit, np.asarray(rowids)[rewrite].tolist())]
+            )
+            updated += len(unit)
+        # Set after the rewrites, whose triggers clear the flag
+        conn.execute(f"UPDATE {META_TABLE} SET value = 1 WHERE key = 'embeddings_normalized'")
+    logger.info(f"Normalized {updated} embeddings")
+    return updated
+
+
+def quantize_vectors(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scalar-quantize vectors to int8 with one symmetric scale per vector.
+
+    Each vector is scaled so that its largest absolute component maps to 127.
+    The scale is not stored: cosine similarity does not depend on it, and exact
+    scores are recomputed from the float32 vectors.
+
+    Args:
+        vectors (np.ndarray): Float matrix of shape (n, dimension)
+
+    Returns:
+        np.ndarray: int8 codes of the same shape
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1, keepdims=True) / 127.0
+    scales[scales == 0] = 1.0
+    return np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+
+
+def quantize_embeddings(conn: sqlite3.Connection, batch_rows: int = 1000) -> int:
+    """
+    Rebuild the int8 copy of the embeddings in ``embeddings_int8``.
+
+    The int8 codes take a quarter of the space of the float32 vectors; an
+    index over them ranks candidates which are then rescored exactly against
+    the float32 vectors.
+
+    Args:
+        conn (sqlite3.Connection): Writable connection to the vector database
+        batch_rows (int): Number of embeddings read and quantized at a time
+
+    Returns:
+        int: Number of embeddings quantized
+    """
+    _ensure_storage_schema(conn)
+    count = 0
+    with conn:
+        conn.execute(f"DELETE FROM {QUANTIZED_TABLE}")
+        for _, chunk_ids, vectors in _iter_embedding_batches(conn, batch_rows):
+            codes = quantize_vectors(vectors)
+            conn.executemany(
+                f"INSERT INTO {QUANTIZED_TABLE} (chunk_id, codes) VALUES (?, ?)",
+                [(chunk_id, row.tobytes()) for chunk_id, row in zip(chunk_ids, codes)]
+            )
+            count += len(codes)
+        conn.execute(f"UPDATE {META_TABLE} SET value = 1 WHERE key = 'embeddings_quantized'")
+    logger.info(f"Quantized {count} embeddings to int8")
+    return count
+
+
+LEADERBOARD_TABLE = "knowledge_leaderboard"
+# Chunks kept per category; get_most_effective_knowledge calls with a larger
+# limit read the chunks table (through its composite index) instead
+LEADERBOARD_SIZE = 50
+
+_LEADERBOARD_ORDER = "effectiveness_score DESC, usage_count DESC"
+
+
+def _refresh_leaderboard_category(category: str) -> str:
+    """SQL that recomputes one category's leaderboard rows from the chunks index."""
+    return f"""
+        DELETE FROM {LEADERBOARD_TABLE} WHERE category IS {category};
+        INSERT INTO {LEADERBOARD_TABLE} (chunk_id, category, effectiveness_score, usage_count)
+            SELECT id, category, effectiveness_score, usage_count FROM chunks
+            WHERE category IS {category} AND usage_count > 0
+            ORDER BY {_LEADERBOARD_ORDER} LIMIT {LEADERBOARD_SIZE};
+    """
+
+
+def _affects_leaderboard(row: str) -> str:
+    """
+    Trigger condition: the chunk is on its category's leaderboard, or could
+    enter it (the board has room, or the chunk ranks at or above its last entry).
+    """
+    return f"""(
+        {row}.id IN (SELECT chunk_id FROM {LEADERBOARD_TABLE})
+        OR ({row}.usage_count > 0 AND (
+            (SELECT COUNT(*) FROM {LEADERBOARD_TABLE} WHERE category IS {row}.category) < {LEADERBOARD_SIZE}
+            OR ({row}.effectiveness_score, {row}.usage_count) >= (
+                SELECT effectiveness_score, usage_count FROM {LEADERBOARD_TABLE}
+                WHERE category IS {row}.category
+                ORDER BY effectiveness_score, usage_count LIMIT 1
+            )
+        ))
+    )"""
+
+
+# Composite indexes serve the ranking query straight from the index (the
+# second one, partial, for the all-category ranking). The leaderboard holds
+# the top LEADERBOARD_SIZE used chunks per category and is kept current by
+# triggers in the same transaction as every usage statistics write; writes
+# that cannot change a category's ranking skip the refresh.
+_LEADERBOARD_SCHEMA = [
+    """CREATE INDEX IF NOT EXISTS idx_chunks_category_effectiveness
+        ON chunks (category, effectiveness_score, usage_count)""",
+    """CREATE INDEX IF NOT EXISTS idx_chunks_effectiveness
+        ON chunks (effectiveness_score, usage_count) WHERE usage_count > 0""",
+    f"""CREATE TABLE IF NOT EXISTS {LEADERBOARD_TABLE} (
+        chunk_id INTEGER PRIMARY KEY, category TEXT,
+        effectiveness_score REAL, usage_count INTEGER
+    )""",
+    f"""CREATE INDEX IF NOT EXISTS idx_{LEADERBOARD_TABLE}_category
+        ON {LEADERBOARD_TABLE} (category, effectiveness_score, usage_count)""",
+    f"""CREATE INDEX IF NOT EXISTS idx_{LEADERBOARD_TABLE}_rank
+        ON {LEADERBOARD_TABLE} (effectiveness_score, usage_count)""",
+    f"""CREATE TRIGGER IF NOT EXISTS {LEADERBOARD_TABLE}_au
+        AFTER UPDATE OF usage_count, effectiveness_score, category ON chunks
+        WHEN {_affects_leaderboard("new")} OR old.id IN (SELECT chunk_id FROM {LEADERBOARD_TABLE})
+        BEGIN {_refresh_leaderboard_category("new.category")} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {LEADERBOARD_TABLE}_au_moved
+        AFTER UPDATE OF category ON chunks
+        WHEN old.category IS NOT new.category
+        BEGIN {_refresh_leaderboard_category("old.category")} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {LEADERBOARD_TABLE}_ai AFTER INSERT ON chunks
+        WHEN {_affects_leaderboard("new")}
+        BEGIN {_refresh_leaderboard_category("new.category")} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {LEADERBOARD_TABLE}_ad AFTER DELETE ON chunks
+        WHEN old.id IN (SELECT chunk_id FROM {LEADERBOARD_TABLE})
+        BEGIN {_refresh_leaderboard_category("old.category")} END""",
+]
+
+
+def rebuild_leaderboard(conn: sqlite3.Connection) -> None:
+    """
+    Repopulate the leaderboard of every category from the ``chunks`` table.
+
+    Args:
+        conn (sqlite3.Connection): Writable connection to the vector database
+    """
+    with conn:
+        conn.execute(f"DELETE FROM {LEADERBOARD_TABLE}")
+        conn.execute(
+            f"""INSERT INTO {LEADERBOARD_TABLE} (chunk_id, category, effectiveness_score, usage_count)
+                SELECT id, category, effectiveness_score, usage_count FROM (
+                    SELECT id, category, effectiveness_score, usage_count,
+                           ROW_NUMBER() OVER (PARTITION BY category ORDER BY {_LEADERBOARD_ORDER}) AS rank
+                    FROM chunks WHERE usage_count > 0
+                ) WHERE rank <= {LEADERBOARD_SIZE}"""
+        )
+
+
+def has_leaderboard(conn: sqlite3.Connection) -> bool:
+    """
+    Check whether the leaderboard and its sync triggers exist.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the vector database
+
+    Returns:
+        bool: True if the leaderboard is set up
+    """
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"{LEADERBOARD_TABLE}_ad",)
+    ).fetchone()
+    return row is not None
+
+
+def ensure_leaderboard(conn: sqlite3.Connection) -> bool:
+    """
+    Create the ranking indexes and the per-category leaderboard if needed.
+
+    A newly created leaderboard is populated from the existing ``chunks`` rows.
+
+    Args:
+        conn (sqlite3.Connection): Writable connection to the vector database
+
+    Returns:
+        bool: True if the leaderboard is available
+    """
+    try:
+        if has_leaderboard(conn):
+            return True
+        with conn:
+            for statement in _LEADERBOARD_SCHEMA:
+                conn.execute(statement)
+        rebuild_leaderboard(conn)
+        logger.info("Created most-effective-knowledge leaderboard")
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"Could not create knowledge leaderboard: {e}")
+        return False
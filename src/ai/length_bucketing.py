@@ -0,0 +1,131 @@
+"""
+Length-Bucketed Batching Module for Utah Teacher Training Assistant (UTTA)
+
+A transformer batch is padded to its longest member, so a batch mixing
+one-line prompts with multi-paragraph scenarios spends most of its compute
+on pad tokens. This module measures texts in real tokens, sorts them by
+length and cuts the sorted order into buckets of a fixed batch size or of a
+padded-token budget (so buckets of short texts hold more texts).
+Padding efficiency (real tokens / padded tokens) is reported for the plan
+and for the unsorted baseline.
+
+Functions:
+    token_lengths: Length of each text in model tokens.
+    plan_buckets: Group text indices into length-sorted buckets.
+    padding_stats: Padding efficiency of a bucketing plan.
+
+Example:
+    lengths = token_lengths(model, texts)
+    buckets = plan_buckets(lengths, batch_size=32, max_tokens=8192, max_batch_size=256)
+    print(padding_stats(lengths, buckets, batch_size=32))
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def token_lengths(model: Any, texts: Sequence[str]) -> np.ndarray:
+    """
+    Return the length of each text in model tokens, including special tokens.
+
+    Uses the Hugging Face tokenizer of a SentenceTransformer or the fast
+    tokenizer of an OnnxSentenceEncoder, truncated to the model's
+    max_seq_length; models without a tokenizer fall back to word counts.
+
+    Args:
+        model (Any): A loaded model (e.g. SharedModel.model)
+        texts (Sequence[str]): The texts
+
+    Returns:
+        np.ndarray: int64 token count per text
+    """
+    tokenizer = getattr(model, "tokenizer", None)
+    max_length = getattr(model, "max_seq_length", None)
+    if hasattr(tokenizer, "encode_batch"):
+        # tokenizers.Tokenizer with truncation and padding enabled by OnnxSentenceEncoder
+        lengths = [sum(encoding.attention_mask) for encoding in tokenizer.encode_batch(list(texts))]
+    elif callable(tokenizer):
+        encoded = tokenizer(list(texts), truncation=max_length is not None, max_length=max_length,
+                            padding=False)
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+    else:
+        lengths = [len(text.split()) + 2 for text in texts]
+    return np.asarray(lengths, dtype=np.int64)
+
+
+def plan_buckets(lengths: Sequence[int], batch_size: int, max_tokens: Optional[int] = None,
+                 max_batch_size: Optional[int] = None) -> List[np.ndarray]:
+    """
+    Group text indices into buckets of similar token length.
+
+    Indices are sorted by length, longest first, and cut into consecutive
+    buckets of ``batch_size`` texts. With ``max_tokens`` buckets are instead
+    sized so their padded size (longest length times number of texts) fits
+    the budget: long texts share small buckets and short texts large ones,
+    so ``batch_size`` is not used and ``max_batch_size`` bounds how many
+    short texts share one bucket. A bucket always holds at least one text.
+
+    Args:
+        lengths (Sequence[int]): Token length per text
+        batch_size (int): Texts per bucket; ignored when max_tokens is given
+        max_tokens (int, optional): Padded-token budget per bucket
+        max_batch_size (int, optional): Most texts per bucket under max_tokens
+                                        (default: only the budget limits it)
+
+    Returns:
+        List[np.ndarray]: Arrays of text indices, one per bucket
+
+    Raises:
+        ValueError: If batch_size or max_batch_size is less than 1
+    """
+    if batch_size < 1 or (max_batch_size is not None and max_batch_size < 1):
+        raise ValueError("batch_size and max_batch_size must be at least 1")
+    lengths = np.asarray(lengths)
+    order = np.argsort(-lengths, kind="stable")
+    buckets = []
+    start = 0
+    while start < len(order):
+        longest = max(int(lengths[order[start]]), 1)
+        if max_tokens is None:
+            size = batch_size
+        else:
+            size = max(1, max_tokens // longest)
+            if max_batch_size is not None:
+                size = min(size, max_batch_size)
+        buckets.append(order[start:start + size])
+        start += size
+    return buckets
+
+
+def padding_stats(lengths: Sequence[int], buckets: List[np.ndarray], batch_size: int) -> Dict[str, float]:
+    """
+    Report how much of a bucketing plan's compute goes to real tokens.
+
+    Args:
+        lengths (Sequence[int]): Token length per text
+        buckets (List[np.ndarray]): The plan from plan_buckets
+        batch_size (int): Batch size of the unsorted baseline
+
+    Returns:
+        Dict[str, float]: texts, buckets, tokens, padded_tokens,
+                          padding_efficiency, and the padded tokens and
+                          efficiency of batching the texts in input order
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    tokens = int(lengths.sum())
+    padded = sum(int(lengths[bucket].max()) * len(bucket) for bucket in buckets if len(bucket))
+    baseline = sum(int(lengths[start:start + batch_size].max()) * len(lengths[start:start + batch_size])
+                   for start in range(0, len(lengths), batch_size))
+    return {
+        "texts": len(lengths),
+        "buckets": len(buckets),
+        "tokens": tokens,
+        "padded_tokens": padded,
+        "padding_efficiency": tokens / padded if padded else 1.0,
+        "unsorted_padded_tokens": baseline,
+        "unsorted_padding_efficiency": tokens / baseline if baseline else 1.0
+    }
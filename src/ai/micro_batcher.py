@@ -0,0 +1,166 @@
+"""
+Embedding Micro-Batching Module for Utah Teacher Training Assistant (UTTA)
+
+Under load many requests each encode a single query, so the sentence
+transformer runs batch size 1 many times over. This module collects the
+encode requests that arrive within a short window (``SCENARIO_CONFIG
+["batch_window_ms"]``) and runs them through one batched encode call; a batch
+is sent early once it reaches ``SCENARIO_CONFIG["batch_size"]`` texts. Each
+caller awaits a future resolved with its own row, so a query pays at most the
+window in added latency while a busy server encodes far more queries per core.
+
+Classes:
+    EmbeddingMicroBatcher: Coalesces concurrent single-text encodes into batches.
+
+Example:
+    batcher = EmbeddingMicroBatcher(embedder.embed_queries, run=async_retriever.run)
+    embedding = await batcher.encode("How to handle classroom disruption?")
+    print(batcher.stats())
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ._config import SCENARIO_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingMicroBatcher:
+    """
+    Collects concurrent encode requests and runs them as one batch.
+
+    The batcher lives on the event loop that first uses it and needs no
+    locks: requests are queued, and the batch is dispatched either when it
+    is full or when the window timer fires. The blocking encode call runs off
+    the loop through ``run``. Identical texts in one batch are encoded once.
+
+    Attributes:
+        encode_batch (Callable[[List[str]], np.ndarray]): Blocking batch encoder
+        max_batch_size (int): Texts per encode call
+        max_wait_ms (float): Longest a request waits for others to join its batch
+        requests (int): Number of encode requests served
+        batches (int): Number of encode calls made
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = SCENARIO_CONFIG["batch_size"],
+                 max_wait_ms: float = SCENARIO_CONFIG["batch_window_ms"],
+                 run: Optional[Callable[..., Awaitable[Any]]] = None):
+        """
+        Initialize an empty batcher.
+
+        Args:
+            encode_batch (Callable[[List[str]], np.ndarray]): Blocking function
+                returning one embedding row per text
+            max_batch_size (int): Texts per encode call
+            max_wait_ms (float): Batching window in milliseconds
+            run (Callable[..., Awaitable[Any]], optional): Coroutine function that
+                runs a blocking call off the loop, e.g. AsyncKnowledgeRetriever.run;
+                defaults to the loop's default executor
+
+        Raises:
+            ValueError: If max_batch_size is less than 1 or max_wait_ms is negative
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative")
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._run = run or self._run_in_default_executor
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.requests = 0
+        self.batches = 0
+
+    @staticmethod
+    async def _run_in_default_executor(func: Callable[..., Any], *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args))
+
+    async def encode(self, text: str) -> np.ndarray:
+        """
+        Encode one text as part of the next batch.
+
+        Args:
+            text (str): The text to encode
+
+        Returns:
+            np.ndarray: The text's embedding row
+
+        Raises:
+            Exception: Whatever the batch encoder raised for this batch
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._dispatch)
+        return await future
+
+    async def encode_many(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Encode several texts, sharing batches with concurrent callers.
+
+        Args:
+            texts (Sequence[str]): The texts to encode
+
+        Returns:
+            np.ndarray: One embedding row per text, in input order
+        """
+        return np.stack(await asyncio.gather(*(self.encode(text) for text in texts)))
+
+    def _dispatch(self) -> None:
+        """Send the queued requests to the encoder as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        task = asyncio.ensure_future(self._encode(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _encode(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Encode one batch and resolve every caller's future."""
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = await self._run(self.encode_batch, texts)
+        except Exception as e:
+            logger.error(f"Batched encode of {len(texts)} texts failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        rows = dict(zip(texts, embeddings))
+        for text, future in batch:
+            # Callers that were cancelled while waiting have a done future
+            if not future.done():
+                future.set_result(rows[text])
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report batching counters.
+
+        Returns:
+            Dict[str, float]: requests, batches, mean_batch_size and pending
+        """
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "pending": len(self._pending)
+        }
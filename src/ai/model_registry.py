@@ -0,0 +1,236 @@
+"""
+Embedding Model Registry Module for Utah Teacher Training Assistant (UTTA)
+
+This module loads each SentenceTransformer model once per process and hands
+out shared handles to it. EmbeddingGenerator, KnowledgeRetriever (and through
+them RAGPipeline, ResponseEvaluator, TeacherTrainingChatbot and the web API)
+all encode with the same in-memory copy of ``all-MiniLM-L6-v2`` instead of
+loading their own.
+
+``sentence_transformers`` (and with it PyTorch) is only imported when the first
+model is loaded, so importing the AI modules stays fast.
+
+Models run on one of several backends: "torch" (SentenceTransformer), "onnx"
+or "onnx-int8" (ONNX Runtime, see ai.onnx_encoder). The default comes from
+``SCENARIO_CONFIG["embedding_backend"]``; each (model, backend) pair is loaded
+once.
+
+Classes:
+    SharedModel: Thread-safe handle to a loaded model.
+
+Functions:
+    get_model: Return the shared handle for a model, loading it on first use.
+    model_key: Registry and cache key of a model on a backend.
+    loaded_models: List the handles loaded in this process.
+    model_memory_report: Report the memory used by every loaded model.
+    clear_models: Forget every loaded model.
+
+Example:
+    model = get_model("all-MiniLM-L6-v2")
+    embedding = model.encode("How to handle classroom disruption?")
+    print(model_memory_report())
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from ._config import SCENARIO_CONFIG
+
+# Imported by _sentence_transformer_class on the first model load
+SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _sentence_transformer_class():
+    """Import SentenceTransformer on first use; importing torch takes seconds."""
+    global SentenceTransformer
+    if SentenceTransformer is None:
+        from sentence_transformers import SentenceTransformer as model_class
+        SentenceTransformer = model_class
+    return SentenceTransformer
+
+
+class SharedModel:
+    """
+    A thread-safe handle to a model shared by the whole process.
+
+    ``encode`` calls are serialized: the Hugging Face fast tokenizer inside a
+    SentenceTransformer cannot be used by two threads at once, and a single
+    encode call already uses every core through PyTorch's intra-op threads.
+
+    Attributes:
+        name (str): Registry key of the model (see model_key)
+        model (SentenceTransformer): The loaded model
+        backend (str): Backend running the model
+        load_seconds (float): Time taken to load the model
+        memory_bytes (int): Bytes held by the model's parameters and buffers
+    """
+
+    def __init__(self, name: str, model: Any, load_seconds: float = 0.0, backend: str = "torch"):
+        """
+        Wrap a loaded model.
+
+        Args:
+            name (str): Registry key of the model
+            model (Any): The loaded model
+            load_seconds (float): Time taken to load the model
+            backend (str): Backend running the model
+        """
+        self.name = name
+        self.model = model
+        self.backend = backend
+        self.load_seconds = load_seconds
+        self.memory_bytes = self._measure_memory(model)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _measure_memory(model: Any) -> int:
+        """Sum the size of a PyTorch model's parameters and buffers (0 if not a torch module)."""
+        if hasattr(model, "memory_bytes"):
+            return int(model.memory_bytes)
+        total = 0
+        for attribute in ("parameters", "buffers"):
+            tensors = getattr(model, attribute, None)
+            if tensors is None:
+                continue
+            for tensor in tensors():
+                total += tensor.numel() * tensor.element_size()
+        return total
+
+    def encode(self, sentences, **kwargs):
+        """
+        Encode text with the shared model.
+
+        Args:
+            sentences: A string or list of strings
+            **kwargs: Passed to ``SentenceTransformer.encode``
+
+        Returns:
+            np.ndarray: One embedding, or one row per sentence
+        """
+        with self._lock:
+            return self.model.encode(sentences, **kwargs)
+
+    def get_sentence_embedding_dimension(self) -> Optional[int]:
+        """int: Dimension of the embeddings produced by the model, if known."""
+        get_dimension = getattr(self.model, "get_sentence_embedding_dimension", None)
+        return get_dimension() if get_dimension else None
+
+
+_models: Dict[str, SharedModel] = {}
+_models_lock = threading.Lock()
+_loading_locks: Dict[str, threading.Lock] = {}
+
+
+def _resolve_backend(backend: Optional[str]) -> str:
+    """Return the backend to use, defaulting to the configured one."""
+    backend = backend or SCENARIO_CONFIG["embedding_backend"]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    return backend
+
+
+def model_key(model_name: str, backend: Optional[str] = None) -> str:
+    """
+    Return the registry key of a model on a backend.
+
+    The key also names the model in the query-embedding cache and in stored
+    chunk hashes, so embeddings from different backends are never mixed up.
+
+    Args:
+        model_name (str): Name of the sentence transformer model
+        backend (str, optional): "torch", "onnx" or "onnx-int8"; defaults to the configured backend
+
+    Returns:
+        str: The model name for torch, "<model name>:<backend>" otherwise
+    """
+    backend = _resolve_backend(backend)
+    return model_name if backend == "torch" else f"{model_name}:{backend}"
+
+
+def _load_model(model_name: str, backend: str) -> Any:
+    """Load a model on the given backend."""
+    if backend == "torch":
+        return _sentence_transformer_class()(model_name)
+    from .onnx_encoder import OnnxSentenceEncoder, onnx_model_dir
+    return OnnxSentenceEncoder.from_directory(onnx_model_dir(model_name), quantized=backend == "onnx-int8")
+
+
+def get_model(model_name: str = "all-MiniLM-L6-v2", backend: Optional[str] = None) -> SharedModel:
+    """
+    Return the shared handle for a model, loading it on first use.
+
+    Concurrent first calls for the same model wait for a single load.
+
+    Args:
+        model_name (str): Name of the sentence transformer model
+        backend (str, optional): "torch", "onnx" or "onnx-int8"; defaults to
+                                 SCENARIO_CONFIG["embedding_backend"]
+
+    Returns:
+        SharedModel: The shared handle
+    """
+    backend = _resolve_backend(backend)
+    key = model_key(model_name, backend)
+    with _models_lock:
+        shared = _models.get(key)
+        if shared is not None:
+            return shared
+        loading_lock = _loading_locks.setdefault(key, threading.Lock())
+
+    with loading_lock:
+        with _models_lock:
+            shared = _models.get(key)
+        if shared is None:
+            start = time.perf_counter()
+            model = _load_model(model_name, backend)
+            shared = SharedModel(key, model, time.perf_counter() - start, backend)
+            with _models_lock:
+                _models[key] = shared
+            logger.info(
+                f"Loaded embedding model {model_name} ({backend}) in {shared.load_seconds:.1f}s "
+                f"({shared.memory_bytes / 2**20:.1f} MiB)"
+            )
+        return shared
+
+
+def loaded_models() -> List[SharedModel]:
+    """
+    List the models loaded in this process.
+
+    Returns:
+        List[SharedModel]: The shared handles
+    """
+    with _models_lock:
+        return list(_models.values())
+
+
+def model_memory_report() -> Dict[str, Dict[str, float]]:
+    """
+    Report the memory used by every loaded model.
+
+    Returns:
+        Dict[str, Dict[str, float]]: memory_mb and load_seconds per model name,
+                                     plus a "total" entry
+    """
+    report = {
+        shared.name: {"memory_mb": shared.memory_bytes / 2**20, "load_seconds": shared.load_seconds}
+        for shared in loaded_models()
+    }
+    report["total"] = {
+        "memory_mb": sum(entry["memory_mb"] for entry in report.values()),
+        "load_seconds": sum(entry["load_seconds"] for entry in report.values())
+    }
+    return report
+
+
+def clear_models() -> None:
+    """Forget every loaded model so the next get_model call reloads it."""
+    with _models_lock:
+        _models.clear()
+        _loading_locks.clear()
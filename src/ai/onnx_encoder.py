@@ -0,0 +1,248 @@
+"""
+ONNX Runtime Embedding Backend Module for Utah Teacher Training Assistant (UTTA)
+
+This module runs ``all-MiniLM-L6-v2`` with ONNX Runtime instead of PyTorch on
+CPU-only hosts. The transformer is exported once to ONNX (optionally with
+int8 dynamically quantized weights); at run time only ``onnxruntime`` and the
+Hugging Face ``tokenizers`` library are needed, both of which import and load
+much faster and use far less memory than torch. Mean pooling and L2
+normalization reproduce the SentenceTransformer pipeline, so the vectors are
+compatible with the existing 384-d knowledge-base index.
+
+Select the backend with ``SCENARIO_CONFIG["embedding_backend"]`` ("torch",
+"onnx" or "onnx-int8") or per instance, e.g. ``EmbeddingGenerator(backend="onnx")``.
+
+Classes:
+    OnnxSentenceEncoder: SentenceTransformer-compatible encoder on ONNX Runtime.
+
+Functions:
+    onnx_model_dir: Directory holding the exported files of a model.
+    export_onnx_model: Export a SentenceTransformer model to ONNX (fp32 and int8).
+
+Example:
+    export_onnx_model("all-MiniLM-L6-v2")          # once, needs torch
+    encoder = OnnxSentenceEncoder.from_directory(onnx_model_dir("all-MiniLM-L6-v2"), quantized=True)
+    embeddings = encoder.encode(["How to handle classroom disruption?"])
+"""
+
+import os
+import logging
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+import numpy as np
+
+from ._config import SCENARIO_CONFIG
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def onnx_model_dir(model_name: str) -> str:
+    """
+    Return the directory holding the exported ONNX files of a model.
+
+    Args:
+        model_name (str): Name of the sentence transformer model
+
+    Returns:
+        str: ``<SCENARIO_CONFIG["onnx_model_dir"]>/<model name>``
+    """
+    base = SCENARIO_CONFIG["onnx_model_dir"]
+    return os.path.join(str(base), model_name.replace("/", "__"))
+
+
+class OnnxSentenceEncoder:
+    """
+    A sentence encoder running an exported transformer on ONNX Runtime.
+
+    ``encode`` accepts the arguments of ``SentenceTransformer.encode`` that the
+    application uses and returns mean-pooled, L2-normalized float32 embeddings.
+
+    Attributes:
+        session (onnxruntime.InferenceSession): The loaded transformer
+        tokenizer (tokenizers.Tokenizer): The model's fast tokenizer
+        max_seq_length (int): Tokens kept per text (longer texts are truncated)
+        memory_bytes (int): Size of the loaded model file
+    """
+
+    def __init__(self, session: Any, tokenizer: Any, max_seq_length: int = 256, memory_bytes: int = 0):
+        """
+        Wrap an inference session and its tokenizer.
+
+        Args:
+            session (Any): ONNX Runtime session with input_ids/attention_mask
+                           inputs and a token-embeddings output
+            tokenizer (Any): Tokenizer returning ids and attention masks
+            max_seq_length (int): Tokens kept per text (256, as in all-MiniLM-L6-v2)
+            memory_bytes (int): Size of the loaded model file
+        """
+        self.session = session
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+        self.memory_bytes = memory_bytes
+        self._input_names = {model_input.name for model_input in session.get_inputs()}
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+    @classmethod
+    def from_directory(cls, model_dir: str, quantized: bool = False,
+                       max_seq_length: int = 256) -> "OnnxSentenceEncoder":
+        """
+        Load an encoder written by export_onnx_model.
+
+        Args:
+            model_dir (str): Directory with model.onnx / model_int8.onnx and tokenizer.json
+            quantized (bool): Load the int8 dynamically quantized model
+            max_seq_length (int): Tokens kept per text
+
+        Returns:
+            OnnxSentenceEncoder: The loaded encoder
+
+        Raises:
+            FileNotFoundError: If the model has not been exported
+            ImportError: If onnxruntime or tokenizers is not installed
+        """
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(f"The ONNX embedding backend requires onnxruntime and tokenizers "
+                              f"(pip install onnxruntime tokenizers): {e}") from e
+
+        model_path = Path(model_dir) / (QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"ONNX model not found at {model_path}; export it with scripts/export_onnx_model.py"
+            )
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = onnxruntime.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        tokenizer = Tokenizer.from_file(str(Path(model_dir) / TOKENIZER_FILE))
+        return cls(session, tokenizer, max_seq_length, memory_bytes=model_path.stat().st_size)
+
+    def get_sentence_embedding_dimension(self) -> Optional[int]:
+        """int: Dimension of the embeddings, read from the model's output shape."""
+        dimension = self.session.get_outputs()[0].shape[-1]
+        return dimension if isinstance(dimension, int) else None
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Tokenize, run and mean-pool one batch of texts."""
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feed = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feed["token_type_ids"] = np.zeros_like(input_ids)
+        token_embeddings = self.session.run(None, feed)[0]
+
+        # Mean pooling over real (non-padding) tokens, as in the SentenceTransformer Pooling layer
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = SCENARIO_CONFIG["batch_size"],
+               normalize_embeddings: bool = True, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """
+        Encode text like ``SentenceTransformer.encode``.
+
+        Args:
+            sentences (Union[str, List[str]]): A string or list of strings
+            batch_size (int): Texts run through the model at a time
+            normalize_embeddings (bool): L2-normalize the embeddings; all-MiniLM-L6-v2
+                                         ends with a Normalize layer, so this is on
+            convert_to_numpy (bool): Accepted for compatibility; output is always NumPy
+            **kwargs: Other SentenceTransformer options (e.g. show_progress_bar) are ignored
+
+        Returns:
+            np.ndarray: One float32 embedding, or one row per sentence
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, self.get_sentence_embedding_dimension() or 0), dtype=np.float32)
+
+        # Sort by length so each batch pads to similar lengths, then restore the order
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = None
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            batch = self._encode_batch([texts[i] for i in rows])
+            if embeddings is None:
+                embeddings = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+            embeddings[rows] = batch
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+def export_onnx_model(model_name: str = "all-MiniLM-L6-v2", output_dir: Optional[str] = None,
+                      quantize: bool = True, opset: int = 14) -> str:
+    """
+    Export a SentenceTransformer model's transformer to ONNX.
+
+    Writes ``model.onnx``, ``tokenizer.json`` and, with ``quantize``, the int8
+    dynamically quantized ``model_int8.onnx``. Needs torch, sentence_transformers
+    and, for quantization, onnxruntime and onnx; the exported files only need
+    onnxruntime and tokenizers.
+
+    Args:
+        model_name (str): Name of the sentence transformer model
+        output_dir (str, optional): Target directory; defaults to onnx_model_dir(model_name)
+        quantize (bool): Also write the int8 quantized model
+        opset (int): ONNX opset version
+
+    Returns:
+        str: The output directory
+
+    Raises:
+        ImportError: If onnxruntime or onnx is missing and quantize is set
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = output_dir or onnx_model_dir(model_name)
+    os.makedirs(output_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    sample = tokenizer(["An example sentence to trace the model."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+    class TokenEmbeddings(torch.nn.Module):
+        """Return only the last hidden state so the graph has a single output"""
+
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs)))[0]
+
+    model_path = os.path.join(output_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(transformer), tuple(sample[name] for name in input_names), model_path,
+            input_names=input_names, output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes, opset_version=opset, do_constant_folding=True
+        )
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, TOKENIZER_FILE))
+    logger.info(f"Exported {model_name} to {model_path}")
+
+    if quantize:
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError as e:
+            raise ImportError(f"int8 quantization requires onnxruntime and onnx (pip install onnxruntime onnx): {e}") from e
+        quantized_path = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        logger.info(f"Wrote int8 quantized model to {quantized_path}")
+    return output_dir
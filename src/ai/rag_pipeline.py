@@ -20,6 +20,8 @@ from .embedding import EmbeddingGenerator
 from ..database.vector_ops import VectorOperations
 from .llm_config import LLMConfig
 from .knowledge_retriever import KnowledgeRetriever
+from .async_retriever import AsyncKnowledgeRetriever
+from .micro_batcher import EmbeddingMicroBatcher
 import logging
 
 # Configure logging
@@ -39,6 +41,10 @@ class RAGPipeline:
         vector_ops (VectorOperations): Instance for vector storage operations
         llm (LLMConfig): Instance for LLM configuration and generation
         knowledge_retriever (KnowledgeRetriever): Instance for knowledge base retrieval
+        async_retriever (AsyncKnowledgeRetriever): Non-blocking access to knowledge_retriever
+                                                   through a bounded thread pool
+        query_batcher (EmbeddingMicroBatcher): Encodes the queries of concurrent
+                                               requests in shared batches
     """
 
     def __init__(self):
@@ -47,6 +53,8 @@ class RAGPipeline:
         self.vector_ops = VectorOperations()
         self.llm = LLMConfig()
         self.knowledge_retriever = KnowledgeRetriever()
+        self.async_retriever = AsyncKnowledgeRetriever(self.knowledge_retriever)
+        self.query_batcher = EmbeddingMicroBatcher(self.embedder.embed_queries, run=self.async_retriever.run)
         self._performance_metrics = {}
 
     async def initialize(self):
@@ -60,12 +68,26 @@ class RAGPipeline:
         await self.vector_ops.initialize()
         
         # Log knowledge base categories if available
-        categories = self.knowledge_retriever.get_categories()
+        categories = await self.async_retriever.get_categories()
         if categories:
             logger.info(f"Knowledge base categories: {', '.join(categories)}")
         else:
             logger.warning("No knowledge base categories found or knowledge base not available")
 
+    async def warmup(self) -> bool:
+        """
+        Load the embedding model and knowledge index ahead of the first query.
+
+        Models and indexes are loaded lazily, so a cold pipeline pays for them
+        on its first request. Await this from start-up code or a readiness probe.
+
+        Returns:
+            bool: True if semantic knowledge retrieval is ready
+        """
+        ready = await self.async_retriever.warmup()
+        await self.async_retriever.run(self.embedder.warmup)
+        return ready
+
     async def process_query(self, query: str, context: Dict = None, use_knowledge_base: bool = True) -> Dict:
         """
         Process a user query through the RAG pipeline.
@@ -81,17 +103,21 @@ class RAGPipeline:
         Returns:
             Dict: Response containing generated text and sources
         """
-        # Generate embedding for the query
-        query_embedding = self.embedder.generate_embedding(query)
+        # Encode the query off the event loop, batched with concurrent requests
+        query_vector = await self.query_batcher.encode(query)
+        query_embedding = query_vector.tolist()
         
-        # Retrieve relevant scenarios from vector database
-        scenarios = await self.vector_ops.search_scenarios(query_embedding)
-        
-        # Retrieve relevant knowledge from knowledge base if enabled
+        # Retrieve relevant scenarios and knowledge concurrently; the knowledge
+        # search reuses the embedding instead of encoding the query again
         knowledge_chunks = []
         if use_knowledge_base:
-            knowledge_chunks = self.knowledge_retriever.search(query, top_k=3)
+            scenarios, knowledge_chunks = await asyncio.gather(
+                self.vector_ops.search_scenarios(query_embedding),
+                self.async_retriever.search(query, top_k=3, query_embedding=query_vector)
+            )
             logger.info(f"Retrieved {len(knowledge_chunks)} knowledge chunks for query")
+        else:
+            scenarios = await self.vector_ops.search_scenarios(query_embedding)
         
         # Combine scenarios and knowledge for context
         combined_context = self._build_context(query, scenarios, knowledge_chunks, context)
@@ -100,9 +126,7 @@ class RAGPipeline:
         response = await self.llm.generate_response(query, combined_context)
         
         # Track knowledge usage
-        if knowledge_chunks:
-            for chunk in knowledge_chunks:
-                self.knowledge_retriever.update_usage_statistics(chunk["id"])
+        await self.async_retriever.record_usage([chunk["id"] for chunk in knowledge_chunks])
         
         # Return response with sources
         return {
@@ -203,7 +227,7 @@ class RAGPipeline:
             return {"error": "Scenario not found"}
         
         # Get relevant knowledge for evaluation
-        knowledge_chunks = self.knowledge_retriever.search(
+        knowledge_chunks = await self.async_retriever.search(
             f"evaluate teaching response for {scenario['name']}", 
             top_k=3
         )
@@ -220,9 +244,7 @@ class RAGPipeline:
         evaluation = await self.llm.generate_evaluation(eval_context)
         
         # Track knowledge usage
-        if knowledge_chunks:
-            for chunk in knowledge_chunks:
-                self.knowledge_retriever.update_usage_statistics(chunk["id"])
+        await self.async_retriever.record_usage([chunk["id"] for chunk in knowledge_chunks])
         
         return {
             "evaluation": evaluation,
@@ -250,9 +272,10 @@ class RAGPipeline:
         search_query = f"{grade_level} {subject} {challenge_type} scenario"
         
         # Retrieve relevant knowledge
-        knowledge_chunks = self.knowledge_retriever.search(
+        categories = await self.async_retriever.get_categories()
+        knowledge_chunks = await self.async_retriever.search(
             search_query,
-            category=challenge_type if challenge_type in self.knowledge_retriever.get_categories() else None,
+            category=challenge_type if challenge_type in categories else None,
             top_k=5
         )
         
@@ -266,9 +289,7 @@ class RAGPipeline:
         scenario = await self.llm.generate_scenario(gen_context)
         
         # Track knowledge usage
-        if knowledge_chunks:
-            for chunk in knowledge_chunks:
-                self.knowledge_retriever.update_usage_statistics(chunk["id"])
+        await self.async_retriever.record_usage([chunk["id"] for chunk in knowledge_chunks])
         
         return {
             "scenario": scenario,
@@ -308,10 +329,15 @@ class RAGPipeline:
             documents (List[Dict]): Raw documents to process
 
         Returns:
-            List[Dict]: Processed documents with embeddings
+            List[Dict]: Processed documents with embeddings (float32 rows of
+                        one contiguous array)
         """
-        for doc in documents:
-            doc['embedding'] = self.embedder.generate_embedding(doc['content'])
+        if not documents:
+            return documents
+        # One batched encode call instead of one model call per document
+        embeddings = self.embedder.embed_batch([doc['content'] for doc in documents])
+        for doc, embedding in zip(documents, embeddings):
+            doc['embedding'] = embedding
         return documents
 
     def _format_context(self, results: List[Dict]) -> str:
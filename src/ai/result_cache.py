@@ -0,0 +1,135 @@
+"""
+Retrieval Result Cache Module for Utah Teacher Training Assistant (UTTA)
+
+This module caches ranked knowledge-base search results so that recurring
+queries (the scenario and evaluation queries issued by RAGPipeline repeat
+heavily) skip both the vector scoring and the JSON decoding of chunk metadata.
+Cached results are tied to the knowledge-base version and dropped as soon as
+the version changes.
+
+Classes:
+    RetrievalResultCache: Thread-safe LRU/TTL cache of search results keyed on
+                          (query, category, top_k, mode).
+
+Example:
+    cache = RetrievalResultCache()
+    results = cache.get(key, version)
+    if results is None:
+        results = run_search()
+        cache.put(key, version, results)
+"""
+
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from ._config import SCENARIO_CONFIG
+
+
+class RetrievalResultCache:
+    """
+    A thread-safe LRU cache of search results bound to a knowledge-base version.
+
+    The cache remembers the version its entries were computed at; a lookup or
+    store with a different version empties the cache first. Results are copied
+    on the way in and out so callers can modify what they receive.
+
+    Attributes:
+        max_size (int): Maximum number of cached result lists
+        ttl (float): Seconds an entry stays valid
+        version (Optional[int]): Knowledge-base version of the cached entries
+        hits (int): Number of lookups served from the cache
+        misses (int): Number of lookups not found in the cache
+        invalidations (int): Number of times the cache was emptied by a version change
+    """
+
+    def __init__(self, max_size: int = SCENARIO_CONFIG["result_cache_size"],
+                 ttl: float = SCENARIO_CONFIG["cache_ttl"]):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size (int): Maximum number of cached result lists
+            ttl (float): Seconds an entry stays valid
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _sync_version(self, version: int) -> None:
+        """Drop every entry if the knowledge base changed. Caller holds the lock."""
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key: Hashable, version: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results.
+
+        Args:
+            key (Hashable): Search key, e.g. (normalized query, category, top_k, mode)
+            version (int): Current knowledge-base version
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: A copy of the cached results, or None on a miss
+        """
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[0])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, version: int, results: List[Dict[str, Any]]) -> None:
+        """
+        Store results computed at a knowledge-base version.
+
+        Args:
+            key (Hashable): Search key
+            version (int): Knowledge-base version the results were computed at
+            results (List[Dict[str, Any]]): The ranked results
+        """
+        results = copy.deepcopy(results)
+        with self._lock:
+            self._sync_version(version)
+            self._entries[key] = (results, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report cache counters.
+
+        Returns:
+            Dict[str, float]: size, version, hits, misses, hit_rate and invalidations
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations
+            }
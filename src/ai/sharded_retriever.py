@@ -0,0 +1,538 @@
+"""
+Sharded Knowledge Retriever Module for Utah Teacher Training Assistant (UTTA)
+
+This module serves an Educational Knowledge Base split across several SQLite
+shard files. Shard ``i`` of ``n`` holds the chunks whose id is congruent to
+``i`` modulo ``n``, so every chunk id names its shard and usage statistics are
+routed without a lookup. Each shard is searched by its own worker process
+holding that shard's vector index; a query is embedded once, fanned out to
+every shard in parallel and the per-shard top-k lists are merged with a heap.
+One query therefore uses one core per shard, and each shard file can be
+ingested independently (``scripts/ingest_knowledge.py --shard``).
+
+Keyword scores are computed per shard (BM25 statistics are local to a
+shard's FTS index) and merged as they are; with chunks spread evenly across
+shards the rankings match a single-file knowledge base closely. Hybrid
+search gathers each shard's vector and keyword candidates, merges each list
+globally and fuses them once in the parent, since fused scores of different
+shards are not comparable.
+
+Classes:
+    ShardedKnowledgeRetriever: KnowledgeRetriever interface over shard files.
+
+Functions:
+    shard_for_chunk: Shard index holding a chunk id.
+    shard_paths: File names of the shards of a knowledge base.
+    split_knowledge_base: Split a single-file knowledge base into shards.
+
+Example:
+    paths = split_knowledge_base("knowledge_base/vector_db.sqlite", num_shards=4)
+    retriever = ShardedKnowledgeRetriever(paths)
+    knowledge = retriever.search("classroom disruption strategies")
+    retriever.record_usage([chunk["id"] for chunk in knowledge])
+    retriever.close()
+"""
+
+import heapq
+import logging
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .knowledge_retriever import KnowledgeRetriever, reciprocal_rank_fusion
+from .ingestion import CHUNK_HASH_TABLE, ensure_knowledge_schema, shard_for_source
+from .result_cache import RetrievalResultCache
+from .embedding_cache import get_query_embedding_cache
+from .model_registry import get_model, model_key
+
+logger = logging.getLogger(__name__)
+
+# The shard held by a worker process, opened by _open_shard
+_shard: Optional[KnowledgeRetriever] = None
+
+
+def _open_shard(db_path: str, index_backend: str) -> None:
+    """Worker initializer: open the worker's shard."""
+    global _shard
+    _shard = KnowledgeRetriever(db_path, index_backend=index_backend)
+    # Merged results are cached by the parent
+    _shard.result_cache = RetrievalResultCache(max_size=0)
+
+
+def _shard_call(method: str, *args, **kwargs) -> Any:
+    """Run a KnowledgeRetriever method on the worker's shard."""
+    return getattr(_shard, method)(*args, **kwargs)
+
+
+def _warm_shard() -> bool:
+    """Load the worker's vector index; shard workers never need the embedding model."""
+    if not _shard.database_available:
+        return False
+    if _shard.index_backend != "sqlite":
+        _shard._sync_kb_version()
+        _shard._get_index()
+    return True
+
+
+def _shard_search_many(query_embeddings: np.ndarray, category: Optional[str],
+                       top_k: int) -> List[List[Dict[str, Any]]]:
+    """Search the worker's shard for several query embeddings."""
+    return [_shard.search_by_vector(embedding, category, top_k) for embedding in query_embeddings]
+
+
+def _shard_candidates(query_embedding: np.ndarray, query: str, category: Optional[str],
+                      limit: int) -> Tuple[List[Tuple[int, float]], List[Tuple[int, float]]]:
+    """Return the worker shard's vector and keyword candidate lists for hybrid search."""
+    return (_shard._vector_candidates(query_embedding, category, limit),
+            _shard._keyword_candidates(query, category, limit))
+
+
+def shard_for_chunk(chunk_id: int, num_shards: int) -> int:
+    """
+    Return the index of the shard holding a chunk.
+
+    Args:
+        chunk_id (int): The chunk id
+        num_shards (int): Number of shards
+
+    Returns:
+        int: Shard index in ``range(num_shards)``
+    """
+    return chunk_id % num_shards
+
+
+def shard_paths(db_path: str, num_shards: int) -> List[str]:
+    """
+    Return the shard file names for a knowledge base.
+
+    Args:
+        db_path (str): Path of the single-file knowledge base
+        num_shards (int): Number of shards
+
+    Returns:
+        List[str]: e.g. ``vector_db.shard0of4.sqlite`` ... ``vector_db.shard3of4.sqlite``
+    """
+    stem, suffix = os.path.splitext(db_path)
+    return [f"{stem}.shard{index}of{num_shards}{suffix or '.sqlite'}" for index in range(num_shards)]
+
+
+def merge_ranked(ranked_lists: Sequence[List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+    """
+    Merge per-shard result lists, each sorted by similarity, into one top-k list.
+
+    Args:
+        ranked_lists (Sequence[List[Dict[str, Any]]]): Results of each shard, best first
+        top_k (int): Number of results to keep
+
+    Returns:
+        List[Dict[str, Any]]: The best ``top_k`` results overall, best first
+    """
+    merged = heapq.merge(*ranked_lists, key=lambda result: result["similarity"], reverse=True)
+    return list(islice(merged, top_k))
+
+
+def split_knowledge_base(db_path: str, num_shards: int, output_paths: Optional[Sequence[str]] = None,
+                         batch_rows: int = 10000) -> List[str]:
+    """
+    Split a single-file knowledge base into shard files.
+
+    Every source document (as recorded by the ingestion pipeline) lands in one
+    shard; chunks are renumbered so that shard ``i`` only holds ids congruent
+    to ``i`` modulo ``num_shards``. Usage statistics are carried over.
+    Prebuilt indexes (FAISS, snapshots, int8 copies) must be rebuilt per shard.
+
+    Args:
+        db_path (str): Path of the single-file knowledge base
+        num_shards (int): Number of shards to create
+        output_paths (Sequence[str], optional): Shard paths; defaults to shard_paths()
+        batch_rows (int): Number of chunks copied at a time
+
+    Returns:
+        List[str]: Paths of the written shards
+
+    Raises:
+        ValueError: If num_shards is less than 1 or a shard file already exists
+    """
+    if num_shards < 1:
+        raise ValueError("num_shards must be at least 1")
+    paths = list(output_paths or shard_paths(db_path, num_shards))
+    for path in paths:
+        if os.path.exists(path):
+            raise ValueError(f"Shard {path} already exists")
+
+    source = sqlite3.connect(db_path)
+    shards = [sqlite3.connect(path) for path in paths]
+    try:
+        has_hashes = source.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CHUNK_HASH_TABLE,)
+        ).fetchone() is not None
+        hash_columns = "h.source, h.position, h.content_hash, h.model" if has_hashes else "NULL, NULL, NULL, NULL"
+        hash_join = f"LEFT JOIN {CHUNK_HASH_TABLE} h ON h.chunk_id = c.id" if has_hashes else ""
+        counts = [0] * num_shards
+
+        for shard in shards:
+            ensure_knowledge_schema(shard)
+            shard.execute("BEGIN")
+        cursor = source.execute(
+            f"""SELECT c.id, c.text, c.metadata, c.category, c.usage_count, c.effectiveness_score,
+                       e.vector, {hash_columns}
+                FROM chunks c JOIN embeddings e ON e.chunk_id = c.id {hash_join}
+                ORDER BY c.id"""
+        )
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            batches = [[] for _ in range(num_shards)]
+            for row in rows:
+                chunk_id, origin = row[0], row[7]
+                index = shard_for_source(origin, num_shards) if origin is not None else chunk_id % num_shards
+                counts[index] += 1
+                batches[index].append((counts[index] * num_shards + index,) + row[1:])
+            for shard, batch in zip(shards, batches):
+                shard.executemany(
+                    """INSERT INTO chunks (id, text, metadata, category, usage_count, effectiveness_score)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    [row[:6] for row in batch]
+                )
+                shard.executemany("INSERT INTO embeddings (chunk_id, vector) VALUES (?, ?)",
+                                  [(row[0], row[6]) for row in batch])
+                shard.executemany(
+                    f"""INSERT INTO {CHUNK_HASH_TABLE} (chunk_id, source, position, content_hash, model)
+                        VALUES (?, ?, ?, ?, ?)""",
+                    [(row[0],) + row[7:] for row in batch if row[7] is not None]
+                )
+        for shard in shards:
+            shard.commit()
+    except BaseException:
+        for shard in shards:
+            shard.close()
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    finally:
+        source.close()
+    for shard in shards:
+        shard.close()
+    logger.info(f"Split {db_path} into {num_shards} shards ({', '.join(map(str, counts))} chunks)")
+    return paths
+
+
+class ShardedKnowledgeRetriever:
+    """
+    Retrieve knowledge from a knowledge base split across shard files.
+
+    Offers the search, usage and reporting methods of KnowledgeRetriever, so it
+    can be passed wherever one is expected (e.g. to AsyncKnowledgeRetriever).
+    Every shard is searched by a dedicated worker process; reads that are cheap
+    (categories, leaderboards, versions) and usage statistics writes are done
+    in this process through one KnowledgeRetriever per shard.
+
+    Attributes:
+        shard_paths (List[str]): Shard files; shard i holds ids congruent to i
+        index_backend (str): Vector index used inside each shard worker
+        shards (List[KnowledgeRetriever]): In-process retrievers for reads and writes
+        model_name (str): Name of the embedding model
+        query_cache (QueryEmbeddingCache): Query embedding cache shared with EmbeddingGenerator
+        result_cache (RetrievalResultCache): Merged results, invalidated when any shard changes
+        ready (bool): Whether warmup() has finished
+    """
+
+    def __init__(self, shard_paths: Sequence[str], index_backend: str = "memory"):
+        """
+        Initialize the retriever; worker processes start on first use.
+
+        Args:
+            shard_paths (Sequence[str]): Shard files in shard order
+            index_backend (str): Vector index used by the shard workers
+                                 (see KnowledgeRetriever; default: "memory")
+
+        Raises:
+            ValueError: If no shards are given or index_backend is not supported
+        """
+        if not shard_paths:
+            raise ValueError("At least one shard is required")
+        if index_backend not in KnowledgeRetriever.INDEX_BACKENDS:
+            raise ValueError(f"Unsupported index backend: {index_backend}")
+        self.shard_paths = list(shard_paths)
+        self.index_backend = index_backend
+        self.shards = [KnowledgeRetriever(path, index_backend="sqlite") for path in self.shard_paths]
+        self.model_name = self.shards[0].model_name
+        self.embedding_backend = self.shards[0].embedding_backend
+        self.query_cache = get_query_embedding_cache()
+        self.result_cache = RetrievalResultCache()
+        self.ready = False
+        self._executors: Optional[List[ProcessPoolExecutor]] = None
+
+    @property
+    def database_available(self) -> bool:
+        """bool: Whether every shard file exists."""
+        return all(shard.database_available for shard in self.shards)
+
+    def _workers(self) -> List[ProcessPoolExecutor]:
+        """Start one single-process pool per shard, pinned to that shard's index."""
+        if self._executors is None:
+            self._executors = [None] * len(self.shard_paths)
+        for index, path in enumerate(self.shard_paths):
+            if self._executors[index] is None:
+                # spawn: forking a process that runs PyTorch and recorder threads is unsafe
+                self._executors[index] = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_open_shard, initargs=(path, self.index_backend)
+                )
+        return self._executors
+
+    def _discard_worker(self, index: int) -> None:
+        """Drop a shard pool whose worker died; _workers starts a new one on the next call."""
+        executor = self._executors[index]
+        if executor is not None:
+            executor.shutdown(wait=False)
+            self._executors[index] = None
+
+    def _scatter(self, func, *args) -> List[Any]:
+        """Run a worker function on every shard in parallel; failed shards return None."""
+        futures = []
+        for executor in self._workers():
+            try:
+                futures.append(executor.submit(func, *args))
+            except BrokenProcessPool as e:
+                # The pool noticed a dead worker before this call
+                futures.append(Future())
+                futures[-1].set_exception(e)
+        results = []
+        for index, (path, future) in enumerate(zip(self.shard_paths, futures)):
+            try:
+                results.append(future.result())
+            except BrokenProcessPool as e:
+                logger.error(f"Worker of shard {path} died, restarting it on the next search: {e}")
+                self._discard_worker(index)
+                results.append(None)
+            except Exception as e:
+                logger.error(f"Search failed on shard {path}: {e}")
+                results.append(None)
+        return results
+
+    def _kb_version(self) -> Optional[tuple]:
+        """Combined version of every shard, or None if any shard lacks version tracking."""
+        versions = tuple(shard._sync_kb_version() for shard in self.shards)
+        return None if None in versions else versions
+
+    def _encode(self, queries: List[str]) -> np.ndarray:
+        model = get_model(self.model_name, self.embedding_backend)
+        return self.query_cache.get_or_encode_many(model_key(self.model_name, self.embedding_backend), queries,
+                                                   model.encode)
+
+    def _fuse_candidates(self, candidates: List[Optional[tuple]], limit: int,
+                         top_k: int) -> List[Dict[str, Any]]:
+        """
+        Fuse the shards' hybrid candidates with one reciprocal rank fusion.
+
+        The vector and keyword lists of every shard are merged globally first,
+        so fusion sees the same ranks as a single-file search (fused scores
+        of different shards are not comparable).
+
+        Args:
+            candidates (List[Optional[tuple]]): Per-shard results of _shard_candidates;
+                                                None for failed shards
+            limit (int): Candidates kept per global list
+            top_k (int): Number of results to return
+
+        Returns:
+            List[Dict[str, Any]]: Knowledge chunks whose "similarity" is the fused score
+        """
+        candidates = [pair for pair in candidates if pair]
+        rankings = [
+            list(islice(heapq.merge(*[pair[side] for pair in candidates], key=lambda hit: hit[1], reverse=True),
+                        limit))
+            for side in range(2)
+        ]
+        fused = reciprocal_rank_fusion(rankings)[:top_k]
+
+        by_shard: Dict[int, List[Tuple[int, float]]] = {}
+        for chunk_id, score in fused:
+            by_shard.setdefault(shard_for_chunk(chunk_id, len(self.shards)), []).append((chunk_id, score))
+        chunks = {}
+        for index, scored_ids in by_shard.items():
+            for chunk in self.shards[index]._fetch_chunks(scored_ids):
+                chunks[chunk["id"]] = chunk
+        return [chunks[chunk_id] for chunk_id, _ in fused if chunk_id in chunks]
+
+    def warmup(self) -> bool:
+        """
+        Start every shard worker and load its model and vector index.
+
+        Returns:
+            bool: True if every shard is ready for semantic search
+        """
+        get_model(self.model_name, self.embedding_backend).encode("warmup")
+        ready = self._scatter(_warm_shard)
+        self.ready = all(ready)
+        return self.ready
+
+    def search(self, query: str, category: Optional[str] = None, top_k: int = 3,
+               mode: str = "vector", query_embedding: Optional[Sequence[float]] = None) -> List[Dict[str, Any]]:
+        """
+        Search every shard in parallel and merge the results.
+
+        Args:
+            query (str): The search query
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return (default: 3)
+            mode (str): "vector", "keyword" or "hybrid" (default: "vector")
+            query_embedding (Sequence[float], optional): Embedding of the query
+                                                         computed by the caller
+
+        Returns:
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity scores
+
+        Raises:
+            ValueError: If mode is not supported
+        """
+        if mode not in KnowledgeRetriever.SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode: {mode}")
+        if not self.database_available:
+            logger.warning("Vector database not available. Cannot perform search.")
+            return []
+
+        version = self._kb_version()
+        key = (self.query_cache.normalize(query), category, top_k, mode)
+        if version is not None:
+            results = self.result_cache.get(key, version)
+            if results is not None:
+                return results
+
+        if mode == "keyword":
+            ranked = self._scatter(_shard_call, "search", query, category, top_k, "keyword")
+            results = merge_ranked([hits for hits in ranked if hits], top_k)
+        else:
+            try:
+                embedding = (self._encode([query])[0] if query_embedding is None
+                             else np.asarray(query_embedding, dtype=np.float32))
+            except Exception as e:
+                logger.error(f"Error encoding query, using keyword search: {e}")
+                return self.search(query, category, top_k, mode="keyword")
+            if mode == "hybrid":
+                limit = max(top_k * 10, KnowledgeRetriever.HYBRID_CANDIDATES)
+                ranked = self._scatter(_shard_candidates, embedding, query, category, limit)
+                results = self._fuse_candidates(ranked, limit, top_k)
+            else:
+                ranked = self._scatter(_shard_call, "search_by_vector", embedding, category, top_k)
+                results = merge_ranked([hits for hits in ranked if hits], top_k)
+        logger.info(f"Retrieved {len(results)} knowledge chunks from {len(self.shards)} shards for query: {query}")
+        # A failed shard leaves a partial ranking that must not outlive the failure
+        if version is not None and results and None not in ranked:
+            self.result_cache.put(key, version, results)
+        return results
+
+    def search_by_vector(self, query_embedding: Sequence[float], category: Optional[str] = None,
+                         top_k: int = 3, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search every shard with a precomputed query embedding.
+
+        Args:
+            query_embedding (Sequence[float]): The query embedding
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return (default: 3)
+            query (str, optional): The query text, for hybrid ranking
+
+        Returns:
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and similarity scores
+        """
+        embedding = np.asarray(query_embedding, dtype=np.float32)
+        if query is not None:
+            limit = max(top_k * 10, KnowledgeRetriever.HYBRID_CANDIDATES)
+            return self._fuse_candidates(self._scatter(_shard_candidates, embedding, query, category, limit),
+                                         limit, top_k)
+        ranked = self._scatter(_shard_call, "search_by_vector", embedding, category, top_k)
+        return merge_ranked([hits for hits in ranked if hits], top_k)
+
+    def search_many(self, queries: List[str], category: Optional[str] = None,
+                    top_k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries with one round trip to each shard.
+
+        Args:
+            queries (List[str]): The search queries
+            category (str, optional): Filter by knowledge category
+            top_k (int): Number of results to return per query (default: 3)
+
+        Returns:
+            List[List[Dict[str, Any]]]: One result list per query, in query order
+        """
+        if not queries:
+            return []
+        embeddings = self._encode(list(queries))
+        per_shard = [hits for hits in self._scatter(_shard_search_many, embeddings, category, top_k) if hits]
+        return [merge_ranked([hits[row] for hits in per_shard], top_k) for row in range(len(queries))]
+
+    def _shard_of(self, chunk_id: int) -> KnowledgeRetriever:
+        return self.shards[shard_for_chunk(chunk_id, len(self.shards))]
+
+    def update_usage_statistics(self, chunk_id: int, effectiveness_score: float = 0.0) -> None:
+        """
+        Update usage statistics for a knowledge chunk in its shard immediately.
+
+        Args:
+            chunk_id (int): The ID of the knowledge chunk
+            effectiveness_score (float): The effectiveness score (0.0-1.0)
+        """
+        self._shard_of(chunk_id).update_usage_statistics(chunk_id, effectiveness_score)
+
+    def record_usage(self, chunk_ids: Sequence[int], effectiveness_score: float = 0.0) -> None:
+        """
+        Buffer usage statistics, routed to each chunk's shard.
+
+        Args:
+            chunk_ids (Sequence[int]): IDs of the knowledge chunks used
+            effectiveness_score (float): The effectiveness score (0.0-1.0)
+        """
+        by_shard: Dict[int, List[int]] = {}
+        for chunk_id in chunk_ids:
+            by_shard.setdefault(shard_for_chunk(chunk_id, len(self.shards)), []).append(chunk_id)
+        for index, ids in by_shard.items():
+            self.shards[index].record_usage(ids, effectiveness_score)
+
+    def get_categories(self) -> List[str]:
+        """
+        Get all available knowledge categories across shards.
+
+        Returns:
+            List[str]: List of unique category names
+        """
+        categories = []
+        for shard in self.shards:
+            categories.extend(shard.get_categories())
+        return list(dict.fromkeys(categories))
+
+    def get_most_effective_knowledge(self, category: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get the most effective knowledge chunks across shards.
+
+        Args:
+            category (str, optional): Filter by knowledge category
+            limit (int): Maximum number of results to return
+
+        Returns:
+            List[Dict[str, Any]]: List of knowledge chunks with metadata and effectiveness scores
+        """
+        ranked = [shard.get_most_effective_knowledge(category, limit) for shard in self.shards]
+        merged = heapq.merge(*ranked, key=lambda chunk: (chunk["effectiveness_score"], chunk["usage_count"]),
+                             reverse=True)
+        return list(islice(merged, limit))
+
+    def close(self) -> None:
+        """Stop the shard workers and write pending usage statistics."""
+        if self._executors is not None:
+            for executor in self._executors:
+                if executor is not None:
+                    executor.shutdown(wait=True)
+            self._executors = None
+        for shard in self.shards:
+            shard.close()
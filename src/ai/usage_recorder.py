@@ -0,0 +1,222 @@
+"""
+Usage Statistics Recorder Module for Utah Teacher Training Assistant (UTTA)
+
+This module takes knowledge-chunk usage statistics off the request path.
+Uses and effectiveness scores are buffered in memory, aggregated per chunk and
+written by a background thread in one transaction, either every
+``SCENARIO_CONFIG["usage_flush_interval"]`` seconds or as soon as
+``SCENARIO_CONFIG["usage_flush_size"]`` chunks are pending. The SQL applies the
+increments atomically, so concurrent writers (threads or processes) no longer
+lose updates to a read-modify-write race. Pending statistics are flushed on
+``close()`` and at interpreter exit. On a read-only database nothing can be
+written, so statistics are dropped with a single warning instead of being
+retried forever.
+
+Classes:
+    UsageStatisticsRecorder: Write-behind buffer for usage_count and effectiveness_score.
+
+Example:
+    recorder = UsageStatisticsRecorder(get_connection_manager(db_path))
+    recorder.record_many([12, 40, 41])
+    recorder.record(12, effectiveness_score=0.8)
+    recorder.close()
+"""
+
+import atexit
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Sequence
+
+from ._config import SCENARIO_CONFIG
+from .connection_manager import SQLiteConnectionManager
+
+logger = logging.getLogger(__name__)
+
+# Applies `uses` new uses, `scored` of which carried positive scores summing to
+# `score_sum`. Every right-hand side sees the old row, so the average is
+# weighted by the previous usage_count. This is the same result as calling
+# update_usage_statistics once per use with the scored uses first.
+USAGE_UPDATE_SQL = """
+    UPDATE chunks SET
+        effectiveness_score = CASE
+            WHEN :scored > 0
+            THEN (COALESCE(effectiveness_score, 0) * COALESCE(usage_count, 0) + :score_sum)
+                 / (COALESCE(usage_count, 0) + :scored)
+            ELSE effectiveness_score
+        END,
+        usage_count = COALESCE(usage_count, 0) + :uses
+    WHERE id = :chunk_id
+"""
+
+
+class UsageStatisticsRecorder:
+    """
+    A write-behind buffer of knowledge-chunk usage statistics.
+
+    ``record`` only updates an in-memory aggregate under a lock; the database
+    is written by a background thread that starts on the first record. When
+    the database is read-only the recorder disables itself and drops records.
+
+    Attributes:
+        db (SQLiteConnectionManager): Connections to the vector database
+        flush_interval (float): Seconds between periodic flushes
+        flush_size (int): Number of pending chunks that triggers an early flush
+        flushed (int): Number of chunk updates written so far
+        read_only (bool): Whether statistics are dropped because the database is read-only
+    """
+
+    def __init__(self, db: SQLiteConnectionManager,
+                 flush_interval: float = SCENARIO_CONFIG["usage_flush_interval"],
+                 flush_size: int = SCENARIO_CONFIG["usage_flush_size"]):
+        """
+        Initialize an empty recorder.
+
+        Args:
+            db (SQLiteConnectionManager): Connections to the vector database
+            flush_interval (float): Seconds between periodic flushes
+            flush_size (int): Number of pending chunks that triggers an early flush
+        """
+        self.db = db
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.flushed = 0
+        self.read_only = db.read_only
+        self._read_only_warned = False
+        self._pending: Dict[int, List[float]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def record(self, chunk_id: int, effectiveness_score: float = 0.0) -> None:
+        """
+        Buffer one use of a knowledge chunk.
+
+        Args:
+            chunk_id (int): The ID of the knowledge chunk
+            effectiveness_score (float): The effectiveness score (0.0-1.0);
+                                         0 records a use without a score
+        """
+        self.record_many([chunk_id], effectiveness_score)
+
+    def record_many(self, chunk_ids: Sequence[int], effectiveness_score: float = 0.0) -> None:
+        """
+        Buffer one use of each of several knowledge chunks.
+
+        Args:
+            chunk_ids (Sequence[int]): IDs of the knowledge chunks used
+            effectiveness_score (float): The effectiveness score (0.0-1.0)
+        """
+        if not chunk_ids:
+            return
+        if self.read_only:
+            self._warn_read_only()
+            return
+        with self._lock:
+            if self._closed:
+                logger.warning("Usage recorder is closed. Dropping usage statistics.")
+                return
+            for chunk_id in chunk_ids:
+                # [uses, scored uses, sum of scores]
+                entry = self._pending.setdefault(chunk_id, [0, 0, 0.0])
+                entry[0] += 1
+                if effectiveness_score > 0:
+                    entry[1] += 1
+                    entry[2] += effectiveness_score
+            pending = len(self._pending)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="usage-recorder", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        if pending >= self.flush_size:
+            self._wakeup.set()
+
+    def pending_count(self) -> int:
+        """
+        Count the chunks with statistics not yet written.
+
+        Returns:
+            int: Number of pending chunks
+        """
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write every pending update in one transaction.
+
+        If the write fails, the updates are put back and retried by the next
+        flush, unless the database turned out to be read-only.
+
+        Returns:
+            int: Number of chunks updated
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            rows = [
+                {"chunk_id": chunk_id, "uses": uses, "scored": scored, "score_sum": score_sum}
+                for chunk_id, (uses, scored, score_sum) in pending.items()
+            ]
+            try:
+                with self.db.writer() as conn:
+                    conn.executemany(USAGE_UPDATE_SQL, rows)
+            except sqlite3.OperationalError as e:
+                if "readonly" not in str(e):
+                    logger.error(f"Error writing usage statistics: {e}")
+                    self._restore(pending)
+                    return 0
+                # Retrying would fail the same way on every flush
+                self.read_only = True
+                self._warn_read_only()
+                return 0
+            except Exception as e:
+                logger.error(f"Error writing usage statistics: {e}")
+                self._restore(pending)
+                return 0
+            self.flushed += len(rows)
+            logger.info(f"Wrote usage statistics for {len(rows)} knowledge chunks")
+            return len(rows)
+
+    def _warn_read_only(self) -> None:
+        """Log once that usage statistics are being dropped."""
+        with self._lock:
+            if self._read_only_warned:
+                return
+            self._read_only_warned = True
+            self._pending.clear()
+        logger.warning(f"{self.db.db_path} is read-only. Dropping usage statistics.")
+
+    def _restore(self, pending: Dict[int, List[float]]) -> None:
+        """Merge updates that failed to write back into the buffer."""
+        with self._lock:
+            for chunk_id, (uses, scored, score_sum) in pending.items():
+                entry = self._pending.setdefault(chunk_id, [0, 0, 0.0])
+                entry[0] += uses
+                entry[1] += scored
+                entry[2] += score_sum
+
+    def _run(self) -> None:
+        """Background loop: flush on the interval or when woken by a full buffer."""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the background thread and write everything still pending."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+        if thread is not None:
+            atexit.unregister(self.close)
@@ -0,0 +1,614 @@
+"""
+In-Memory Vector Index Module for Utah Teacher Training Assistant (UTTA)
+
+This module keeps the knowledge base embeddings in memory as one contiguous
+float32 matrix so that a query can be scored against every chunk with a single
+matrix-vector product instead of a row-by-row scan of the SQLite database.
+
+The matrix can also be exported to a snapshot of aligned ``.npy`` files and
+opened with ``np.memmap``, so that every worker process shares one page-cached
+copy of the vectors instead of loading its own. Each export writes a new
+generation of files and publishes it by atomically replacing the manifest, so
+a reader never sees arrays from two different exports.
+
+When the stored embeddings have been normalized (see
+``knowledge_store.normalize_embeddings``) scoring skips the per-vector norms,
+and the int8 copy written by ``knowledge_store.quantize_embeddings`` can be
+searched with a quarter of the memory, rescoring the best candidates exactly.
+
+Classes:
+    InMemoryVectorIndex: Dense matrix index over the ``embeddings`` table.
+    QuantizedVectorIndex: int8 index over ``embeddings_int8`` with float32 rescoring.
+
+Functions:
+    export_snapshot: Write the ``embeddings`` table to a memory-mappable snapshot.
+
+Example:
+    index = InMemoryVectorIndex.from_database("knowledge_base/vector_db.sqlite")
+    hits = index.search(query_embedding, category="classroom_management", top_k=3)
+    batch_hits = index.search_batch(query_matrix, top_k=3)
+
+    prefix = export_snapshot("knowledge_base/vector_db.sqlite")
+    shared_index = InMemoryVectorIndex.from_snapshot(prefix)
+
+    compact_index = QuantizedVectorIndex.from_database("knowledge_base/vector_db.sqlite")
+"""
+
+import os
+import re
+import json
+import time
+import logging
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from .knowledge_store import get_kb_version, embeddings_normalized, QUANTIZED_TABLE
+from .connection_manager import get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ARRAYS = ("vectors", "ids", "norms", "category_codes")
+
+
+def _snapshot_files(prefix: str, manifest: Dict) -> Dict[str, str]:
+    """Resolve the array files a snapshot manifest points to."""
+    directory = os.path.dirname(os.path.abspath(prefix))
+    # Manifests written before snapshots were versioned name no files
+    files = manifest.get("files") or {name: f"{os.path.basename(prefix)}.{name}.npy" for name in SNAPSHOT_ARRAYS}
+    return {name: os.path.join(directory, files[name]) for name in SNAPSHOT_ARRAYS}
+
+
+class InMemoryVectorIndex:
+    """
+    A dense in-memory index over the knowledge base embeddings.
+
+    Vectors are stored row-wise in a C-contiguous float32 matrix alongside
+    parallel arrays of chunk ids and categories. Vector norms are computed once
+    at load time so that cosine similarity only needs one matrix-vector product
+    per query.
+
+    Attributes:
+        ids (np.ndarray): Chunk ids, one per matrix row (int64)
+        categories (np.ndarray): Chunk categories, one per matrix row
+        matrix (np.ndarray): Embedding matrix of shape (n, dimension); may be
+                             a read-only ``np.memmap`` when loaded from a snapshot
+        norms (np.ndarray): L2 norm of every matrix row
+        normalized (bool): Whether every row is unit length, so scores are
+                           plain dot products
+        kb_version (Optional[int]): Knowledge-base version the vectors were read
+                                    at, if version tracking is enabled
+    """
+
+    def __init__(self, ids: Sequence[int], categories: Sequence[Optional[str]], matrix: np.ndarray,
+                 norms: Optional[np.ndarray] = None, normalized: bool = False):
+        """
+        Initialize the index from already-loaded arrays.
+
+        Args:
+            ids (Sequence[int]): Chunk ids, one per row of ``matrix``
+            categories (Sequence[Optional[str]]): Chunk categories, one per row
+            matrix (np.ndarray): Embedding matrix of shape (n, dimension).
+                                 C-contiguous float32 input (including memmaps)
+                                 is used without copying.
+            norms (np.ndarray, optional): Precomputed row norms, with zero
+                                          norms replaced by ``inf``
+            normalized (bool): Rows are known to be unit length; norms are
+                               not computed or applied
+
+        Raises:
+            ValueError: If the arrays do not have matching lengths
+        """
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.categories = np.asarray(categories, dtype=object)
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+
+        if self.matrix.ndim != 2:
+            raise ValueError("Embedding matrix must be two-dimensional")
+        if not (len(self.ids) == len(self.categories) == self.matrix.shape[0]):
+            raise ValueError("ids, categories and matrix must have the same number of rows")
+
+        self.normalized = normalized
+        if normalized:
+            norms = np.ones(len(self.ids), dtype=np.float32)
+        elif norms is None:
+            norms = self._row_norms(self.matrix)
+        self.norms = np.asarray(norms, dtype=np.float32)
+        self.kb_version = None
+        self._category_rows = self._build_category_rows()
+
+    @staticmethod
+    def _row_norms(matrix: np.ndarray) -> np.ndarray:
+        """Compute row norms, mapping zero vectors to ``inf`` so they score 0."""
+        norms = np.linalg.norm(matrix, axis=1).astype(np.float32)
+        # Zero vectors can never be similar to anything; avoid division by zero
+        norms[norms == 0] = np.inf
+        return norms
+
+    @classmethod
+    def from_database(cls, db_path: str, category: Optional[str] = None) -> "InMemoryVectorIndex":
+        """
+        Load every embedding from the vector database into a new index.
+
+        Args:
+            db_path (str): Path to the vector database
+            category (str, optional): Only load chunks from this category
+
+        Returns:
+            InMemoryVectorIndex: The loaded index
+        """
+        with get_connection_manager(db_path).reader() as conn:
+            cursor = conn.cursor()
+            # Read the version and the vectors from one snapshot of the database
+            cursor.execute("BEGIN")
+            kb_version = get_kb_version(conn)
+            normalized = embeddings_normalized(conn)
+            conditions = ""
+            params = []
+            if category:
+                conditions = " WHERE c.category = ?"
+                params.append(category)
+
+            cursor.execute(f"""
+                SELECT c.id, c.category, e.vector
+                FROM chunks c
+                JOIN embeddings e ON c.id = e.chunk_id
+                {conditions}
+                ORDER BY c.category, c.id
+            """, params)
+            rows = cursor.fetchall()
+
+        if not rows:
+            index = cls([], [], np.empty((0, 0), dtype=np.float32))
+        else:
+            ids, categories, blobs = zip(*rows)
+            # Join the blobs once and reinterpret them as a single matrix
+            matrix = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(rows), -1)
+            logger.info(f"Loaded {len(rows)} embeddings into memory from {db_path}")
+            index = cls(ids, categories, matrix, normalized=normalized)
+        index.kb_version = kb_version
+        return index
+
+    @staticmethod
+    def default_snapshot_prefix(db_path: str) -> str:
+        """
+        Return the conventional snapshot location for a vector database.
+
+        Args:
+            db_path (str): Path to the vector database
+
+        Returns:
+            str: Path prefix shared by the snapshot files (``vector_db`` next to
+                 ``vector_db.sqlite``)
+        """
+        return os.path.splitext(db_path)[0]
+
+    @classmethod
+    def from_snapshot(cls, prefix: str) -> "InMemoryVectorIndex":
+        """
+        Open a snapshot written by ``export_snapshot`` without copying it.
+
+        The vector, id and norm arrays are memory-mapped read-only, so worker
+        processes opening the same snapshot share one copy in the page cache.
+        The arrays are the generation named by the manifest and are checked
+        against its row count and dimension.
+
+        Args:
+            prefix (str): Snapshot path prefix
+
+        Returns:
+            InMemoryVectorIndex: Index backed by memory-mapped arrays
+
+        Raises:
+            ValueError: If the arrays do not match the manifest
+        """
+        with open(f"{prefix}.snapshot.json") as f:
+            manifest = json.load(f)
+        files = _snapshot_files(prefix, manifest)
+        matrix = np.load(files["vectors"], mmap_mode="r")
+        ids = np.load(files["ids"], mmap_mode="r")
+        norms = np.load(files["norms"], mmap_mode="r")
+        codes = np.load(files["category_codes"], mmap_mode="r")
+        rows = manifest["num_vectors"]
+        if matrix.shape != (rows, manifest["dimension"]) or not len(ids) == len(norms) == len(codes) == rows:
+            raise ValueError(
+                f"Snapshot {prefix} does not match its manifest: expected {rows} rows of "
+                f"dimension {manifest['dimension']}, found vectors {matrix.shape}, {len(ids)} ids, "
+                f"{len(norms)} norms and {len(codes)} category codes"
+            )
+        # Only one string object per distinct category is created per process
+        categories = np.array(manifest["categories"], dtype=object)[codes]
+        logger.info(f"Memory-mapped {len(ids)} embeddings from snapshot {prefix}")
+        index = cls(ids, categories, matrix, norms=norms, normalized=manifest.get("normalized", False))
+        index.kb_version = manifest.get("kb_version")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        """int: Dimension of the indexed vectors."""
+        return self.matrix.shape[1]
+
+    def _build_category_rows(self) -> Dict[Optional[str], Union[slice, np.ndarray]]:
+        """
+        Group matrix rows by category for filtered searches.
+
+        Categories stored in one contiguous block (indexes loaded from the
+        database or a snapshot are ordered by category) are kept as a slice, so
+        filtering takes a view of the matrix instead of copying rows out of it.
+        """
+        rows = {}
+        for category in set(self.categories.tolist()):
+            positions = np.flatnonzero(self.categories == category)
+            if positions[-1] - positions[0] + 1 == len(positions):
+                rows[category] = slice(int(positions[0]), int(positions[-1]) + 1)
+            else:
+                rows[category] = positions
+        return rows
+
+    def search(self, query_embedding: np.ndarray, category: Optional[str] = None,
+               top_k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Find the chunks most similar to a query embedding.
+
+        Args:
+            query_embedding (np.ndarray): The query vector
+            category (str, optional): Only consider chunks from this category
+            top_k (int): Number of results to return
+
+        Returns:
+            List[Tuple[int, float]]: (chunk id, cosine similarity) pairs,
+                                     most similar first
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        return self.search_batch(query, category, top_k)[0]
+
+    def search_batch(self, query_embeddings: np.ndarray, category: Optional[str] = None,
+                     top_k: int = 3, block_size: int = 256) -> List[List[Tuple[int, float]]]:
+        """
+        Find the most similar chunks for several query embeddings at once.
+
+        Queries are scored against the index with one matrix-matrix product per
+        block of ``block_size`` queries, which bounds the size of the score matrix.
+
+        Args:
+            query_embeddings (np.ndarray): Query matrix of shape (m, dimension)
+            category (str, optional): Only consider chunks from this category
+            top_k (int): Number of results to return per query
+            block_size (int): Number of queries scored per matrix product
+
+        Returns:
+            List[List[Tuple[int, float]]]: One list of (chunk id, cosine similarity)
+                                           pairs per query, most similar first
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        if len(self) == 0 or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        if category:
+            rows = self._category_rows.get(category)
+            if rows is None:
+                return [[] for _ in range(len(queries))]
+            matrix, norms, ids = self.matrix[rows], self.norms[rows], self.ids[rows]
+        else:
+            matrix, norms, ids = self.matrix, self.norms, self.ids
+
+        query_norms = np.linalg.norm(queries, axis=1)
+        query_norms[query_norms == 0] = np.inf
+        results = []
+        for start in range(0, len(queries), block_size):
+            block = queries[start:start + block_size]
+            block_norms = query_norms[start:start + block_size]
+            scores = block @ matrix.T
+            if self.normalized:
+                scores /= block_norms[:, None]
+            else:
+                scores /= block_norms[:, None] * norms[None, :]
+            top = self._top_k_positions(scores, top_k)
+            for row, positions in enumerate(top):
+                if np.isinf(block_norms[row]):
+                    results.append([])
+                    continue
+                results.append([(int(ids[i]), float(scores[row, i])) for i in positions])
+        return results
+
+    @staticmethod
+    def _top_k_positions(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """
+        Return the column positions of the ``top_k`` largest scores in each row, best first.
+
+        Uses ``np.argpartition`` so that only the selected candidates are sorted.
+        """
+        if top_k >= scores.shape[1]:
+            return np.argsort(-scores, axis=1)
+        candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1)
+        return np.take_along_axis(candidates, order, axis=1)
+
+
+class QuantizedVectorIndex(InMemoryVectorIndex):
+    """
+    An int8 scalar-quantized index with exact float32 rescoring.
+
+    Candidates are ranked by the cosine similarity of the int8 codes, which
+    take a quarter of the memory of the float32 matrix. The best
+    ``top_k * rescore_factor`` candidates are then rescored against their
+    float32 vectors, read from the ``embeddings`` table, so the returned
+    similarities are exact and the ranking only differs from the float32
+    index when a true top-k chunk falls outside the candidate list.
+
+    Attributes:
+        matrix (np.ndarray): int8 codes of shape (n, dimension)
+        norms (np.ndarray): L2 norm of every code row
+        db_path (str): Vector database holding the float32 vectors
+        rescore_factor (int): Candidates rescored per requested result
+    """
+
+    # Code rows converted to float32 at a time while scoring
+    ROW_BLOCK = 16384
+    # Chunk ids per IN (...) query when loading vectors for rescoring
+    RESCORE_BATCH = 500
+
+    def __init__(self, ids: Sequence[int], categories: Sequence[Optional[str]], codes: np.ndarray,
+                 db_path: str, rescore_factor: int = 4):
+        """
+        Initialize the index from already-loaded int8 codes.
+
+        Args:
+            ids (Sequence[int]): Chunk ids, one per row of ``codes``
+            categories (Sequence[Optional[str]]): Chunk categories, one per row
+            codes (np.ndarray): int8 code matrix of shape (n, dimension)
+            db_path (str): Vector database holding the float32 vectors
+            rescore_factor (int): Candidates rescored per requested result
+
+        Raises:
+            ValueError: If the arrays do not have matching lengths
+        """
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.categories = np.asarray(categories, dtype=object)
+        self.matrix = np.ascontiguousarray(codes, dtype=np.int8)
+
+        if self.matrix.ndim != 2:
+            raise ValueError("Code matrix must be two-dimensional")
+        if not (len(self.ids) == len(self.categories) == self.matrix.shape[0]):
+            raise ValueError("ids, categories and codes must have the same number of rows")
+
+        self.db_path = db_path
+        self.rescore_factor = max(1, rescore_factor)
+        self.normalized = False
+        self.norms = np.empty(len(self.ids), dtype=np.float32)
+        for start in range(0, len(self.ids), self.ROW_BLOCK):
+            self.norms[start:start + self.ROW_BLOCK] = self._row_norms(
+                self.matrix[start:start + self.ROW_BLOCK].astype(np.float32)
+            )
+        self.kb_version = None
+        self._category_rows = self._build_category_rows()
+
+    @classmethod
+    def from_database(cls, db_path: str, category: Optional[str] = None,
+                      rescore_factor: int = 4) -> "QuantizedVectorIndex":
+        """
+        Load the int8 codes written by ``quantize_embeddings`` into a new index.
+
+        Args:
+            db_path (str): Path to the vector database
+            category (str, optional): Only load chunks from this category
+            rescore_factor (int): Candidates rescored per requested result
+
+        Returns:
+            QuantizedVectorIndex: The loaded index
+        """
+        with get_connection_manager(db_path).reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            kb_version = get_kb_version(conn)
+            conditions = ""
+            params = []
+            if category:
+                conditions = " WHERE c.category = ?"
+                params.append(category)
+
+            cursor.execute(f"""
+                SELECT c.id, c.category, q.codes
+                FROM chunks c
+                JOIN {QUANTIZED_TABLE} q ON c.id = q.chunk_id
+                {conditions}
+                ORDER BY c.category, c.id
+            """, params)
+            rows = cursor.fetchall()
+
+        if not rows:
+            index = cls([], [], np.empty((0, 0), dtype=np.int8), db_path, rescore_factor)
+        else:
+            ids, categories, blobs = zip(*rows)
+            codes = np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(len(rows), -1)
+            logger.info(f"Loaded {len(rows)} int8 embeddings into memory from {db_path}")
+            index = cls(ids, categories, codes, db_path, rescore_factor)
+        index.kb_version = kb_version
+        return index
+
+    def _load_vectors(self, chunk_ids: Sequence[int]) -> Dict[int, np.ndarray]:
+        """Read the float32 vectors of the given chunks from the database."""
+        chunk_ids = list(chunk_ids)
+        vectors = {}
+        with get_connection_manager(self.db_path).reader() as conn:
+            for start in range(0, len(chunk_ids), self.RESCORE_BATCH):
+                batch = chunk_ids[start:start + self.RESCORE_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                for chunk_id, blob in conn.execute(
+                    f"SELECT chunk_id, vector FROM embeddings WHERE chunk_id IN ({placeholders})", batch
+                ):
+                    vectors[chunk_id] = np.frombuffer(blob, dtype=np.float32)
+        return vectors
+
+    def search_batch(self, query_embeddings: np.ndarray, category: Optional[str] = None,
+                     top_k: int = 3, block_size: int = 256) -> List[List[Tuple[int, float]]]:
+        """
+        Find the most similar chunks for several query embeddings at once.
+
+        Candidates for every query are ranked against the int8 codes, then the
+        float32 vectors of all candidates are read in one pass and rescored.
+
+        Args:
+            query_embeddings (np.ndarray): Query matrix of shape (m, dimension)
+            category (str, optional): Only consider chunks from this category
+            top_k (int): Number of results to return per query
+            block_size (int): Number of queries scored per matrix product
+
+        Returns:
+            List[List[Tuple[int, float]]]: One list of (chunk id, cosine similarity)
+                                           pairs per query, most similar first
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        if len(self) == 0 or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        if category:
+            rows = self._category_rows.get(category)
+            if rows is None:
+                return [[] for _ in range(len(queries))]
+            codes, norms, ids = self.matrix[rows], self.norms[rows], self.ids[rows]
+        else:
+            codes, norms, ids = self.matrix, self.norms, self.ids
+
+        query_norms = np.linalg.norm(queries, axis=1)
+        num_candidates = min(top_k * self.rescore_factor, len(ids))
+        candidates = []
+        for start in range(0, len(queries), block_size):
+            block = queries[start:start + block_size]
+            scores = np.empty((len(block), len(codes)), dtype=np.float32)
+            for row_start in range(0, len(codes), self.ROW_BLOCK):
+                part = codes[row_start:row_start + self.ROW_BLOCK].astype(np.float32)
+                scores[:, row_start:row_start + len(part)] = block @ part.T
+            # The query norm does not change the candidate order
+            scores /= norms[None, :]
+            for row, positions in enumerate(self._top_k_positions(scores, num_candidates)):
+                candidates.append([] if query_norms[start + row] == 0 else ids[positions].tolist())
+
+        vectors = self._load_vectors({chunk_id for chunk_ids in candidates for chunk_id in chunk_ids})
+        results = []
+        for query, query_norm, chunk_ids in zip(queries, query_norms, candidates):
+            chunk_ids = [chunk_id for chunk_id in chunk_ids if chunk_id in vectors]
+            if not chunk_ids:
+                results.append([])
+                continue
+            matrix = np.stack([vectors[chunk_id] for chunk_id in chunk_ids])
+            exact = (matrix @ query) / (self._row_norms(matrix) * query_norm)
+            order = np.argsort(-exact)[:top_k]
+            results.append([(int(chunk_ids[i]), float(exact[i])) for i in order])
+        return results
+
+
+def export_snapshot(db_path: str, prefix: Optional[str] = None, batch_rows: int = 10000) -> str:
+    """
+    Write the ``embeddings`` table to a memory-mappable snapshot.
+
+    The snapshot consists of ``vectors`` (float32, shape (n, d)), ``ids``,
+    ``norms`` and ``category_codes`` arrays plus a ``<prefix>.snapshot.json``
+    manifest. Rows are ordered by category and id. The ``.npy`` header is padded
+    to a 64-byte boundary, so the data region is aligned for zero-copy reads.
+
+    Every export writes a new generation of arrays
+    (``<prefix>.<generation>.<array>.npy``) that nothing references yet, then
+    switches to it with a single ``os.replace`` of the manifest. Readers see
+    either the old or the new snapshot, never a mix. The previous generation is
+    kept for readers that have just read the old manifest; older ones are
+    removed. Processes that already mapped an older snapshot are not affected.
+
+    Args:
+        db_path (str): Path to the vector database
+        prefix (str, optional): Snapshot path prefix; defaults to
+                                ``InMemoryVectorIndex.default_snapshot_prefix(db_path)``
+        batch_rows (int): Number of rows read from SQLite at a time
+
+    Returns:
+        str: The snapshot prefix
+
+    Raises:
+        ValueError: If the database has no embeddings
+    """
+    prefix = prefix or InMemoryVectorIndex.default_snapshot_prefix(db_path)
+    with get_connection_manager(db_path).reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        kb_version = get_kb_version(conn)
+        normalized = embeddings_normalized(conn)
+        count = cursor.execute(
+            "SELECT COUNT(*) FROM chunks c JOIN embeddings e ON c.id = e.chunk_id"
+        ).fetchone()[0]
+        if count == 0:
+            raise ValueError(f"No embeddings found in {db_path}")
+        vector_bytes = cursor.execute("SELECT length(vector) FROM embeddings LIMIT 1").fetchone()[0]
+        dimension = vector_bytes // np.dtype(np.float32).itemsize
+
+        generation = f"{time.time_ns():x}"
+        paths = {name: f"{prefix}.{generation}.{name}.npy" for name in SNAPSHOT_ARRAYS}
+        vectors = np.lib.format.open_memmap(paths["vectors"], mode="w+", dtype=np.float32, shape=(count, dimension))
+        ids = np.empty(count, dtype=np.int64)
+        codes = np.empty(count, dtype=np.int32)
+        vocabulary = {}
+
+        cursor.execute("""
+            SELECT c.id, c.category, e.vector
+            FROM chunks c
+            JOIN embeddings e ON c.id = e.chunk_id
+            ORDER BY c.category, c.id
+        """)
+        position = 0
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            end = position + len(rows)
+            batch_ids, batch_categories, blobs = zip(*rows)
+            vectors[position:end] = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(rows), dimension)
+            ids[position:end] = batch_ids
+            codes[position:end] = [vocabulary.setdefault(c, len(vocabulary)) for c in batch_categories]
+            position = end
+
+    norms = InMemoryVectorIndex._row_norms(vectors)
+    vectors.flush()
+    del vectors
+    np.save(paths["ids"], ids)
+    np.save(paths["norms"], norms)
+    np.save(paths["category_codes"], codes)
+
+    manifest_path = f"{prefix}.snapshot.json"
+    previous = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = _snapshot_files(prefix, json.load(f))
+    manifest = {
+        "num_vectors": int(count),
+        "dimension": int(dimension),
+        "categories": list(vocabulary),
+        "kb_version": kb_version,
+        "normalized": normalized,
+        "files": {name: os.path.basename(path) for name, path in paths.items()}
+    }
+    with open(f"{manifest_path}.tmp", "w") as f:
+        json.dump(manifest, f)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    _remove_old_generations(prefix, keep=set(paths.values()) | set((previous or {}).values()))
+    logger.info(f"Exported {count} embeddings to snapshot {prefix}")
+    return prefix
+
+
+def _remove_old_generations(prefix: str, keep: Set[str]) -> None:
+    """Delete snapshot arrays of generations other than the ones in ``keep``."""
+    directory = os.path.dirname(os.path.abspath(prefix))
+    pattern = re.compile(rf"{re.escape(os.path.basename(prefix))}(\.[0-9a-f]+)?\.({'|'.join(SNAPSHOT_ARRAYS)})\.npy")
+    keep = {os.path.abspath(path) for path in keep}
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if pattern.fullmatch(name) and path not in keep:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove old snapshot file {path}: {e}")
@@ -1,7 +1,8 @@
 
 #To run the API run 
 #uvicorn app:app
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Response
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -9,8 +10,7 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict
 from ollama import chat
 from ollama import ChatResponse
-from rag import perform_search
-import pandas as pd
+from rag import perform_search, warmup, is_ready
 
 app = FastAPI()
 
@@ -29,6 +29,21 @@ app.add_middleware(
 
 
 AI_MODEL = 'deepseek-r1:8b'
+
+@app.on_event('startup')
+async def start_warmup():
+    '''Loads the embedding model and knowledge index in the background so the
+    server accepts connections right away. Poll /api/v1/ready before routing traffic.'''
+    app.state.warmup = asyncio.create_task(asyncio.to_thread(warmup))
+
+@app.get('/api/v1/ready')
+async def ready(response: Response):
+    '''Readiness probe: 200 once the knowledge retriever is warmed up, 503 until then.'''
+    if not is_ready():
+        response.status_code = 503
+        return {'ready': False}
+    return {'ready': True}
+
 class Prompt(BaseModel):
     messages: List[Dict[str,str]]
     metda_data: Optional[str] = None#Optional string for now
@@ -37,6 +52,7 @@ class Prompt(BaseModel):
 async def generate_scenario():
     '''Picks up a random secnario for setting it up from our prompt database for teacher training. 
     May include future prompts generated by the AI for future cases'''
+    import pandas as pd  # only this endpoint needs pandas; keep it out of start-up
     df = pd.read_csv('../../scripts/prompts.csv')
     random_scenario = df.sample(1).iloc[0, 0]
     return random_scenario
@@ -1,62 +1,49 @@
-import json
-import sqlite3
+import os
+import sys
+import threading
+from pathlib import Path
 
-import numpy as np
-from sentence_transformers import SentenceTransformer
+# The API is started from src/web (uvicorn app:app); make the ai package importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from ai.knowledge_retriever import KnowledgeRetriever
+from ai.sharded_retriever import ShardedKnowledgeRetriever
 
-class KnowledgeRetriever:
-    def __init__(self):
-        self.db_path = "/home/team1/UTTA-Knowledge-Base-Demo/knowledge_base/vector_db.sqlite"
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+DB_PATH = os.getenv("KNOWLEDGE_DB_PATH", "/home/team1/UTTA-Knowledge-Base-Demo/knowledge_base/vector_db.sqlite")
+# "memory" gives every uvicorn worker its own copy of the vectors. Set "mmap" to
+# share one page-cached snapshot across workers or "faiss" for a prebuilt index
+# (scripts/build_knowledge_index.py); both fall back to "memory" with a warning
+# at startup warmup when their files are missing or stale
+INDEX_BACKEND = os.getenv("KNOWLEDGE_INDEX_BACKEND", "memory")
+# Comma-separated shard files (scripts/build_knowledge_index.py shard); when set,
+# every query is searched on all shards in parallel worker processes
+SHARD_PATHS = [path for path in os.getenv("KNOWLEDGE_SHARDS", "").split(",") if path]
 
-    def search(self, query, top_k, category):
-        # Convert query to embedding
-        query_embedding = self.model.encode([query])[0]
+# Created on first use so importing the API does not load the model
+_retriever: KnowledgeRetriever | ShardedKnowledgeRetriever | None = None
+_retriever_lock = threading.Lock()
 
-        # Connect to database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
 
-        # Build query conditions
-        conditions = ""
-        if category:
-            conditions = f" WHERE c.category = '{category}'"
+def get_retriever() -> KnowledgeRetriever | ShardedKnowledgeRetriever:
+    global _retriever
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                if SHARD_PATHS:
+                    _retriever = ShardedKnowledgeRetriever(SHARD_PATHS, index_backend=INDEX_BACKEND)
+                else:
+                    _retriever = KnowledgeRetriever(DB_PATH, index_backend=INDEX_BACKEND)
+    return _retriever
 
-        # Retrieve all vectors and compute similarities
-        cursor.execute(
-            f"SELECT c.id, c.text, c.metadata, c.category, e.vector FROM chunks c JOIN embeddings e ON c.id = e.chunk_id{conditions}")
-        results = cursor.fetchall()
 
-        # Compute similarities
-        similarities = []
-        for chunk_id, text, metadata, category, vector_blob in results:
-            vector = np.frombuffer(vector_blob, dtype=np.float32)
-            similarity = np.dot(query_embedding, vector)
-            similarities.append(
-                (chunk_id, text, metadata, category, similarity))
+def warmup() -> bool:
+    """Load the retriever, embedding model and vector index before the first search."""
+    return get_retriever().warmup()
 
-        # Sort by similarity and return top k
-        similarities.sort(key=lambda x: x[4], reverse=True)
-        top_results = similarities[:top_k]
 
-        # Format results
-        formatted_results = []
-        for chunk_id, text, metadata_json, category, similarity in top_results:
-            formatted_results.append({
-                "id": chunk_id,
-                "text": text,
-                "metadata": json.loads(metadata_json),
-                "category": category,
-                "similarity": float(similarity)
-            })
-
-        conn.close()
-        return formatted_results
-
-
-retriever = KnowledgeRetriever()
+def is_ready() -> bool:
+    return _retriever is not None and _retriever.ready
 
 
 def perform_search(prompt: str, top_k: int = 3, category: str | None = None) -> list[dict[str, int | str | dict[str, str] | float]]:
-    return retriever.search(prompt, top_k, category)
+    return get_retriever().search(prompt, category, top_k)
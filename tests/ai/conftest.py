@@ -0,0 +1,32 @@
+"""Fixtures shared by the AI component tests."""
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+DIMENSION = 384
+CATEGORIES = ["classroom_management", "teaching_strategies", "special_needs"]
+
+
+@pytest.fixture
+def knowledge_db(tmp_path):
+    """Small knowledge base with random embeddings"""
+    rng = np.random.default_rng(42)
+    db_path = tmp_path / "vector_db.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute("""CREATE TABLE chunks (
+        id INTEGER PRIMARY KEY, text TEXT, metadata TEXT, category TEXT,
+        usage_count INTEGER DEFAULT 0, effectiveness_score REAL DEFAULT 0.0)""")
+    conn.execute("CREATE TABLE embeddings (chunk_id INTEGER PRIMARY KEY, vector BLOB)")
+    for chunk_id in range(1, 201):
+        conn.execute(
+            "INSERT INTO chunks (id, text, metadata, category) VALUES (?, ?, ?, ?)",
+            (chunk_id, f"chunk {chunk_id}", json.dumps({"source": "test"}),
+             CATEGORIES[chunk_id % len(CATEGORIES)])
+        )
+        vector = rng.normal(size=DIMENSION).astype(np.float32)
+        conn.execute("INSERT INTO embeddings VALUES (?, ?)", (chunk_id, vector.tobytes()))
+    conn.commit()
+    conn.close()
+    return str(db_path)
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from ai.async_retriever import AsyncKnowledgeRetriever
+
+
+class SlowRetriever:
+    """Retriever stand-in whose calls block like SQLite I/O"""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.usage = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def search(self, query, category=None, top_k=3, mode="vector"):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return [{"id": len(query), "text": query, "category": category, "similarity": 1.0}][:top_k]
+
+    def record_usage(self, chunk_ids, effectiveness_score=0.0):
+        self.usage.extend((chunk_id, effectiveness_score) for chunk_id in chunk_ids)
+
+    def close(self):
+        pass
+
+
+def test_concurrent_searches_overlap():
+    """Test that concurrent searches run in parallel and keep the event loop responsive"""
+    slow = SlowRetriever()
+    retriever = AsyncKnowledgeRetriever(slow, max_workers=4)
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.monotonic()
+        results = await asyncio.gather(*[retriever.search(f"query {i}") for i in range(4)])
+        elapsed = time.monotonic() - start
+        beat.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(scenario())
+    retriever.shutdown()
+
+    assert [r[0]["text"] for r in results] == [f"query {i}" for i in range(4)]
+    assert elapsed < 2 * slow.delay
+    assert ticks > 5
+
+
+def test_concurrency_is_bounded():
+    """Test that no more than max_workers calls run at once"""
+    slow = SlowRetriever(delay=0.05)
+    retriever = AsyncKnowledgeRetriever(slow, max_workers=2)
+
+    async def scenario():
+        await asyncio.gather(*[retriever.search("q") for _ in range(6)])
+        await retriever.record_usage([1, 2, 3], 0.5)
+
+    asyncio.run(scenario())
+    retriever.shutdown()
+
+    assert slow.peak == 2
+    assert slow.usage == [(1, 0.5), (2, 0.5), (3, 0.5)]
+
+
+def test_invalid_worker_count():
+    """Test that the pool needs at least one worker"""
+    with pytest.raises(ValueError):
+        AsyncKnowledgeRetriever(SlowRetriever(), max_workers=0)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from ai.bulk_encoder import BulkEncoder
+
+TEXTS = [f"teaching scenario number {i} " + "detail " * (i % 7) for i in range(23)]
+
+
+@pytest.fixture(scope="module")
+def expected():
+    """Embeddings of TEXTS computed in this process"""
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    embeddings = np.asarray(sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2").encode(TEXTS),
+                            dtype=np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def test_pool_output_matches_in_process_encode(expected):
+    """Test that worker processes return every row in input order"""
+    progress = []
+    with BulkEncoder(num_workers=2, chunk_size=4) as encoder:
+        embeddings = encoder.encode(TEXTS, progress=lambda done, total, elapsed: progress.append(done))
+
+    assert embeddings.shape == expected.shape
+    np.testing.assert_allclose(embeddings, expected, atol=1e-5)
+    assert progress[-1] == len(TEXTS)
+    assert progress == sorted(progress)
+
+
+def test_streamed_texts_are_written_to_npy(expected, tmp_path):
+    """Test that a generator is streamed into a memory-mapped .npy file"""
+    path = tmp_path / "embeddings.npy"
+    with BulkEncoder(num_workers=2, chunk_size=5) as encoder:
+        encoder.encode((text for text in TEXTS), output=str(path), total=len(TEXTS), progress=None)
+
+    np.testing.assert_allclose(np.load(path), expected, atol=1e-5)
+
+
+def test_output_array_must_fit(expected):
+    """Test that a preallocated output array needs one row per text"""
+    with BulkEncoder(num_workers=1) as encoder:
+        with pytest.raises(ValueError):
+            encoder.encode(TEXTS, output=np.empty((3, 384), dtype=np.float32))
@@ -0,0 +1,44 @@
+import importlib.util
+import sys
+import types
+
+import ai._config as ai_config
+import ai.embedding_cache as embedding_cache
+import ai.ingestion as ingestion
+import ai.result_cache as result_cache
+
+
+def load_config_module():
+    """Execute a fresh copy of ai._config against whatever `config` is importable"""
+    spec = importlib.util.spec_from_file_location("ai._config_copy", ai_config.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_modules_share_one_scenario_config():
+    """Test that every AI module reads the same merged settings"""
+    assert embedding_cache.SCENARIO_CONFIG is ai_config.SCENARIO_CONFIG
+    assert result_cache.SCENARIO_CONFIG is ai_config.SCENARIO_CONFIG
+    assert ingestion.SCENARIO_CONFIG is ai_config.SCENARIO_CONFIG
+    assert set(ai_config.DEFAULT_SCENARIO_CONFIG) <= set(ai_config.SCENARIO_CONFIG)
+
+
+def test_project_config_overrides_defaults(monkeypatch):
+    """Test that environment overrides win and missing keys keep the defaults"""
+    project_config = types.ModuleType("config")
+    project_config.SCENARIO_CONFIG = {"cache_ttl": 300, "similarity_threshold": 0.6}
+    monkeypatch.setitem(sys.modules, "config", project_config)
+
+    config = load_config_module().SCENARIO_CONFIG
+
+    assert config["cache_ttl"] == 300
+    assert config["similarity_threshold"] == 0.6
+    assert config["result_cache_size"] == ai_config.DEFAULT_SCENARIO_CONFIG["result_cache_size"]
+
+
+def test_defaults_used_without_project_config(monkeypatch):
+    """Test that the defaults apply when no project configuration can be imported"""
+    monkeypatch.setitem(sys.modules, "config", None)
+
+    assert load_config_module().SCENARIO_CONFIG == ai_config.DEFAULT_SCENARIO_CONFIG
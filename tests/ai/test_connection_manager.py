@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+
+import pytest
+from ai.connection_manager import SQLiteConnectionManager, get_connection_manager
+
+
+def test_wal_mode_and_read_only_readers(knowledge_db):
+    """Test that the database is switched to WAL and readers cannot write"""
+    db = SQLiteConnectionManager(knowledge_db)
+
+    assert db.wal_enabled
+    with db.reader() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] == 200
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("UPDATE chunks SET usage_count = 1")
+    db.close()
+
+
+def test_readers_are_thread_local_and_reused(knowledge_db):
+    """Test that each thread keeps one reader across calls"""
+    db = SQLiteConnectionManager(knowledge_db)
+    seen = {}
+
+    def borrow(name):
+        with db.reader() as first, db.reader() as second:
+            seen[name] = (first, first is second)
+
+    threads = [threading.Thread(target=borrow, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(same for _, same in seen.values())
+    assert len({id(conn) for conn, _ in seen.values()}) == 3
+    db.close()
+
+
+def test_concurrent_writers_are_serialized(knowledge_db):
+    """Test that writes from many threads all land without lock errors"""
+    db = SQLiteConnectionManager(knowledge_db)
+    errors = []
+
+    def increment():
+        try:
+            for _ in range(25):
+                with db.writer() as conn:
+                    count = conn.execute("SELECT usage_count FROM chunks WHERE id = 1").fetchone()[0]
+                    conn.execute("UPDATE chunks SET usage_count = ? WHERE id = 1", (count + 1,))
+        except sqlite3.Error as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=increment) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with db.reader() as conn:
+        assert conn.execute("SELECT usage_count FROM chunks WHERE id = 1").fetchone()[0] == 200
+    db.close()
+
+
+def test_writer_rolls_back_on_error(knowledge_db):
+    """Test that a failed write block leaves the database unchanged"""
+    db = SQLiteConnectionManager(knowledge_db)
+
+    with pytest.raises(RuntimeError):
+        with db.writer() as conn:
+            conn.execute("UPDATE chunks SET usage_count = 99 WHERE id = 2")
+            raise RuntimeError("boom")
+
+    with db.reader() as conn:
+        assert conn.execute("SELECT usage_count FROM chunks WHERE id = 2").fetchone()[0] == 0
+    db.close()
+
+
+def test_manager_is_shared_per_file(knowledge_db):
+    """Test that every caller gets the same manager for a database file"""
+    assert get_connection_manager(knowledge_db) is get_connection_manager(knowledge_db)
+
+
+def test_readers_of_exited_threads_are_closed(knowledge_db):
+    """Test that thread churn does not accumulate reader connections"""
+    db = SQLiteConnectionManager(knowledge_db)
+    opened = []
+
+    def borrow():
+        with db.reader() as conn:
+            opened.append(conn)
+
+    for _ in range(5):
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        thread.join()
+    with db.reader():
+        pass
+
+    assert len(db._readers) == 1
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    db.close()
@@ -0,0 +1,76 @@
+import numpy as np
+from ai.disk_embedding_cache import DiskEmbeddingCache
+from ai.embedding import EmbeddingGenerator
+
+MODEL = "all-MiniLM-L6-v2"
+
+
+class CountingEncoder:
+    """Encoder that records every batch it is asked to encode"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.stack([np.full(4, len(t), dtype=np.float32) for t in texts])
+
+
+def test_only_misses_are_encoded_and_survive_reopen(tmp_path):
+    """Test that cached texts skip the model, also after reopening the file"""
+    path = tmp_path / "cache.sqlite"
+    encode = CountingEncoder()
+    cache = DiskEmbeddingCache(path, max_entries=100)
+    first = cache.get_or_encode_many(MODEL, ["a", "bb", "a"], encode)
+    cache.close()
+
+    reopened = DiskEmbeddingCache(path, max_entries=100)
+    second = reopened.get_or_encode_many(MODEL, ["bb", "ccc", "a"], encode)
+
+    assert encode.calls == [["a", "bb"], ["ccc"]]
+    np.testing.assert_array_equal(first[:, 0], [1, 2, 1])
+    np.testing.assert_array_equal(second[:, 0], [2, 3, 1])
+    assert second.dtype == np.float32
+    assert reopened.stats()["hits"] == 2
+    assert reopened.stats()["size"] == 3
+
+
+def test_models_and_exact_text_are_part_of_the_key(tmp_path):
+    """Test that another model or an edited text is a miss"""
+    encode = CountingEncoder()
+    cache = DiskEmbeddingCache(tmp_path / "cache.sqlite")
+    cache.get_or_encode_many(MODEL, ["Text"], encode)
+    cache.get_or_encode_many(f"{MODEL}:onnx-int8", ["Text"], encode)
+    cache.get_or_encode_many(MODEL, ["text"], encode)
+
+    assert len(encode.calls) == 3
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Test that the cache stays within max_entries and keeps recently used texts"""
+    encode = CountingEncoder()
+    cache = DiskEmbeddingCache(tmp_path / "cache.sqlite", max_entries=10)
+    texts = [f"text {i}" for i in range(10)]
+    cache.get_or_encode_many(MODEL, texts, encode)
+    cache.get_many(MODEL, texts[:3])
+    cache.get_or_encode_many(MODEL, ["new 1", "new 2"], encode)
+
+    assert cache.stats()["size"] <= 10
+    assert cache.stats()["evictions"] > 0
+    kept = cache.get_many(MODEL, texts[:3] + ["new 1", "new 2"])
+    assert all(embedding is not None for embedding in kept)
+
+
+def test_embedding_generator_uses_disk_cache(tmp_path):
+    """Test that EmbeddingGenerator reads embeddings from the disk cache before the model"""
+    path = str(tmp_path / "cache.sqlite")
+    texts = ["How to handle classroom disruption?", "What are effective teaching strategies?"]
+    expected = EmbeddingGenerator(cache_path=path).embed_batch(texts)
+
+    embedder = EmbeddingGenerator(cache_path=path)
+    embedder._model = None
+    cached = embedder.embed_batch(texts)
+
+    assert embedder._model is None
+    np.testing.assert_allclose(cached, expected, atol=1e-6)
+    assert embedder.disk_cache.stats()["hits"] >= 2
@@ -1,22 +1,26 @@
+import numpy as np
 import pytest
 from ai.embedding import EmbeddingGenerator
 
+
 def test_embedding_initialization():
     """Test embedding generator initialization"""
     embedder = EmbeddingGenerator()
     assert embedder.dimension == 384
     assert embedder.model is not None
 
+
 def test_single_embedding():
     """Test generating embedding for single text"""
     embedder = EmbeddingGenerator()
     text = "How to handle classroom disruption?"
     embedding = embedder.generate_embedding(text)
-    
+
     assert isinstance(embedding, list)
     assert len(embedding) == 384
     assert all(isinstance(x, float) for x in embedding)
 
+
 def test_batch_embedding():
     """Test generating embeddings for multiple texts"""
     embedder = EmbeddingGenerator()
@@ -26,17 +30,44 @@ def test_batch_embedding():
         "How to engage students in online learning?"
     ]
     embeddings = embedder.batch_generate_embeddings(texts)
-    
+
     assert len(embeddings) == len(texts)
     assert all(len(emb) == 384 for emb in embeddings)
 
+
 def test_embedding_normalization():
     """Test that embeddings are normalized"""
     embedder = EmbeddingGenerator()
     text = "Test normalization"
     embedding = embedder.generate_embedding(text)
-    
+
     # Calculate L2 norm
-    import numpy as np
     norm = np.linalg.norm(embedding)
-    assert abs(norm - 1.0) < 1e-6  # Should be approximately 1 
\ No newline at end of file
+    assert abs(norm - 1.0) < 1e-6  # Should be approximately 1
+
+
+def test_embed_batch_returns_contiguous_array():
+    """Test that the array API returns one normalized float32 matrix"""
+    embedder = EmbeddingGenerator()
+    texts = [
+        "How to handle classroom disruption?",
+        "What are effective teaching strategies?",
+        "How to engage students in online learning?"
+    ]
+    embeddings = embedder.embed_batch(texts)
+
+    assert embeddings.shape == (3, 384)
+    assert embeddings.dtype == np.float32
+    assert embeddings.flags["C_CONTIGUOUS"]
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0, atol=1e-6)
+    assert np.allclose(embeddings, np.array(embedder.batch_generate_embeddings(texts)), atol=1e-6)
+    assert np.allclose(embedder.embed(texts[0]), embeddings[0], atol=1e-6)
+
+
+def test_embed_batch_rejects_empty_input():
+    """Test that the array API validates its input like the list API"""
+    embedder = EmbeddingGenerator()
+    with pytest.raises(ValueError):
+        embedder.embed_batch([])
+    with pytest.raises(ValueError):
+        embedder.embed_batch(["valid", "  "])
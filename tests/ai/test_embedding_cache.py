@@ -0,0 +1,87 @@
+import numpy as np
+import ai.embedding_cache as embedding_cache
+from ai.embedding_cache import QueryEmbeddingCache, get_query_embedding_cache
+
+MODEL = "all-MiniLM-L6-v2"
+
+
+class CountingEncoder:
+    """Encoder that records every text it is asked to encode"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(texts)
+        if isinstance(texts, str):
+            return np.full(4, len(texts), dtype=np.float32)
+        return np.stack([np.full(4, len(t), dtype=np.float32) for t in texts])
+
+
+def test_repeated_queries_are_served_from_cache():
+    """Test that normalized repeats of a query hit the cache"""
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    encode = CountingEncoder()
+
+    first = cache.get_or_encode(MODEL, "How do I handle  disruption?", encode)
+    second = cache.get_or_encode(MODEL, " How do I\thandle disruption? ", encode)
+
+    assert len(encode.calls) == 1
+    assert second is first
+    assert not second.flags["WRITEABLE"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.get("other-model", "How do I handle disruption?") is None
+
+
+def test_case_is_part_of_the_key():
+    """Test that queries differing only in case are encoded separately for cased models"""
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    encode = CountingEncoder()
+
+    cache.get_or_encode(MODEL, "Teaching in the US", encode)
+    cache.get_or_encode(MODEL, "teaching in the us", encode)
+
+    assert len(encode.calls) == 2
+
+
+def test_lru_eviction_and_ttl_expiry(monkeypatch):
+    """Test that the least recently used entry is evicted and old entries expire"""
+    now = [1000.0]
+    monkeypatch.setattr(embedding_cache.time, "monotonic", lambda: now[0])
+    cache = QueryEmbeddingCache(max_size=2, ttl=30)
+    encode = CountingEncoder()
+
+    cache.get_or_encode(MODEL, "a", encode)
+    cache.get_or_encode(MODEL, "b", encode)
+    cache.get_or_encode(MODEL, "a", encode)
+    cache.get_or_encode(MODEL, "c", encode)
+
+    assert cache.get(MODEL, "b") is None
+    assert cache.get(MODEL, "a") is not None
+    assert cache.stats()["evictions"] == 1
+
+    now[0] += 31
+    assert cache.get(MODEL, "a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_batch_lookup_encodes_only_misses():
+    """Test that batched lookups send only uncached texts to the encoder"""
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    encode = CountingEncoder()
+    cache.get_or_encode(MODEL, "cached", encode)
+
+    embeddings = cache.get_or_encode_many(MODEL, ["new one", "cached", "another"], encode)
+
+    assert encode.calls[-1] == ["new one", "another"]
+    assert embeddings.shape == (3, 4)
+    assert embeddings[1][0] == len("cached")
+
+
+def test_shared_cache_uses_scenario_config():
+    """Test that the process-wide cache is a singleton configured from SCENARIO_CONFIG"""
+    cache = get_query_embedding_cache()
+
+    assert cache is get_query_embedding_cache()
+    assert cache.ttl == embedding_cache.SCENARIO_CONFIG["cache_ttl"]
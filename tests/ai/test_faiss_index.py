@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+from ai.faiss_index import FaissVectorIndex
+from ai.vector_index import InMemoryVectorIndex
+
+DIMENSION = 384
+
+
+@pytest.mark.parametrize("index_type", ["hnsw", "ivf"])
+def test_build_save_and_load(knowledge_db, index_type):
+    """Test that a built index survives a save/load round trip"""
+    index = FaissVectorIndex.build(knowledge_db, index_type=index_type)
+    index_path = FaissVectorIndex.default_index_path(knowledge_db)
+    index.save(index_path)
+
+    loaded = FaissVectorIndex.load(index_path)
+    query = np.random.default_rng(1).normal(size=DIMENSION).astype(np.float32)
+
+    assert index_path.endswith("vector_db.faiss")
+    assert len(loaded) == 200
+    assert loaded.search(query, top_k=5) == index.search(query, top_k=5)
+
+
+def test_recall_against_exact_search(knowledge_db):
+    """Test HNSW recall and category filtering against the exact index"""
+    index = FaissVectorIndex.build(knowledge_db, index_type="hnsw")
+    exact = InMemoryVectorIndex.from_database(knowledge_db)
+    queries = np.random.default_rng(5).normal(size=(20, DIMENSION)).astype(np.float32)
+
+    approx_hits = index.search_batch(queries, category="special_needs", top_k=5)
+    exact_hits = exact.search_batch(queries, category="special_needs", top_k=5)
+
+    found = sum(len({i for i, _ in a} & {i for i, _ in e}) for a, e in zip(approx_hits, exact_hits))
+    assert found / (5 * len(queries)) >= 0.9
+    special_ids = set(exact.ids[exact.categories == "special_needs"].tolist())
+    assert all(chunk_id in special_ids for hits in approx_hits for chunk_id, _ in hits)
+    assert all(len(hits) == 5 for hits in approx_hits)
+
+
+class CountingIndex:
+    """Wraps a FAISS index and records the k of every search"""
+
+    def __init__(self, index):
+        self._index = index
+        self.calls = []
+
+    def search(self, queries, k, **kwargs):
+        self.calls.append(k)
+        return self._index.search(queries, k, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._index, name)
+
+
+@pytest.mark.parametrize("index_type", ["hnsw", "ivf"])
+def test_category_filter_searches_once_within_the_category(knowledge_db, index_type):
+    """Test that a category filter is one selector search, not a growing over-fetch"""
+    index = FaissVectorIndex.build(knowledge_db, index_type=index_type)
+    index.set_search_effort(512)
+    rare_id = int(index.ids[0])
+    index.categories[0] = "rare"
+    counting = CountingIndex(index.index)
+    index.index = counting
+    queries = np.random.default_rng(3).normal(size=(4, DIMENSION)).astype(np.float32)
+
+    rare_hits = index.search_batch(queries, category="rare", top_k=5)
+    missing_hits = index.search_batch(queries, category="no_such_category", top_k=5)
+
+    assert [[chunk_id for chunk_id, _ in hits] for hits in rare_hits] == [[rare_id]] * 4
+    assert missing_hits == [[], [], [], []]
+    assert counting.calls == [1]
@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import ai.model_registry as model_registry
+from ai.knowledge_retriever import KnowledgeRetriever
+
+SRC = Path(__file__).resolve().parents[2] / "src"
+HEAVY_MODULES = ["torch", "sentence_transformers", "pandas", "langchain_ollama", "faiss", "onnxruntime"]
+
+
+def loaded_after_import(*modules):
+    """Import modules in a fresh interpreter and list the heavy dependencies it loaded"""
+    code = "; ".join(
+        [f"import {module}" for module in modules]
+        + ["import sys, json", f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"]
+    )
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_ai_modules_import_without_heavy_dependencies():
+    """Test that importing the retrieval stack loads no model, index or LLM library"""
+    loaded = loaded_after_import(
+        "ai.model_registry", "ai.embedding", "ai.faiss_index", "ai.onnx_encoder",
+        "ai.knowledge_retriever", "ai.async_retriever", "web.rag"
+    )
+    assert loaded == []
+
+
+class CountingModel:
+    loads = 0
+
+    def __init__(self, model_name):
+        CountingModel.loads += 1
+
+    def encode(self, texts, **kwargs):
+        return np.ones(384, dtype=np.float32)
+
+
+def test_model_loads_on_warmup_not_construction(knowledge_db, monkeypatch):
+    """Test that the retriever defers the model load until warmup"""
+    CountingModel.loads = 0
+    monkeypatch.setattr(model_registry, "SentenceTransformer", CountingModel)
+    model_registry.clear_models()
+    try:
+        retriever = KnowledgeRetriever(knowledge_db, index_backend="memory")
+        assert CountingModel.loads == 0
+        assert not retriever.ready
+
+        assert retriever.warmup()
+        assert CountingModel.loads == 1
+        assert retriever.ready
+        assert retriever._index is not None
+        retriever.close()
+    finally:
+        model_registry.clear_models()
+
+
+def run_benchmark(*args):
+    """Run the import-time benchmark script and return its exit code"""
+    script = SRC.parent / "scripts" / "benchmark_import_time.py"
+    proc = subprocess.run([sys.executable, str(script), "--repeat", "1", *args], capture_output=True, text=True)
+    return proc.returncode
+
+
+def test_benchmark_fails_on_import_errors_unless_allowed():
+    """Test that a module that cannot be imported fails the budget check unless allowed"""
+    assert run_benchmark("--modules", "ai.no_such_module") == 0
+    assert run_benchmark("--modules", "ai.no_such_module", "--max-seconds", "60") == 1
+    assert run_benchmark("--modules", "ai.no_such_module", "--max-seconds", "60",
+                         "--allow-missing", "ai.no_such_module") == 0
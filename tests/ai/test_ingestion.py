@@ -0,0 +1,161 @@
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+import ai.model_registry as model_registry
+from ai.ingestion import chunk_text, ingest_documents, iter_documents
+from ai.knowledge_retriever import KnowledgeRetriever
+
+
+class CountingModel:
+    """Deterministic stand-in model that records every encoded text"""
+    encoded = []
+
+    def __init__(self, model_name):
+        pass
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        CountingModel.encoded.extend(texts)
+        vectors = np.stack([
+            np.random.default_rng(abs(hash(text)) % 2**32).normal(size=384).astype(np.float32)
+            for text in texts
+        ])
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture(autouse=True)
+def fake_model(monkeypatch):
+    CountingModel.encoded = []
+    monkeypatch.setattr(model_registry, "SentenceTransformer", CountingModel)
+    model_registry.clear_models()
+    yield
+    model_registry.clear_models()
+
+
+def make_documents(edited=None):
+    documents = [
+        {"source": f"doc-{i}", "category": "classroom_management",
+         "text": "\n\n".join(f"Paragraph {j} of document {i} about routines." for j in range(20))}
+        for i in range(5)
+    ]
+    if edited is not None:
+        documents[edited]["text"] = documents[edited]["text"].replace("Paragraph 19", "Edited paragraph 19")
+    return documents
+
+
+def test_chunk_text_respects_size_and_overlap():
+    """Test that chunks stay within the size limit and repeat trailing context"""
+    text = "\n\n".join(f"Sentence number {i} with a few more words." for i in range(50))
+    chunks = chunk_text(text, chunk_size=200, chunk_overlap=60)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split("\n\n")[0] in previous
+
+    long_word_run = " ".join(["word"] * 100)
+    assert all(len(chunk) <= 50 for chunk in chunk_text(long_word_run, chunk_size=50, chunk_overlap=10))
+
+    with pytest.raises(ValueError):
+        chunk_text(text, chunk_size=100, chunk_overlap=100)
+
+
+def test_reingest_only_embeds_changed_chunks(tmp_path):
+    """Test that unchanged chunks are skipped and edited ones keep their ids"""
+    conn = sqlite3.connect(tmp_path / "kb.sqlite")
+    first = ingest_documents(conn, make_documents(), chunk_size=300, chunk_overlap=50, batch_size=7)
+    assert first["embedded"] == first["chunks"] > 5
+    assert len(CountingModel.encoded) == first["chunks"]
+    ids_before = dict(conn.execute("SELECT chunk_id, content_hash FROM chunk_hashes").fetchall())
+
+    CountingModel.encoded = []
+    second = ingest_documents(conn, make_documents(edited=2), chunk_size=300, chunk_overlap=50, batch_size=7)
+    assert second["embedded"] == 1
+    assert second["unchanged"] == second["chunks"] - 1
+    assert CountingModel.encoded == [text for text in CountingModel.encoded if "Edited" in text]
+
+    ids_after = dict(conn.execute("SELECT chunk_id, content_hash FROM chunk_hashes").fetchall())
+    assert ids_after.keys() == ids_before.keys()
+    assert conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == len(ids_after)
+    conn.close()
+
+
+def test_prepended_paragraph_only_embeds_the_new_chunk(tmp_path):
+    """Test that chunks shifted by an insertion are matched by hash and keep their ids"""
+    conn = sqlite3.connect(tmp_path / "kb.sqlite")
+    paragraphs = [f"Paragraph {j} about classroom routines and rules." for j in range(6)]
+    document = {"source": "doc", "category": "classroom_management", "text": "\n\n".join(paragraphs)}
+    ingest_documents(conn, [document], chunk_size=60, chunk_overlap=10)
+    ids_before = dict(conn.execute("SELECT content_hash, chunk_id FROM chunk_hashes").fetchall())
+
+    CountingModel.encoded = []
+    document["text"] = "\n\n".join(["A new opening paragraph."] + paragraphs)
+    stats = ingest_documents(conn, [document], chunk_size=60, chunk_overlap=10)
+
+    assert CountingModel.encoded == ["A new opening paragraph."]
+    assert stats["embedded"] == 1 and stats["unchanged"] == len(paragraphs)
+    rows = conn.execute("SELECT content_hash, chunk_id, position FROM chunk_hashes ORDER BY position").fetchall()
+    assert [position for _, _, position in rows] == list(range(len(paragraphs) + 1))
+    assert {digest: chunk_id for digest, chunk_id, _ in rows[1:]} == ids_before
+    metadata = conn.execute("SELECT metadata FROM chunks WHERE id = ?", (rows[1][1],)).fetchone()[0]
+    assert json.loads(metadata)["chunk"] == 1
+    conn.close()
+
+
+def test_shortened_and_pruned_sources_are_deleted(tmp_path):
+    """Test that removed chunks and sources disappear with their embeddings"""
+    conn = sqlite3.connect(tmp_path / "kb.sqlite")
+    documents = make_documents()
+    ingest_documents(conn, documents, chunk_size=300, chunk_overlap=50)
+
+    documents[0]["text"] = "Only one short paragraph now."
+    stats = ingest_documents(conn, documents[:3], chunk_size=300, chunk_overlap=50, prune=True)
+    assert stats["deleted"] > 0
+
+    sources = {row[0] for row in conn.execute("SELECT DISTINCT source FROM chunk_hashes")}
+    assert sources == {"doc-0", "doc-1", "doc-2"}
+    orphans = conn.execute(
+        "SELECT COUNT(*) FROM embeddings WHERE chunk_id NOT IN (SELECT id FROM chunks)"
+    ).fetchone()[0]
+    assert orphans == 0
+    assert conn.execute("SELECT COUNT(*) FROM chunk_hashes WHERE source = 'doc-0'").fetchone()[0] == 1
+    conn.close()
+
+
+def test_failed_ingest_leaves_database_unchanged(tmp_path):
+    """Test that an error mid-run rolls back the whole transaction"""
+    conn = sqlite3.connect(tmp_path / "kb.sqlite")
+    ingest_documents(conn, make_documents()[:1], chunk_size=300, chunk_overlap=50)
+    count = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def broken_documents():
+        yield from make_documents()[1:3]
+        raise RuntimeError("source unavailable")
+
+    with pytest.raises(RuntimeError):
+        ingest_documents(conn, broken_documents(), chunk_size=300, chunk_overlap=50, batch_size=2)
+    assert conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] == count
+    conn.close()
+
+
+def test_ingested_chunks_are_searchable(tmp_path):
+    """Test that KnowledgeRetriever finds chunks written by the ingestion pipeline"""
+    (tmp_path / "docs" / "special_needs").mkdir(parents=True)
+    (tmp_path / "docs" / "special_needs" / "iep.md").write_text("IEP accommodations for reading.")
+    (tmp_path / "docs" / "extra.jsonl").write_text(
+        json.dumps({"source": "faq-1", "text": "Seating charts reduce disruption.", "category": "classroom_management"})
+        + "\n"
+    )
+    db_path = tmp_path / "kb.sqlite"
+    conn = sqlite3.connect(db_path)
+    ingest_documents(conn, iter_documents([str(tmp_path / "docs")]))
+    conn.close()
+
+    retriever = KnowledgeRetriever(str(db_path))
+    results = retriever.search("IEP accommodations for reading.", top_k=1)
+    assert results[0]["text"] == "IEP accommodations for reading."
+    assert results[0]["category"] == "special_needs"
+    assert set(retriever.get_categories()) == {"special_needs", "classroom_management"}
+    retriever.close()
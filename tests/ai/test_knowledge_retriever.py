@@ -0,0 +1,230 @@
+import sqlite3
+
+import numpy as np
+import pytest
+import ai.connection_manager as connection_manager
+import ai.knowledge_retriever as knowledge_retriever
+import ai.model_registry as model_registry
+from ai.knowledge_retriever import KnowledgeRetriever, reciprocal_rank_fusion
+from ai.knowledge_store import quantize_embeddings
+from ai.vector_index import QuantizedVectorIndex, export_snapshot
+
+DIMENSION = 384
+
+
+class FakeSentenceTransformer:
+    """Deterministic stand-in for the MiniLM encoder"""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        vectors = np.stack([
+            np.random.default_rng(abs(hash(text.lower())) % 2**32).normal(size=DIMENSION)
+            for text in texts
+        ]).astype(np.float32)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def make_retriever(knowledge_db, monkeypatch):
+    """Factory for retrievers over the test knowledge base with a fake encoder"""
+    monkeypatch.setattr(model_registry, "SentenceTransformer", FakeSentenceTransformer)
+    model_registry.clear_models()
+
+    def factory(**kwargs):
+        return KnowledgeRetriever(knowledge_db, **kwargs)
+    return factory
+
+
+@pytest.mark.parametrize("index_backend", ["memory", "mmap", "faiss", "quantized"])
+def test_index_backends_match_sqlite_scan(make_retriever, knowledge_db, index_backend):
+    """Test that every index backend returns the same chunks as the SQLite scan"""
+    if index_backend == "mmap":
+        export_snapshot(knowledge_db)
+    if index_backend == "quantized":
+        conn = sqlite3.connect(knowledge_db)
+        quantize_embeddings(conn)
+        conn.close()
+    if index_backend == "faiss":
+        pytest.importorskip("faiss")
+        from ai.faiss_index import FaissVectorIndex
+        FaissVectorIndex.build(knowledge_db).save(FaissVectorIndex.default_index_path(knowledge_db))
+    baseline = make_retriever()
+    retriever = make_retriever(index_backend=index_backend)
+
+    if index_backend == "mmap":
+        assert isinstance(retriever._get_index().matrix.base, np.memmap)
+    if index_backend == "faiss":
+        assert isinstance(retriever._get_index(), FaissVectorIndex)
+    if index_backend == "quantized":
+        assert isinstance(retriever._get_index(), QuantizedVectorIndex)
+
+    for category in (None, "teaching_strategies"):
+        expected = baseline.search("classroom disruption strategies", category, top_k=5)
+        results = retriever.search("classroom disruption strategies", category, top_k=5)
+        assert [r["id"] for r in results] == [r["id"] for r in expected]
+        assert all({"id", "text", "metadata", "category", "similarity"} <= set(r) for r in results)
+
+
+def test_search_many_matches_search(make_retriever):
+    """Test that batched search returns the same results as single searches"""
+    retriever = make_retriever(index_backend="memory")
+    queries = ["student interruptions", "reading groups", "IEP accommodations"]
+
+    batched = retriever.search_many(queries, category="special_needs", top_k=4)
+
+    assert len(batched) == len(queries)
+    for query, results in zip(queries, batched):
+        assert [r["id"] for r in results] == [r["id"] for r in retriever.search(query, "special_needs", 4)]
+
+
+def test_hybrid_search_promotes_exact_terms(make_retriever, knowledge_db):
+    """Test that hybrid mode surfaces chunks containing rare exact terms"""
+    conn = sqlite3.connect(knowledge_db)
+    with conn:
+        conn.execute("UPDATE chunks SET text = 'Follow the PBIS matrix for hallway behavior' WHERE id = 12")
+    conn.close()
+    retriever = make_retriever()
+
+    hybrid_ids = [r["id"] for r in retriever.search("PBIS matrix", top_k=3, mode="hybrid")]
+    keyword_ids = [r["id"] for r in retriever.search("PBIS matrix", top_k=3, mode="keyword")]
+
+    assert keyword_ids == [12]
+    assert 12 in hybrid_ids
+    assert len(hybrid_ids) == 3
+
+    with pytest.raises(ValueError):
+        retriever.search("PBIS matrix", mode="semantic")
+
+
+def test_reciprocal_rank_fusion():
+    """Test that chunks ranked by both lists come first"""
+    fused = reciprocal_rank_fusion([[(1, 0.9), (2, 0.8)], [(2, 5.0), (3, 4.0)]])
+
+    assert [chunk_id for chunk_id, _ in fused] == [2, 1, 3]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_search_results_cached_until_knowledge_base_changes(make_retriever, knowledge_db):
+    """Test that repeated searches hit the result cache and content edits invalidate it"""
+    retriever = make_retriever(index_backend="memory")
+    query = "classroom disruption strategies"
+
+    first = retriever.search(query, top_k=3)
+    assert retriever.search("  classroom   disruption strategies ", top_k=3) == first
+    assert retriever.result_cache.stats()["hits"] == 1
+
+    # Usage statistics do not change the ranking and keep the cache warm
+    retriever.update_usage_statistics(first[0]["id"], 0.9)
+    retriever.search(query, top_k=3)
+    assert retriever.result_cache.stats()["hits"] == 2
+
+    conn = sqlite3.connect(knowledge_db)
+    with conn:
+        conn.execute("UPDATE chunks SET category = 'archived' WHERE id = ?", (first[0]["id"],))
+    conn.close()
+
+    results = retriever.search(query, top_k=3)
+    assert retriever.result_cache.stats()["invalidations"] == 1
+    assert first[0]["id"] in [r["id"] for r in results]
+    assert next(r for r in results if r["id"] == first[0]["id"])["category"] == "archived"
+
+
+def test_sqlite_scan_decodes_metadata_for_top_k_only(make_retriever, monkeypatch):
+    """Test that the SQLite scan ranks compact hits and decodes metadata only for the results"""
+    retriever = make_retriever()
+    memory = make_retriever(index_backend="memory")
+    decoded = []
+    real_loads = knowledge_retriever.json.loads
+    monkeypatch.setattr(knowledge_retriever.json, "loads", lambda s: decoded.append(s) or real_loads(s))
+    retriever.SCAN_BATCH = 16
+
+    embedding = retriever.model.encode("behavior plan")
+    hits = retriever._scan_vector_hits(embedding, None, 5)
+    results = retriever._search_uncached("behavior plan", None, 5, "vector")
+
+    assert not hasattr(hits[0], "__dict__")
+    assert [hit.id for hit in hits] == [r["id"] for r in results]
+    assert [r["id"] for r in results] == [r["id"] for r in memory._search_uncached("behavior plan", None, 5, "vector")]
+    assert len(decoded) == 10  # 5 for the SQLite scan, 5 for the memory index
+
+
+def test_scan_keyword_search_without_fts(make_retriever, knowledge_db):
+    """Test the Python keyword scan used when FTS5 is unavailable"""
+    conn = sqlite3.connect(knowledge_db)
+    with conn:
+        conn.execute("UPDATE chunks SET text = 'Token economy for behavior' WHERE id = 9")
+    conn.close()
+    retriever = make_retriever()
+    retriever.keyword_index_available = False
+
+    results = retriever.search("token behavior", mode="keyword", top_k=3)
+
+    assert [r["id"] for r in results] == [9]
+    assert results[0]["similarity"] == 1.0
+    assert results[0]["metadata"] == {"source": "test"}
+
+
+def test_most_effective_knowledge_from_leaderboard(make_retriever):
+    """Test that the leaderboard answers like the full chunks query after recorded usage"""
+    retriever = make_retriever()
+    rng = np.random.default_rng(5)
+    for chunk_id in range(1, 101):
+        retriever.record_usage([chunk_id], float(rng.random()))
+    retriever.usage_recorder.flush()
+
+    for category in (None, "special_needs"):
+        from_leaderboard = retriever.get_most_effective_knowledge(category, limit=10)
+        retriever.leaderboard_available = False
+        from_chunks = retriever.get_most_effective_knowledge(category, limit=10)
+        retriever.leaderboard_available = True
+        assert len(from_leaderboard) == 10
+        assert from_leaderboard == from_chunks
+    retriever.close()
+
+
+@pytest.mark.parametrize("index_backend", ["sqlite", "memory"])
+def test_search_by_vector_matches_search(make_retriever, index_backend):
+    """Test that a precomputed embedding ranks like the text query it came from"""
+    retriever = make_retriever(index_backend=index_backend)
+    query = "classroom routines"
+    embedding = FakeSentenceTransformer("mini").encode(query)
+
+    assert retriever.search_by_vector(embedding, top_k=5) == retriever.search(query, top_k=5)
+    assert retriever.search_by_vector(embedding, top_k=5, query=query) == retriever.search(query, top_k=5, mode="hybrid")
+    retriever.close()
+
+
+def test_read_only_database_is_served_without_schema_writes(make_retriever, knowledge_db, monkeypatch):
+    """Test that a read-only knowledge base without FTS5 or version tracking still answers searches"""
+    monkeypatch.setattr(connection_manager.os, "access", lambda path, mode: False)
+    retriever = make_retriever(index_backend="memory")
+
+    assert retriever.db.read_only and not retriever.db.wal_enabled
+    assert retriever.db._writer is None
+    assert not retriever.keyword_index_available and not retriever.version_tracking_available
+    assert len(retriever.search("behavior plan", top_k=3)) == 3
+    assert len(retriever.search("behavior plan", top_k=3, mode="keyword")) <= 3
+    retriever.db.close()
+
+
+def test_precomputed_embedding_falls_back_to_keyword_search(make_retriever, monkeypatch):
+    """Test that a search with a caller's embedding survives a failing vector backend and is cached"""
+    retriever = make_retriever(index_backend="memory")
+
+    def broken(*args, **kwargs):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(retriever, "_vector_search", broken)
+    embedding = FakeSentenceTransformer("mini").encode("chunk 7")
+
+    results = retriever.search("chunk 7", top_k=3, query_embedding=embedding)
+
+    assert results and results[0]["text"] == "chunk 7"
+    assert retriever._model is None
+    assert retriever.search("chunk 7", top_k=3, query_embedding=embedding) == results
+    assert retriever.result_cache.stats()["hits"] == 1
+    retriever.close()
@@ -0,0 +1,154 @@
+import sqlite3
+
+import numpy as np
+import pytest
+from ai.knowledge_store import (
+    build_match_query, ensure_fts_index, has_fts_index, normalize_embeddings, quantize_embeddings,
+    embeddings_normalized, quantized_embeddings_available, quantize_vectors,
+    ensure_leaderboard, LEADERBOARD_SIZE
+)
+from ai.usage_recorder import USAGE_UPDATE_SQL
+
+
+def match_ids(conn, query):
+    """Chunk ids matching a keyword query, best BM25 rank first"""
+    rows = conn.execute(
+        "SELECT rowid FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY bm25(chunks_fts)",
+        (build_match_query(query),)
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def test_fts_index_is_built_and_kept_in_sync(knowledge_db):
+    """Test that the FTS5 index covers existing rows and follows later writes"""
+    conn = sqlite3.connect(knowledge_db)
+    conn.execute("UPDATE chunks SET text = 'Review the IEP goals with PBIS supports' WHERE id = 7")
+    conn.commit()
+
+    assert ensure_fts_index(conn)
+    assert has_fts_index(conn)
+    assert match_ids(conn, "IEP") == [7]
+
+    with conn:
+        conn.execute("INSERT INTO chunks (id, text, metadata, category) VALUES (500, 'Handling disruptions calmly', '{}', 'x')")
+        conn.execute("UPDATE chunks SET text = 'Morning routine' WHERE id = 7")
+        conn.execute("UPDATE chunks SET usage_count = usage_count + 1 WHERE id = 500")
+    assert match_ids(conn, "disruption") == [500]
+    assert match_ids(conn, "IEP") == []
+
+    with conn:
+        conn.execute("DELETE FROM chunks WHERE id = 500")
+    assert match_ids(conn, "disruption") == []
+    conn.close()
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("IEP goals", '"iep" OR "goals"'),
+    ('NOT "quoted" AND*', '"not" OR "quoted" OR "and"'),
+    ("   ", None),
+])
+def test_build_match_query(query, expected):
+    """Test that user input is turned into a safe OR query"""
+    assert build_match_query(query) == expected
+
+
+def test_embedding_migrations_track_later_writes(knowledge_db):
+    """Test that normalization and quantization are flagged stale by new embeddings"""
+    conn = sqlite3.connect(knowledge_db)
+    assert not embeddings_normalized(conn)
+
+    assert normalize_embeddings(conn) == 200
+    assert normalize_embeddings(conn) == 0
+    assert quantize_embeddings(conn) == 200
+    assert embeddings_normalized(conn) and quantized_embeddings_available(conn)
+    for (blob,) in conn.execute("SELECT vector FROM embeddings"):
+        assert abs(np.linalg.norm(np.frombuffer(blob, dtype=np.float32)) - 1.0) < 1e-5
+
+    with conn:
+        conn.execute("DELETE FROM embeddings WHERE chunk_id = 1")
+    assert quantized_embeddings_available(conn)
+    assert conn.execute("SELECT COUNT(*) FROM embeddings_int8").fetchone()[0] == 199
+
+    with conn:
+        conn.execute("INSERT INTO embeddings VALUES (1, ?)", (np.full(384, 2.0, dtype=np.float32).tobytes(),))
+    assert not embeddings_normalized(conn)
+    assert not quantized_embeddings_available(conn)
+    conn.close()
+
+
+def test_quantize_vectors_preserves_direction():
+    """Test that int8 codes keep cosine similarity close to the float32 vectors"""
+    vectors = np.random.default_rng(0).normal(size=(50, 384)).astype(np.float32)
+    vectors[0] = 0.0
+    codes = quantize_vectors(vectors)
+
+    assert codes.dtype == np.int8
+    assert not codes[0].any()
+    decoded = codes[1:].astype(np.float32)
+    cosine = np.sum(decoded * vectors[1:], axis=1) / (
+        np.linalg.norm(decoded, axis=1) * np.linalg.norm(vectors[1:], axis=1))
+    assert cosine.min() > 0.999
+
+
+def ranked_ids(conn, category, limit=LEADERBOARD_SIZE):
+    """Reference ranking computed from the chunks table"""
+    rows = conn.execute(
+        """SELECT id FROM chunks WHERE category = ? AND usage_count > 0
+           ORDER BY effectiveness_score DESC, usage_count DESC, id LIMIT ?""",
+        (category, limit)
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def leaderboard_ids(conn, category):
+    rows = conn.execute(
+        """SELECT chunk_id FROM knowledge_leaderboard WHERE category = ?
+           ORDER BY effectiveness_score DESC, usage_count DESC, chunk_id""",
+        (category,)
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def test_leaderboard_follows_usage_updates(knowledge_db):
+    """Test that the leaderboard stays equal to a full ranking through rising and falling scores"""
+    rng = np.random.default_rng(3)
+    conn = sqlite3.connect(knowledge_db)
+    with conn:
+        conn.executemany(
+            "UPDATE chunks SET usage_count = 1, effectiveness_score = ? WHERE id = ?",
+            [(float(rng.random()), chunk_id) for chunk_id in range(1, 121)]
+        )
+    assert ensure_leaderboard(conn)
+    categories = [row[0] for row in conn.execute("SELECT DISTINCT category FROM chunks")]
+
+    for _ in range(20):
+        rows = [
+            {"chunk_id": int(chunk_id), "uses": 1, "scored": 1, "score_sum": float(rng.random())}
+            for chunk_id in rng.choice(np.arange(1, 201), size=25, replace=False)
+        ]
+        with conn:
+            conn.executemany(USAGE_UPDATE_SQL, rows)
+        for category in categories:
+            assert leaderboard_ids(conn, category) == ranked_ids(conn, category)
+
+    with conn:
+        top = ranked_ids(conn, categories[0])[0]
+        conn.execute("UPDATE chunks SET category = ? WHERE id = ?", (categories[1], top))
+        conn.execute("DELETE FROM chunks WHERE id = ?", (ranked_ids(conn, categories[2])[0],))
+    for category in categories:
+        assert leaderboard_ids(conn, category) == ranked_ids(conn, category)
+    conn.close()
+
+
+def test_ranking_query_uses_composite_index(knowledge_db):
+    """Test that ranking chunks by effectiveness no longer sorts the table"""
+    conn = sqlite3.connect(knowledge_db)
+    assert ensure_leaderboard(conn)
+    plan = " ".join(str(row) for row in conn.execute(
+        """EXPLAIN QUERY PLAN SELECT id FROM chunks WHERE category = ? AND usage_count > 0
+           ORDER BY effectiveness_score DESC, usage_count DESC LIMIT 10""",
+        ("special_needs",)
+    ))
+    assert "idx_chunks_category_effectiveness" in plan
+    assert "TEMP B-TREE" not in plan
+    conn.close()
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from ai.embedding import EmbeddingGenerator
+from ai.length_bucketing import padding_stats, plan_buckets, token_lengths
+
+MIXED_LENGTHS = [8, 200, 10, 180, 12, 9, 220, 11] * 8
+
+
+def test_buckets_cover_every_text_once_in_length_order():
+    """Test that the plan is a length-sorted partition of the input"""
+    buckets = plan_buckets(MIXED_LENGTHS, batch_size=8)
+
+    flat = np.concatenate(buckets)
+    assert sorted(flat.tolist()) == list(range(len(MIXED_LENGTHS)))
+    assert [MIXED_LENGTHS[i] for i in flat] == sorted(MIXED_LENGTHS, reverse=True)
+    assert all(len(bucket) <= 8 for bucket in buckets)
+
+
+def test_bucketing_improves_padding_efficiency():
+    """Test that sorted buckets waste far fewer pad tokens than input order"""
+    stats = padding_stats(MIXED_LENGTHS, plan_buckets(MIXED_LENGTHS, batch_size=8), batch_size=8)
+
+    assert stats["tokens"] == sum(MIXED_LENGTHS)
+    assert stats["padding_efficiency"] > 0.9
+    assert stats["unsorted_padding_efficiency"] < 0.6
+
+
+def test_token_budget_sizes_buckets():
+    """Test that a token budget gives short texts larger buckets and stays within budget"""
+    buckets = plan_buckets(MIXED_LENGTHS, batch_size=8, max_tokens=1000)
+
+    for bucket in buckets:
+        longest = max(MIXED_LENGTHS[i] for i in bucket)
+        assert longest * len(bucket) <= 1000 or len(bucket) == 1
+    assert len(buckets[-1]) > 8
+    with pytest.raises(ValueError):
+        plan_buckets(MIXED_LENGTHS, batch_size=0)
+
+
+def test_max_batch_size_caps_budgeted_buckets():
+    """Test that max_batch_size bounds the buckets of short texts under a token budget"""
+    buckets = plan_buckets(MIXED_LENGTHS, batch_size=8, max_tokens=1000, max_batch_size=16)
+
+    assert max(len(bucket) for bucket in buckets) == 16
+    assert sorted(np.concatenate(buckets).tolist()) == list(range(len(MIXED_LENGTHS)))
+    with pytest.raises(ValueError):
+        plan_buckets(MIXED_LENGTHS, batch_size=8, max_tokens=1000, max_batch_size=0)
+
+
+def test_token_lengths_fall_back_to_words():
+    """Test the word-count estimate for models without a tokenizer"""
+    assert token_lengths(object(), ["one two three", "four"]).tolist() == [5, 3]
+
+
+def test_embed_batch_buckets_by_length_and_restores_input_order():
+    """Test that embed_batch encodes in length buckets and returns rows in input order"""
+    embedder = EmbeddingGenerator(batch_size=3)
+    texts = ["Short prompt?"] + [
+        "A much longer scenario description " * (i + 1) for i in range(5)
+    ] + ["Another quick one", "Brief"]
+
+    embeddings = embedder.embed_batch(texts)
+    stats = embedder.last_padding_stats
+
+    np.testing.assert_allclose(embeddings, np.stack([embedder.embed(text) for text in texts]), atol=1e-6)
+    assert stats["texts"] == len(texts)
+    assert stats["buckets"] == 3
+    assert stats["padding_efficiency"] >= stats["unsorted_padding_efficiency"]
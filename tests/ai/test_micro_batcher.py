@@ -0,0 +1,147 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+import ai.model_registry as model_registry
+from ai.async_retriever import AsyncKnowledgeRetriever
+from ai.knowledge_retriever import KnowledgeRetriever
+from ai.micro_batcher import EmbeddingMicroBatcher
+
+
+class RecordingEncoder:
+    """Batch encoder that records the batches it receives"""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return np.stack([np.full(4, len(t), dtype=np.float32) for t in texts])
+
+
+def test_concurrent_requests_share_one_encode():
+    """Test that requests arriving within the window are encoded together"""
+    encoder = RecordingEncoder()
+    batcher = EmbeddingMicroBatcher(encoder, max_batch_size=32, max_wait_ms=20)
+
+    async def scenario():
+        return await asyncio.gather(*[batcher.encode("x" * (i + 1)) for i in range(10)])
+
+    results = asyncio.run(scenario())
+
+    assert len(encoder.batches) == 1
+    assert [int(row[0]) for row in results] == list(range(1, 11))
+    assert batcher.stats()["mean_batch_size"] == 10
+
+
+def test_full_batches_are_sent_without_waiting():
+    """Test that a batch is dispatched as soon as it reaches max_batch_size"""
+    encoder = RecordingEncoder()
+    batcher = EmbeddingMicroBatcher(encoder, max_batch_size=4, max_wait_ms=10000)
+
+    async def scenario():
+        return await asyncio.wait_for(batcher.encode_many([f"text {i}" for i in range(8)]), timeout=2)
+
+    embeddings = asyncio.run(scenario())
+
+    assert [len(batch) for batch in encoder.batches] == [4, 4]
+    assert embeddings.shape == (8, 4)
+
+
+def test_duplicates_are_encoded_once_and_errors_reach_every_caller():
+    """Test deduplication within a batch and propagation of encoder errors"""
+    encoder = RecordingEncoder()
+    batcher = EmbeddingMicroBatcher(encoder, max_wait_ms=5)
+    asyncio.run(batcher.encode_many(["same", "same", "other"]))
+    assert encoder.batches == [["same", "other"]]
+
+    failing = EmbeddingMicroBatcher(RecordingEncoder(fail=True), max_wait_ms=5)
+
+    async def scenario():
+        return await asyncio.gather(failing.encode("a"), failing.encode("b"), return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(error, RuntimeError) for error in errors)
+
+
+def test_invalid_settings_are_rejected():
+    """Test that the batcher validates its limits"""
+    with pytest.raises(ValueError):
+        EmbeddingMicroBatcher(RecordingEncoder(), max_batch_size=0)
+    with pytest.raises(ValueError):
+        EmbeddingMicroBatcher(RecordingEncoder(), max_wait_ms=-1)
+
+
+class CountingSentenceTransformer:
+    """Fake model that counts encode calls"""
+    calls = []
+
+    def __init__(self, model_name):
+        pass
+
+    def encode(self, texts, **kwargs):
+        CountingSentenceTransformer.calls.append(texts)
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        vectors = np.stack([np.random.default_rng(len(text)).normal(size=384) for text in texts]).astype(np.float32)
+        return vectors[0] if single else vectors
+
+
+def test_async_searches_encode_queries_in_one_batch(knowledge_db, monkeypatch):
+    """Test that concurrent AsyncKnowledgeRetriever searches share one model call"""
+    CountingSentenceTransformer.calls = []
+    monkeypatch.setattr(model_registry, "SentenceTransformer", CountingSentenceTransformer)
+    model_registry.clear_models()
+    retriever = AsyncKnowledgeRetriever(KnowledgeRetriever(knowledge_db, index_backend="memory"), max_workers=4)
+    retriever.query_batcher.max_wait_ms = 20
+    queries = [f"batched query number {'x' * i}" for i in range(6)]
+
+    async def scenario():
+        return await asyncio.gather(*[retriever.search(query) for query in queries])
+
+    results = asyncio.run(scenario())
+    retriever.shutdown()
+    model_registry.clear_models()
+
+    assert CountingSentenceTransformer.calls == [queries]
+    assert all(len(result) == 3 for result in results)
+
+
+def test_search_by_vector_does_not_encode_again(knowledge_db, monkeypatch):
+    """Test that a caller-supplied embedding skips the batcher and the model"""
+    CountingSentenceTransformer.calls = []
+    monkeypatch.setattr(model_registry, "SentenceTransformer", CountingSentenceTransformer)
+    model_registry.clear_models()
+    retriever = AsyncKnowledgeRetriever(KnowledgeRetriever(knowledge_db, index_backend="memory"), max_workers=2)
+    embedding = np.random.default_rng(0).normal(size=384).astype(np.float32)
+
+    results = asyncio.run(retriever.search_by_vector(embedding, top_k=3))
+    retriever.shutdown()
+    model_registry.clear_models()
+
+    assert CountingSentenceTransformer.calls == []
+    assert retriever.query_batcher.stats()["requests"] == 0
+    assert len(results) == 3
+
+
+def test_search_with_embedding_skips_the_batcher(knowledge_db, monkeypatch):
+    """Test that a search given the caller's embedding neither batches nor encodes the query"""
+    CountingSentenceTransformer.calls = []
+    monkeypatch.setattr(model_registry, "SentenceTransformer", CountingSentenceTransformer)
+    model_registry.clear_models()
+    retriever = AsyncKnowledgeRetriever(KnowledgeRetriever(knowledge_db, index_backend="memory"), max_workers=2)
+    embedding = np.random.default_rng(0).normal(size=384).astype(np.float32)
+
+    results = asyncio.run(retriever.search("chunk 7", top_k=3, query_embedding=embedding))
+    retriever.shutdown()
+    model_registry.clear_models()
+
+    assert CountingSentenceTransformer.calls == []
+    assert retriever.query_batcher.stats()["requests"] == 0
+    assert len(results) == 3
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+import ai.model_registry as model_registry
+
+
+class FakeModel:
+    """Stand-in model that counts loads and flags concurrent encodes"""
+    loads = 0
+
+    def __init__(self, model_name):
+        FakeModel.loads += 1
+        time.sleep(0.05)
+        self.active = 0
+        self.overlapped = False
+
+    def encode(self, texts, **kwargs):
+        self.active += 1
+        self.overlapped |= self.active > 1
+        time.sleep(0.01)
+        self.active -= 1
+        return np.zeros(384, dtype=np.float32)
+
+
+@pytest.fixture(autouse=True)
+def fake_models(monkeypatch):
+    FakeModel.loads = 0
+    monkeypatch.setattr(model_registry, "SentenceTransformer", FakeModel)
+    model_registry.clear_models()
+    yield
+    model_registry.clear_models()
+
+
+def test_model_is_loaded_once_across_threads():
+    """Test that concurrent first requests share a single load"""
+    handles = []
+    threads = [threading.Thread(target=lambda: handles.append(model_registry.get_model("mini")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert FakeModel.loads == 1
+    assert all(handle is handles[0] for handle in handles)
+    assert model_registry.get_model("other") is not handles[0]
+    assert FakeModel.loads == 2
+
+
+def test_encode_is_serialized():
+    """Test that the shared handle never runs two encodes at once"""
+    shared = model_registry.get_model("mini")
+    threads = [threading.Thread(target=shared.encode, args=("text",)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not shared.model.overlapped
+
+
+class FakeTensor:
+    def __init__(self, numel, element_size):
+        self._numel = numel
+        self._element_size = element_size
+
+    def numel(self):
+        return self._numel
+
+    def element_size(self):
+        return self._element_size
+
+
+def test_memory_report(monkeypatch):
+    """Test that parameters and buffers are counted for every loaded model"""
+    monkeypatch.setattr(FakeModel, "parameters", lambda self: [FakeTensor(2**20, 4), FakeTensor(2**19, 4)],
+                        raising=False)
+    monkeypatch.setattr(FakeModel, "buffers", lambda self: [FakeTensor(2**19, 2)], raising=False)
+    model_registry.get_model("mini")
+
+    report = model_registry.model_memory_report()
+
+    assert report["mini"]["memory_mb"] == pytest.approx(7.0)
+    assert report["total"]["memory_mb"] == pytest.approx(7.0)
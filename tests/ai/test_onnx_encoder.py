@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+import ai.model_registry as model_registry
+from ai.onnx_encoder import OnnxSentenceEncoder, export_onnx_model
+
+DIMENSION = 8
+
+
+class FakeEncoding:
+    def __init__(self, ids, attention_mask):
+        self.ids = ids
+        self.attention_mask = attention_mask
+
+
+class FakeTokenizer:
+    """Whitespace tokenizer with right padding, like tokenizers.Tokenizer"""
+    max_length = 512
+
+    def enable_truncation(self, max_length):
+        self.max_length = max_length
+
+    def enable_padding(self):
+        pass
+
+    def encode_batch(self, texts):
+        ids = [[sum(map(ord, word)) % 97 + 1 for word in text.split()][:self.max_length] for text in texts]
+        width = max(len(row) for row in ids)
+        return [FakeEncoding(row + [0] * (width - len(row)), [1] * len(row) + [0] * (width - len(row)))
+                for row in ids]
+
+
+class FakeNode:
+    def __init__(self, name, shape=None):
+        self.name = name
+        self.shape = shape
+
+
+class FakeSession:
+    """Token embeddings looked up from a fixed table; padding rows are large to expose pooling bugs"""
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        self.table = rng.normal(size=(98, DIMENSION)).astype(np.float32)
+        self.table[0] = 100.0
+        self.batches = []
+
+    def get_inputs(self):
+        return [FakeNode("input_ids"), FakeNode("attention_mask"), FakeNode("token_type_ids")]
+
+    def get_outputs(self):
+        return [FakeNode("token_embeddings", ["batch", "sequence", DIMENSION])]
+
+    def run(self, output_names, feed):
+        assert set(feed) == {"input_ids", "attention_mask", "token_type_ids"}
+        self.batches.append(feed["input_ids"].shape)
+        return [self.table[feed["input_ids"]]]
+
+
+@pytest.fixture
+def encoder():
+    return OnnxSentenceEncoder(FakeSession(), FakeTokenizer(), max_seq_length=16)
+
+
+def test_mean_pooling_ignores_padding(encoder):
+    """Test that an embedding does not depend on the other texts in its batch"""
+    alone = encoder.encode("manage the classroom")
+    batched = encoder.encode(["manage the classroom", "a much longer text that forces padding of the short one"])
+
+    np.testing.assert_allclose(batched[0], alone, rtol=1e-6)
+    expected = encoder.session.table[FakeTokenizer().encode_batch(["manage the classroom"])[0].ids].mean(axis=0)
+    np.testing.assert_allclose(alone, expected / np.linalg.norm(expected), rtol=1e-6)
+
+
+def test_encode_preserves_order_across_batches(encoder):
+    """Test that length-sorted batching returns rows in input order, normalized"""
+    texts = [" ".join(["word"] * (i % 5 + 1)) + f" text{i}" for i in range(11)]
+    embeddings = encoder.encode(texts, batch_size=4)
+
+    assert embeddings.shape == (11, DIMENSION)
+    assert embeddings.dtype == np.float32
+    assert len(encoder.session.batches) == 3
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-6)
+    for i, text in enumerate(texts):
+        np.testing.assert_allclose(embeddings[i], encoder.encode(text), rtol=1e-6)
+    assert encoder.get_sentence_embedding_dimension() == DIMENSION
+
+
+def test_registry_loads_backends_separately(monkeypatch, encoder):
+    """Test that each backend gets its own registry entry and cache key"""
+    loads = []
+
+    def from_directory(model_dir, quantized=False):
+        loads.append(quantized)
+        return encoder
+
+    monkeypatch.setattr(OnnxSentenceEncoder, "from_directory", staticmethod(from_directory))
+    monkeypatch.setattr(model_registry, "SentenceTransformer", lambda name: object())
+    model_registry.clear_models()
+    try:
+        torch_model = model_registry.get_model("mini", "torch")
+        int8_model = model_registry.get_model("mini", "onnx-int8")
+        assert model_registry.get_model("mini", "onnx-int8") is int8_model
+        assert int8_model is not torch_model
+        assert loads == [True]
+        assert int8_model.backend == "onnx-int8"
+        assert model_registry.model_key("mini", "torch") == "mini"
+        assert set(model_registry.model_memory_report()) == {"mini", "mini:onnx-int8", "total"}
+        with pytest.raises(ValueError):
+            model_registry.get_model("mini", "tensorrt")
+    finally:
+        model_registry.clear_models()
+
+
+def test_exported_models_match_pytorch(tmp_path):
+    """Test that the fp32 and int8 ONNX models reproduce the PyTorch embeddings"""
+    pytest.importorskip("torch")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    texts = [
+        "How do I handle a student who refuses to participate?",
+        "Strategies for differentiated reading instruction in second grade",
+        "Parent conference about repeated tardiness",
+    ]
+    try:
+        reference = sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
+        export_onnx_model("all-MiniLM-L6-v2", str(tmp_path))
+    except OSError as e:
+        pytest.skip(f"model not available: {e}")
+    expected = reference.encode(texts, normalize_embeddings=True)
+
+    fp32 = OnnxSentenceEncoder.from_directory(str(tmp_path)).encode(texts)
+    int8 = OnnxSentenceEncoder.from_directory(str(tmp_path), quantized=True).encode(texts)
+
+    assert np.min(np.sum(expected * fp32, axis=1)) > 0.999
+    assert np.min(np.sum(expected * int8, axis=1)) > 0.97
@@ -1,5 +1,11 @@
+import sqlite3
+
+import numpy as np
 import pytest
 from ai.rag_pipeline import RAGPipeline
+from ai.async_retriever import AsyncKnowledgeRetriever
+from ai.knowledge_retriever import KnowledgeRetriever
+from ai.micro_batcher import EmbeddingMicroBatcher
 from ai.document_processor import DocumentProcessor
 from database.vector_ops import VectorOperations
 
@@ -145,4 +151,36 @@ async def test_performance_metrics(initialized_pipeline):
     metrics = initialized_pipeline.get_performance_metrics()
     assert 'query_time' in metrics
     assert 'embedding_time' in metrics
-    assert 'response_time' in metrics 
\ No newline at end of file
+    assert 'response_time' in metrics 
+
+class FakeScenarioStore:
+    async def search_scenarios(self, query_embedding):
+        return []
+
+class FakeLLM:
+    async def generate_response(self, query, context):
+        return context
+
+@pytest.mark.asyncio
+async def test_query_processing_falls_back_to_keyword_search(knowledge_db, monkeypatch):
+    """Test that a failing vector backend degrades process_query to keyword hits"""
+    retriever = KnowledgeRetriever(knowledge_db, index_backend="memory")
+
+    def broken(*args, **kwargs):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(retriever, "_vector_search", broken)
+    pipeline = RAGPipeline.__new__(RAGPipeline)
+    pipeline.vector_ops = FakeScenarioStore()
+    pipeline.llm = FakeLLM()
+    pipeline.knowledge_retriever = retriever
+    pipeline.async_retriever = AsyncKnowledgeRetriever(retriever, max_workers=2)
+    pipeline.query_batcher = EmbeddingMicroBatcher(
+        lambda texts: np.ones((len(texts), 384), dtype=np.float32), run=pipeline.async_retriever.run
+    )
+
+    result = await pipeline.process_query("chunk 7")
+    pipeline.async_retriever.shutdown()
+
+    assert result["sources"]["knowledge"]
+    assert "chunk 7" in result["response"]
@@ -0,0 +1,40 @@
+from ai.result_cache import RetrievalResultCache
+
+
+def test_hit_returns_copy():
+    """Test that cached results can be modified by the caller without affecting the cache"""
+    cache = RetrievalResultCache(max_size=4, ttl=60)
+    cache.put("q", 1, [{"id": 1, "metadata": {"source": "a"}}])
+
+    results = cache.get("q", 1)
+    results[0]["metadata"]["source"] = "changed"
+
+    assert cache.get("q", 1) == [{"id": 1, "metadata": {"source": "a"}}]
+    assert cache.stats()["hits"] == 2
+
+
+def test_version_change_invalidates():
+    """Test that a new knowledge-base version empties the cache"""
+    cache = RetrievalResultCache(max_size=4, ttl=60)
+    cache.put("q", 1, [{"id": 1}])
+
+    assert cache.get("q", 2) is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    """Test that the least recently used entry is evicted and old entries expire"""
+    now = [1000.0]
+    monkeypatch.setattr("ai.result_cache.time.monotonic", lambda: now[0])
+    cache = RetrievalResultCache(max_size=2, ttl=10)
+    cache.put("a", 1, [{"id": 1}])
+    cache.put("b", 1, [{"id": 2}])
+    cache.get("a", 1)
+    cache.put("c", 1, [{"id": 3}])
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == [{"id": 1}]
+
+    now[0] += 11
+    assert cache.get("c", 1) is None
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+import ai.model_registry as model_registry
+from ai.ingestion import ingest_documents, shard_for_source
+from ai.knowledge_retriever import KnowledgeRetriever
+from ai.sharded_retriever import ShardedKnowledgeRetriever, merge_ranked, split_knowledge_base
+
+
+class FakeModel:
+    def __init__(self, model_name):
+        pass
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        vectors = np.stack([
+            np.random.default_rng(abs(hash(text)) % 2**32).normal(size=384).astype(np.float32)
+            for text in texts
+        ])
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def sharded(knowledge_db, tmp_path, monkeypatch):
+    """The test knowledge base split into three shards, plus the unsplit retriever"""
+    monkeypatch.setattr(model_registry, "SentenceTransformer", FakeModel)
+    model_registry.clear_models()
+    paths = split_knowledge_base(knowledge_db, 3, [str(tmp_path / f"shard{i}.sqlite") for i in range(3)])
+    retriever = ShardedKnowledgeRetriever(paths, index_backend="memory")
+    yield retriever, KnowledgeRetriever(knowledge_db, index_backend="memory")
+    retriever.close()
+    model_registry.clear_models()
+
+
+def texts_and_scores(results):
+    return [(r["text"], round(r["similarity"], 5)) for r in results]
+
+
+def test_split_keeps_every_chunk_with_shard_ids(knowledge_db, sharded):
+    """Test that shards partition the chunks and shard i only holds ids congruent to i"""
+    retriever, _ = sharded
+    texts = []
+    for index, path in enumerate(retriever.shard_paths):
+        conn = sqlite3.connect(path)
+        ids = [row[0] for row in conn.execute("SELECT id FROM chunks")]
+        assert ids and all(chunk_id % 3 == index for chunk_id in ids)
+        assert conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == len(ids)
+        texts += [row[0] for row in conn.execute("SELECT text FROM chunks")]
+        conn.close()
+    conn = sqlite3.connect(knowledge_db)
+    assert sorted(texts) == sorted(row[0] for row in conn.execute("SELECT text FROM chunks"))
+    conn.close()
+
+
+def test_scatter_gather_matches_single_file(sharded):
+    """Test that merged shard results equal a search over the unsplit knowledge base"""
+    retriever, single = sharded
+    rng = np.random.default_rng(0)
+    assert retriever.warmup()
+    for _ in range(5):
+        embedding = rng.normal(size=384).astype(np.float32)
+        assert texts_and_scores(retriever.search_by_vector(embedding, top_k=8)) == \
+            texts_and_scores(single.search_by_vector(embedding, top_k=8))
+        assert texts_and_scores(retriever.search_by_vector(embedding, "special_needs", top_k=4)) == \
+            texts_and_scores(single.search_by_vector(embedding, "special_needs", top_k=4))
+
+    queries = ["classroom routines", "IEP goals"]
+    many = retriever.search_many(queries, top_k=5)
+    assert [texts_and_scores(results) for results in many] == \
+        [texts_and_scores(retriever.search(query, top_k=5)) for query in queries]
+    assert sorted(retriever.get_categories()) == sorted(single.get_categories())
+
+
+def test_sharded_hybrid_matches_single_file(sharded):
+    """Test that hybrid search fuses global candidate lists, not per-shard fused scores"""
+    retriever, single = sharded
+    rng = np.random.default_rng(1)
+    for query in ["17", "105", "64"]:
+        embedding = rng.normal(size=384).astype(np.float32)
+        assert texts_and_scores(retriever.search_by_vector(embedding, top_k=10, query=query)) == \
+            texts_and_scores(single.search_by_vector(embedding, top_k=10, query=query))
+    for query in ["42", "IEP 7"]:
+        assert texts_and_scores(retriever.search(query, top_k=10, mode="hybrid")) == \
+            texts_and_scores(single.search(query, top_k=10, mode="hybrid"))
+
+
+def test_usage_is_routed_to_the_owning_shard(sharded):
+    """Test that usage statistics land in the shard that holds each chunk"""
+    retriever, _ = sharded
+    chunk_ids = [3, 4, 5, 7]
+    retriever.record_usage(chunk_ids, 0.5)
+    retriever.close()
+    for chunk_id in chunk_ids:
+        conn = sqlite3.connect(retriever.shard_paths[chunk_id % 3])
+        assert conn.execute("SELECT usage_count FROM chunks WHERE id = ?", (chunk_id,)).fetchone() == (1,)
+        conn.close()
+
+
+def test_sharded_ingestion_allocates_shard_ids(tmp_path, monkeypatch):
+    """Test that each shard ingests only its sources and allocates ids in its residue class"""
+    monkeypatch.setattr(model_registry, "SentenceTransformer", FakeModel)
+    model_registry.clear_models()
+    documents = [{"source": f"doc-{i}", "text": f"Document {i} text."} for i in range(20)]
+    for index in range(2):
+        conn = sqlite3.connect(tmp_path / f"shard{index}.sqlite")
+        stats = ingest_documents(conn, documents, shard_index=index, num_shards=2)
+        assert stats["documents"] == sum(shard_for_source(d["source"], 2) == index for d in documents)
+        assert all(row[0] % 2 == index for row in conn.execute("SELECT id FROM chunks"))
+        conn.close()
+    model_registry.clear_models()
+
+
+def test_dead_shard_worker_is_restarted_and_partial_results_are_not_cached(sharded):
+    """Test that killing a shard worker degrades one search and the next search recovers"""
+    retriever, single = sharded
+    assert retriever.warmup()
+    with pytest.raises(BrokenProcessPool):
+        retriever._workers()[0].submit(os._exit, 1).result()
+
+    key = (retriever.query_cache.normalize("IEP goals"), None, 200, "vector")
+    partial = retriever.search("IEP goals", top_k=200)
+    assert partial and all(result["id"] % 3 != 0 for result in partial)
+    assert retriever.result_cache.get(key, retriever._kb_version()) is None
+
+    recovered = retriever.search("IEP goals", top_k=200)
+    assert len(recovered) == 200
+    assert retriever.result_cache.get(key, retriever._kb_version()) == recovered
+
+
+def test_merge_ranked_keeps_global_order():
+    lists = [[{"similarity": 0.9}, {"similarity": 0.2}], [{"similarity": 0.5}], []]
+    assert [r["similarity"] for r in merge_ranked(lists, 2)] == [0.9, 0.5]
@@ -0,0 +1,124 @@
+import logging
+import os
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+import pytest
+import ai.connection_manager as connection_manager
+from ai.connection_manager import SQLiteConnectionManager, get_connection_manager
+from ai.usage_recorder import UsageStatisticsRecorder
+
+
+def read_stats(db_path, chunk_id):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT usage_count, effectiveness_score FROM chunks WHERE id = ?", (chunk_id,)).fetchone()
+    conn.close()
+    return row
+
+
+def test_updates_are_buffered_until_flush(knowledge_db):
+    """Test that recording does not write and one flush applies every buffered use"""
+    recorder = UsageStatisticsRecorder(get_connection_manager(knowledge_db), flush_interval=60)
+    recorder.record_many([1, 2, 1])
+    recorder.record(1, effectiveness_score=0.9)
+    recorder.record(1, effectiveness_score=0.6)
+
+    assert read_stats(knowledge_db, 1) == (0, 0.0)
+    assert recorder.pending_count() == 2
+    assert recorder.flush() == 2
+
+    usage_count, score = read_stats(knowledge_db, 1)
+    assert usage_count == 4
+    assert score == pytest.approx(0.75)
+    assert read_stats(knowledge_db, 2) == (1, 0.0)
+    recorder.close()
+
+
+def test_matches_sequential_updates(knowledge_db):
+    """Test that a batched flush equals one update per use when scored uses come first"""
+    db = get_connection_manager(knowledge_db)
+    with db.writer() as conn:
+        conn.execute("UPDATE chunks SET usage_count = 3, effectiveness_score = 0.5 WHERE id IN (5, 6)")
+
+    recorder = UsageStatisticsRecorder(db, flush_interval=60)
+    for score in (0.8, 0.2, 0.0, 0.0):
+        recorder.record(5, score)
+    recorder.flush()
+    recorder.close()
+
+    count, score = 3, 0.5
+    for new_score in (0.8, 0.2, 0.0, 0.0):
+        if new_score > 0:
+            score = (score * count + new_score) / (count + 1)
+        count += 1
+    assert read_stats(knowledge_db, 5) == (count, pytest.approx(score))
+
+
+def test_size_threshold_triggers_background_flush(knowledge_db):
+    """Test that a full buffer is written without waiting for the interval"""
+    recorder = UsageStatisticsRecorder(get_connection_manager(knowledge_db), flush_interval=60, flush_size=3)
+    recorder.record_many([10, 11, 12])
+
+    for _ in range(100):
+        if recorder.flushed == 3:
+            break
+        threading.Event().wait(0.02)
+    assert recorder.flushed == 3
+    assert read_stats(knowledge_db, 12)[0] == 1
+    recorder.close()
+
+
+def test_close_flushes_and_rejects_new_records(knowledge_db):
+    """Test that pending statistics are written on shutdown"""
+    recorder = UsageStatisticsRecorder(get_connection_manager(knowledge_db), flush_interval=60)
+    recorder.record(20)
+    recorder.close()
+
+    assert read_stats(knowledge_db, 20)[0] == 1
+    recorder.record(20)
+    assert recorder.pending_count() == 0
+
+
+def test_read_only_database_drops_statistics_with_one_warning(knowledge_db, monkeypatch, caplog):
+    """Test that a read-only database disables the recorder instead of failing every flush"""
+    os.chmod(knowledge_db, 0o444)
+    # Tests run as root, which can write to the file regardless of its mode
+    monkeypatch.setattr(connection_manager.os, "access", lambda path, mode: False)
+    db = SQLiteConnectionManager(knowledge_db)
+    recorder = UsageStatisticsRecorder(db, flush_interval=60)
+
+    with caplog.at_level(logging.WARNING, logger="ai.usage_recorder"):
+        recorder.record_many([1, 2])
+        recorder.record(1, effectiveness_score=0.9)
+
+    assert recorder.read_only
+    assert recorder.pending_count() == 0
+    assert recorder._thread is None
+    assert recorder.flush() == 0
+    assert [r.message for r in caplog.records if "read-only" in r.message] == [
+        f"{knowledge_db} is read-only. Dropping usage statistics."
+    ]
+    assert read_stats(knowledge_db, 1) == (0, 0.0)
+    recorder.close()
+    db.close()
+    os.chmod(knowledge_db, 0o644)
+
+
+def test_readonly_write_error_disables_the_recorder(knowledge_db, caplog):
+    """Test that a database which rejects the flush as read-only is not retried"""
+    recorder = UsageStatisticsRecorder(get_connection_manager(knowledge_db), flush_interval=60)
+    recorder.record_many([1, 2])
+
+    def readonly_writer():
+        raise sqlite3.OperationalError("attempt to write a readonly database")
+
+    recorder.db = SimpleNamespace(db_path=knowledge_db, writer=readonly_writer)
+    with caplog.at_level(logging.WARNING, logger="ai.usage_recorder"):
+        assert recorder.flush() == 0
+        recorder.record(3)
+
+    assert recorder.read_only
+    assert recorder.pending_count() == 0
+    assert sum("read-only" in r.message for r in caplog.records) == 1
+    recorder.close()
@@ -0,0 +1,158 @@
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+from ai.knowledge_store import normalize_embeddings, quantize_embeddings
+from ai.vector_index import InMemoryVectorIndex, QuantizedVectorIndex, export_snapshot
+
+DIMENSION = 384
+
+
+def brute_force(db_path, query, category=None, top_k=3):
+    """Reference row-by-row cosine scan"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT c.id, c.category, e.vector FROM chunks c JOIN embeddings e ON c.id = e.chunk_id"
+    ).fetchall()
+    conn.close()
+    scored = []
+    for chunk_id, chunk_category, blob in rows:
+        if category and chunk_category != category:
+            continue
+        vector = np.frombuffer(blob, dtype=np.float32)
+        scored.append((chunk_id, np.dot(query, vector) / (np.linalg.norm(query) * np.linalg.norm(vector))))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:top_k]
+
+
+def test_index_loads_all_embeddings(knowledge_db):
+    """Test that every embedding is loaded into one contiguous matrix"""
+    index = InMemoryVectorIndex.from_database(knowledge_db)
+
+    assert len(index) == 200
+    assert index.dimension == DIMENSION
+    assert index.matrix.dtype == np.float32
+    assert index.matrix.flags["C_CONTIGUOUS"]
+
+
+@pytest.mark.parametrize("category", [None, "special_needs"])
+def test_index_matches_brute_force(knowledge_db, category):
+    """Test that index results match an exact row-by-row scan"""
+    index = InMemoryVectorIndex.from_database(knowledge_db)
+    query = np.random.default_rng(7).normal(size=DIMENSION).astype(np.float32)
+
+    expected = brute_force(knowledge_db, query, category, top_k=5)
+    results = index.search(query, category=category, top_k=5)
+
+    assert [chunk_id for chunk_id, _ in results] == [chunk_id for chunk_id, _ in expected]
+    for (_, score), (_, expected_score) in zip(results, expected):
+        assert abs(score - expected_score) < 1e-5
+
+
+def test_index_edge_cases(knowledge_db):
+    """Test unknown categories, oversized top_k and zero queries"""
+    index = InMemoryVectorIndex.from_database(knowledge_db)
+    query = np.ones(DIMENSION, dtype=np.float32)
+
+    assert index.search(query, category="unknown") == []
+    assert len(index.search(query, top_k=1000)) == 200
+    assert index.search(np.zeros(DIMENSION, dtype=np.float32)) == []
+
+
+def test_batch_search_matches_single_search(knowledge_db):
+    """Test that batched queries return the same hits as one-at-a-time queries"""
+    index = InMemoryVectorIndex.from_database(knowledge_db)
+    queries = np.random.default_rng(3).normal(size=(10, DIMENSION)).astype(np.float32)
+
+    batched = index.search_batch(queries, category="teaching_strategies", top_k=4, block_size=3)
+
+    assert len(batched) == len(queries)
+    for query, hits in zip(queries, batched):
+        single = index.search(query, category="teaching_strategies", top_k=4)
+        assert [chunk_id for chunk_id, _ in hits] == [chunk_id for chunk_id, _ in single]
+        assert np.allclose([score for _, score in hits], [score for _, score in single], atol=1e-5)
+
+
+def test_snapshot_is_memory_mapped(knowledge_db):
+    """Test that an exported snapshot is opened without copying and matches the database"""
+    prefix = export_snapshot(knowledge_db)
+    shared = InMemoryVectorIndex.from_snapshot(prefix)
+    private = InMemoryVectorIndex.from_database(knowledge_db)
+    query = np.random.default_rng(11).normal(size=DIMENSION).astype(np.float32)
+
+    assert isinstance(shared.matrix.base, np.memmap)
+    assert not shared.matrix.flags["WRITEABLE"]
+    assert np.array_equal(shared.ids, private.ids)
+    for category in (None, "classroom_management"):
+        assert shared.search(query, category, top_k=5) == private.search(query, category, top_k=5)
+
+
+@pytest.mark.parametrize("category", [None, "special_needs"])
+def test_normalized_index_matches_brute_force(knowledge_db, category):
+    """Test that normalized storage skips the norms without changing results"""
+    conn = sqlite3.connect(knowledge_db)
+    normalize_embeddings(conn)
+    conn.close()
+    index = InMemoryVectorIndex.from_database(knowledge_db)
+    query = np.random.default_rng(7).normal(size=DIMENSION).astype(np.float32)
+
+    expected = brute_force(knowledge_db, query, category, top_k=5)
+    results = index.search(query, category=category, top_k=5)
+
+    assert index.normalized
+    assert [chunk_id for chunk_id, _ in results] == [chunk_id for chunk_id, _ in expected]
+    assert np.allclose([score for _, score in results], [score for _, score in expected], atol=1e-5)
+
+
+@pytest.mark.parametrize("category", [None, "teaching_strategies"])
+def test_quantized_index_rescores_exactly(knowledge_db, category):
+    """Test that the int8 index returns the float32 top-k with exact similarities"""
+    conn = sqlite3.connect(knowledge_db)
+    quantize_embeddings(conn)
+    conn.close()
+    index = QuantizedVectorIndex.from_database(knowledge_db)
+    queries = np.random.default_rng(5).normal(size=(20, DIMENSION)).astype(np.float32)
+
+    assert index.matrix.dtype == np.int8
+    assert index.matrix.nbytes * 4 == InMemoryVectorIndex.from_database(knowledge_db).matrix.nbytes
+    for query, hits in zip(queries, index.search_batch(queries, category, top_k=5)):
+        expected = brute_force(knowledge_db, query, category, top_k=5)
+        assert [chunk_id for chunk_id, _ in hits] == [chunk_id for chunk_id, _ in expected]
+        assert np.allclose([score for _, score in hits], [score for _, score in expected], atol=1e-5)
+    assert index.search(np.zeros(DIMENSION, dtype=np.float32)) == []
+
+
+def test_snapshot_export_switches_generations_atomically(knowledge_db):
+    """Test that re-exporting publishes new files through the manifest and keeps the previous ones"""
+    prefix = export_snapshot(knowledge_db)
+    first = InMemoryVectorIndex.from_snapshot(prefix)
+    with open(f"{prefix}.snapshot.json") as f:
+        first_files = set(json.load(f)["files"].values())
+
+    export_snapshot(knowledge_db)
+    with open(f"{prefix}.snapshot.json") as f:
+        second_files = set(json.load(f)["files"].values())
+    export_snapshot(knowledge_db)
+    with open(f"{prefix}.snapshot.json") as f:
+        third_files = set(json.load(f)["files"].values())
+
+    directory = os.path.dirname(prefix)
+    on_disk = {name for name in os.listdir(directory) if name.endswith(".npy")}
+    assert first_files.isdisjoint(second_files) and second_files.isdisjoint(third_files)
+    assert on_disk == second_files | third_files
+    assert np.array_equal(InMemoryVectorIndex.from_snapshot(prefix).ids, first.ids)
+
+
+def test_snapshot_rows_are_checked_against_the_manifest(knowledge_db):
+    """Test that a snapshot whose arrays disagree with the manifest is rejected"""
+    prefix = export_snapshot(knowledge_db)
+    with open(f"{prefix}.snapshot.json") as f:
+        manifest = json.load(f)
+    manifest["num_vectors"] += 1
+    with open(f"{prefix}.snapshot.json", "w") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ValueError, match="does not match its manifest"):
+        InMemoryVectorIndex.from_snapshot(prefix)